@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+./bench.py として動かすための入口（本体は dsl2ui/bench.py）
+"""
+import sys
+from dsl2ui.bench import main
+
+if __name__ == "__main__":
+    sys.exit(main())
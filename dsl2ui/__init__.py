@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+プログラムから使うための API（標準出力には何も書かない）
+
+  import dsl2ui
+  from dsl2ui import ir
+  kotlin = dsl2ui.generate_compose("dsl/home.json")              # str
+  swift = dsl2ui.generate_swiftui(content, encoding="utf-8")     # bytes
+  screen = ir.screen(dsl); dsl2ui.generate_compose(screen); dsl2ui.generate_swiftui(screen)  # 解析は 1 回
+
+入力に渡せるもの（いずれも 1 画面）:
+- パース済みの dict / nodes.Node / ir.Screen
+- DSL の内容の bytes / bytearray / memoryview（JSON か dsl_binary の .dslb）
+- ファイルのパス（str / os.PathLike。JSON か .dslb）
+
+戻り値は各変換器の CLI が書き出す内容と同じ（末尾に改行）。encoding を指定すると bytes で返す。
+壊れた DSL や複数画面の入力は ValueError、それ以外の型は TypeError。
+
+変換器などのモジュールはこのパッケージのサブモジュール（dsl2ui.toJetpackCompose など）。
+quickgen の起動を遅くしないよう、このファイルは import 時に何も読み込まない（使うときに import する）。
+"""
+
+__version__ = "0.1.0"
+
+# バックエンド名 -> dsl2ui のサブモジュール名（変換器は使うときに初めて import する）
+BACKENDS = {
+    "compose": "toJetpackCompose",
+    "swiftui": "toSwiftUi",
+    "compose-stable": "toJetpackComposeStable",
+    "swiftui-split": "toSwiftUiSplit",
+}
+
+def generate(backend: str, dsl, encoding: str = None, memo=None):
+    """
+    dsl を backend（"compose" / "swiftui" / "compose-stable" / "swiftui-split"）のファイル内容に変換して返す
+    memo: FragmentMemo（複数画面で共有すると画面をまたいで断片を再利用できる）
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown backend: {backend} (choose from {', '.join(BACKENDS)})")
+    import importlib
+    module = importlib.import_module("." + BACKENDS[backend], __name__)
+    text = module.convert(load(dsl), memo) + "\n"
+    return text if encoding is None else text.encode(encoding)
+
+def generate_compose(dsl, encoding: str = None, memo=None, stable: bool = False):
+    """
+    Jetpack Compose（.kt）のファイル内容を返す
+    stable: 再コンポーズのコストを下げる形（toJetpackComposeStable）で生成する
+    """
+    return generate("compose-stable" if stable else "compose", dsl, encoding, memo)
+
+def generate_swiftui(dsl, encoding: str = None, memo=None, split: bool = False):
+    """
+    SwiftUI（.swift）のファイル内容を返す
+    split: 大きな画面を複数の View struct に分けた形（toSwiftUiSplit）で生成する
+    """
+    return generate("swiftui-split" if split else "swiftui", dsl, encoding, memo)
+
+def load(dsl):
+    """
+    API に渡された入力を変換器が受け付ける形（dict / nodes.Node / ir.Screen）にする
+    """
+    import os
+    from . import decoder, ir, nodes
+    if isinstance(dsl, (bytes, bytearray, memoryview)):
+        # 標準の json は memoryview を受け付けない
+        return decoder.load_screen(dsl.tobytes() if isinstance(dsl, memoryview) else dsl)
+    if isinstance(dsl, (str, os.PathLike)):
+        with open(dsl, "rb") as f:
+            return decoder.load_screen(f.read())
+    if isinstance(dsl, (dict, nodes.Node, ir.Screen)):
+        return dsl
+    raise TypeError(f"DSL must be a dict, bytes or path, not {type(dsl).__name__}")
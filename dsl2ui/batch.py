@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+複数の DSL ファイルを 1 プロセスでまとめて変換するバッチモード
+
+使い方:
+  ./batch.py compose dsl/ out/
+  ./batch.py swiftui "dsl/**/*.json" out/
+  ./batch.py compose dsl/ out/ --jobs 0      # 全コアで並列変換
+  ./batch.py all dsl/ out/                   # 1 回のパースで .kt と .swift を両方生成
+  ./batch.py all dsl/ out/ --cache-dir .dsl2ui-cache   # 変更のない DSL は生成をスキップ
+  ./batch.py compose export.jsonl out/ --multi-doc      # 複数画面の書き出しを 1 画面ずつ変換
+  ./batch.py all build/ out/                 # dsl_binary.py で事前解析した .dslb も入力にできる
+  ./batch.py all dsl/ out/ --validate        # スキーマ検証に通らない DSL は生成せずに失敗にする
+"""
+import sys, os, glob, json, time, argparse, importlib
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from . import cache as build_cache
+from . import dsl_stream
+from . import dsl_binary
+from . import decoder
+from . import ir
+from . import nodes
+from . import validate as schema
+from .fragment_memo import FragmentMemo
+
+# バックエンド名 -> dsl2ui のサブモジュール名
+BACKENDS = {
+    "compose": "toJetpackCompose",
+    "swiftui": "toSwiftUi",
+    "compose-stable": "toJetpackComposeStable",
+    "swiftui-split": "toSwiftUiSplit",
+}
+
+# "all" で生成するバックエンド（compose-stable / swiftui-split は compose / swiftui と同じ拡張子に書き出すので含めない）
+ALL = ("compose", "swiftui")
+
+# 入力として集めるファイルの拡張子（dsl_binary で事前に解析したバイナリも含む）
+INPUT_EXTS = (".json", dsl_binary.EXT)
+
+# 1 出力分の変換結果（error は成功時 None、cached はキャッシュから再利用したか）
+FileResult = namedtuple("FileResult", "src dst seconds error cached", defaults=(False,))
+
+def load_backend(name: str):
+    if name not in BACKENDS:
+        raise ValueError(f"unknown backend: {name} (choose from {', '.join(BACKENDS)})")
+    return importlib.import_module("." + BACKENDS[name], __package__)
+
+def parse_backends(spec) -> list:
+    """
+    "compose" / "compose,swiftui" / "all" / リストをバックエンド名のリストに正規化
+    出力の拡張子が同じバックエンド（compose と compose-stable など）を同時に指定すると ValueError
+    """
+    if isinstance(spec, str):
+        spec = list(ALL) if spec == "all" else [s.strip() for s in spec.split(",") if s.strip()]
+    names = list(dict.fromkeys(spec))
+    exts = {}
+    for name in names:
+        ext = load_backend(name).FILE_EXT
+        if ext in exts:
+            raise ValueError(f"backends {exts[ext]} and {name} both write {ext} files")
+        exts[ext] = name
+    return names
+
+def collect_inputs(src: str, exts=INPUT_EXTS):
+    """
+    ディレクトリなら配下の exts の拡張子のファイルを再帰的に、それ以外は glob として展開
+    戻り値: (入力ファイルのソート済みリスト, 相対パスの基準ディレクトリ)
+    """
+    if os.path.isdir(src):
+        paths = [p for ext in exts for p in glob.glob(os.path.join(src, "**", "*" + ext), recursive=True)]
+        return sorted(paths), src
+    paths = [p for p in glob.glob(src, recursive=True) if os.path.isfile(p)]
+    root = os.path.commonpath([os.path.dirname(p) for p in paths]) if paths else "."
+    return sorted(paths), root
+
+def output_path(src: str, src_root: str, out_dir: str, ext: str) -> str:
+    # 入力のディレクトリ構成を保ったまま拡張子だけ差し替える
+    rel = os.path.relpath(src, src_root)
+    return os.path.join(out_dir, os.path.splitext(rel)[0] + ext)
+
+def write_output(dst: str, text: str):
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    # main() の print と同じく末尾に改行を付ける
+    with open(dst, "w", encoding="utf-8") as f:
+        f.write(text + "\n")
+
+# プロセス内でバックエンド毎に共有するサブツリーメモ（ワーカープロセスではワーカー毎）
+_memos = {}
+
+def get_memo(name: str) -> FragmentMemo:
+    if name not in _memos: _memos[name] = FragmentMemo(name)
+    return _memos[name]
+
+def _emit_and_write(backend, dsl, dst: str, cache=None, key=None, memo=None) -> float:
+    start = time.perf_counter()
+    if cache:
+        text = backend.convert(dsl, memo)
+        write_output(dst, text)
+        cache.put(key, text)
+    else:
+        # キャッシュしないときは生成しながらファイルへ書き出す
+        os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+        with open(dst, "w", encoding="utf-8") as f:
+            backend.write_file(dsl, f.write, memo)
+    return time.perf_counter() - start
+
+def schema_error(issues) -> str:
+    """
+    検証で見つかった問題を FileResult.error 用の 1 行に（先頭の数件だけ）
+    """
+    head = "; ".join(f"#{i.path}: {i.message}" for i in issues[:3])
+    more = f" (+{len(issues) - 3} more)" if len(issues) > 3 else ""
+    return f"SchemaError: {len(issues)} issues: {head}{more}"
+
+def convert_file(backends, src: str, dsts, concurrent: bool = False, cache=None, names=None,
+                 memo: bool = False, validate: bool = False) -> list:
+    """
+    src を 1 回だけ読み込み・パースし、同じツリーを各バックエンドに渡す
+    backends と dsts は同じ順序で対応する。戻り値は出力毎の FileResult のリスト
+    concurrent: True ならバックエンド毎の生成・書き込みをスレッドで同時に走らせる
+    cache: BuildCache。全バックエンドがヒットすればパースも行わない（names はキー用のバックエンド名）
+    memo: True ならバックエンド毎の FragmentMemo で同一サブツリーの生成を再利用する
+    validate: True ならスキーマ検証に通らない DSL は生成せずに失敗にする（検証結果も cache に入る）
+    """
+    names = names or [b.__name__ for b in backends]
+    start = time.perf_counter()
+    try:
+        with open(src, "rb") as f:
+            content = f.read()
+        issues = schema.validate_content(content, cache=cache)[0] if validate else None
+    except Exception as e:
+        err = f"{type(e).__name__}: {e}"
+        return [FileResult(src, dst, time.perf_counter() - start, err) for dst in dsts]
+    if issues:
+        return [FileResult(src, dst, time.perf_counter() - start, schema_error(issues)) for dst in dsts]
+
+    results = [None] * len(backends)
+    keys = [None] * len(backends)
+    if cache:
+        for i, backend in enumerate(backends):
+            keys[i] = build_cache.cache_key(names[i], backend, content)
+            text = cache.get(keys[i])
+            if text is None: continue
+            try:
+                write_output(dsts[i], text)
+                results[i] = FileResult(src, dsts[i], time.perf_counter() - start, None, True)
+            except Exception as e:
+                results[i] = FileResult(src, dsts[i], time.perf_counter() - start, f"{type(e).__name__}: {e}")
+    todo = [i for i in range(len(backends)) if results[i] is None]
+    if not todo: return results
+
+    try:
+        # 解析（ir への lowering）も 1 回だけ行い、全バックエンドで同じ ir.Screen を出力する
+        dsl = decoder.load_screen(content)
+    except Exception as e:
+        for i in todo:
+            results[i] = FileResult(src, dsts[i], time.perf_counter() - start, f"{type(e).__name__}: {e}")
+        return results
+    parse_time = time.perf_counter() - start
+
+    def run(i):
+        try:
+            return FileResult(src, dsts[i], parse_time + _emit_and_write(backends[i], dsl, dsts[i], cache, keys[i],
+                                                                      get_memo(names[i]) if memo else None), None)
+        except Exception as e:
+            return FileResult(src, dsts[i], time.perf_counter() - start, f"{type(e).__name__}: {e}")
+
+    if concurrent and len(todo) > 1:
+        # emit_node は入力の ir.Screen を書き換えないので、同じツリーを共有してよい
+        with ThreadPoolExecutor(max_workers=len(todo)) as pool:
+            for i, r in zip(todo, pool.map(run, todo)): results[i] = r
+    else:
+        for i in todo: results[i] = run(i)
+    return results
+
+def screen_path(backend, doc_dir: str, dsl: dict, seen: dict) -> str:
+    """
+    複数画面ファイルの 1 画面分の出力パス（doc_dir/<画面名><FILE_EXT>、同名が続けば _2, _3 ...）
+    """
+    if isinstance(dsl, dict):
+        name = backend.to_pascal(dsl.get("name", "GeneratedScreen"))
+    elif isinstance(dsl, nodes.Node):
+        name = backend.to_pascal(nodes.screen_name(dsl))
+    else:
+        name = "GeneratedScreen"
+    seen[name] = seen.get(name, 0) + 1
+    if seen[name] > 1: name = f"{name}_{seen[name]}"
+    return os.path.join(doc_dir, name + backend.FILE_EXT)
+
+def convert_documents(backends, src: str, doc_dir: str, concurrent: bool = False, names=None,
+                      memo: bool = False, validate: bool = False) -> list:
+    """
+    JSON Lines / 画面のトップレベル配列の src を 1 画面ずつ読み込み、読んだ画面から順に各バックエンドで生成する
+    書き出し全体をメモリに載せないので、保持するのは最大の 1 画面分だけ
+    戻り値は画面 x バックエンド毎の FileResult のリスト（途中で JSON が壊れていればそこで 1 件の失敗を追加して終わる）
+    """
+    names = names or [b.__name__ for b in backends]
+    results = []
+    seen = {}
+    start = time.perf_counter()
+    try:
+        for dsl in dsl_stream.open_documents(src):
+            dsts = [screen_path(backends[0], doc_dir, dsl, seen)]
+            dsts += [os.path.splitext(dsts[0])[0] + b.FILE_EXT for b in backends[1:]]
+            issues = schema.validate(dsl) if validate else None
+            if issues:
+                # 検証に通らない画面はその画面の出力だけ失敗にして次の画面に進む
+                screen, error = None, schema_error(issues)
+            else:
+                try:
+                    screen, error = ir.screen(dsl), None
+                except Exception as e:
+                    # 壊れた画面はその画面の出力だけ失敗にして次の画面に進む
+                    screen, error = None, f"{type(e).__name__}: {e}"
+            parse_time = time.perf_counter() - start
+
+            def run(i):
+                if error: return FileResult(src, dsts[i], parse_time, error)
+                try:
+                    t = _emit_and_write(backends[i], screen, dsts[i], memo=get_memo(names[i]) if memo else None)
+                    return FileResult(src, dsts[i], parse_time + t, None)
+                except Exception as e:
+                    return FileResult(src, dsts[i], time.perf_counter() - start, f"{type(e).__name__}: {e}")
+
+            if concurrent and len(backends) > 1:
+                with ThreadPoolExecutor(max_workers=len(backends)) as pool:
+                    results.extend(pool.map(run, range(len(backends))))
+            else:
+                results.extend(run(i) for i in range(len(backends)))
+            start = time.perf_counter()
+    except Exception as e:
+        results.append(FileResult(src, doc_dir, time.perf_counter() - start, f"{type(e).__name__}: {e}"))
+    return results
+
+def _convert_job(job) -> list:
+    # ProcessPoolExecutor から呼ばれるワーカー（pickle 可能なトップレベル関数）
+    backend_names, src, dsts, concurrent, cache, memo, multi_doc, validate = job
+    backends = [load_backend(b) for b in backend_names]
+    if multi_doc:
+        return convert_documents(backends, src, dsts, concurrent, backend_names, memo, validate)
+    return convert_file(backends, src, dsts, concurrent, cache, backend_names, memo, validate)
+
+def default_chunksize(n_inputs: int, jobs: int) -> int:
+    # ワーカー 1 つあたり 4 チャンク程度に分割し、IPC 回数と偏りのバランスを取る
+    return max(1, n_inputs // (jobs * 4))
+
+def run_batch(backend_spec, inputs, out_dir: str, src_root: str = ".", report=None,
+              jobs: int = 1, chunksize: int = 0, concurrent: bool = False, cache=None,
+              memo: bool = False, multi_doc: bool = False, validate: bool = False):
+    """
+    inputs を変換する。1 ファイルの失敗で全体は止めない
+    backend_spec: "compose" / "swiftui" / "compose,swiftui" / "all"
+      複数指定時も各ファイルのパースは 1 回で、.kt と .swift は同じディレクトリに並ぶ
+    report: FileResult を受け取るコールバック（進捗表示用）
+    jobs: ワーカープロセス数（1 なら直列、0 以下なら CPU コア数）
+    chunksize: 1 回の受け渡しでワーカーに送るファイル数（0 なら自動）
+    concurrent: 1 ファイル内で複数バックエンドを同時に実行する
+    cache: BuildCache。ヒットした出力は生成せず再利用し、終了時にサイズ上限まで LRU で削除する
+    memo: 同一サブツリー（FRAME / INSTANCE）の生成結果をファイルをまたいで再利用する
+    multi_doc: 各入力を JSON Lines / 画面の配列として 1 画面ずつ読み、out_dir/<入力名>/<画面名>.kt に書き出す
+      （キャッシュは入力ファイル単位なので併用できない）
+    validate: 生成の前に validate.py のスキーマ検証を行い、問題のある DSL は生成せずに失敗にする
+    結果・report の呼び出し順は並列時も inputs の順序と同じ
+    """
+    if multi_doc and cache:
+        raise ValueError("multi_doc と cache は併用できません")
+    names = parse_backends(backend_spec)
+    backends = [load_backend(b) for b in names]
+    jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+    if multi_doc:
+        job_list = [(names, src, output_path(src, src_root, out_dir, ""), concurrent, None, memo, True, validate)
+                    for src in inputs]
+    else:
+        job_list = [(names, src, [output_path(src, src_root, out_dir, b.FILE_EXT) for b in backends], concurrent, cache, memo, False,
+                     validate) for src in inputs]
+    if jobs == 1 or len(job_list) < 2:
+        per_file = (_convert_local(backends, job) for job in job_list)
+        results = _collect(per_file, report)
+    else:
+        chunksize = chunksize or default_chunksize(len(job_list), jobs)
+        with ProcessPoolExecutor(max_workers=min(jobs, len(job_list))) as pool:
+            results = _collect(pool.map(_convert_job, job_list, chunksize=chunksize), report)
+    if cache: cache.prune()
+    return results
+
+def _convert_local(backends, job) -> list:
+    # 直列実行用（読み込み済みのバックエンドをそのまま使う）
+    names, src, dsts, concurrent, cache, memo, multi_doc, validate = job
+    if multi_doc:
+        return convert_documents(backends, src, dsts, concurrent, names, memo, validate)
+    return convert_file(backends, src, dsts, concurrent, cache, names, memo, validate)
+
+def _collect(per_file, report) -> list:
+    results = []
+    for rs in per_file:
+        for r in rs:
+            results.append(r)
+            if report: report(r)
+    return results
+
+def print_result(r: FileResult, out=None):
+    out = out or sys.stderr
+    ms = r.seconds * 1000
+    if r.error:
+        print(f"FAIL {ms:8.2f}ms  {r.src}: {r.error}", file=out)
+    else:
+        tag = "hit " if r.cached else "ok  "
+        print(f"{tag} {ms:8.2f}ms  {r.src} -> {r.dst}", file=out)
+
+def print_summary(results, elapsed: float, out=None):
+    out = out or sys.stderr
+    failed = sum(1 for r in results if r.error)
+    cached = sum(1 for r in results if r.cached)
+    print(f"{len(results)} outputs, {len(results) - failed} ok ({cached} cached), {failed} failed in {elapsed:.3f}s", file=out)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="DSL ディレクトリを一括で .kt/.swift に変換")
+    ap.add_argument("backend", help="compose / swiftui / compose-stable / swiftui-split / compose,swiftui / all")
+    ap.add_argument("src", help="DSL ディレクトリまたは glob パターン")
+    ap.add_argument("out_dir", help="出力ディレクトリ")
+    ap.add_argument("-j", "--jobs", type=int, default=1, help="ワーカープロセス数（0 で CPU コア数、既定 1）")
+    ap.add_argument("--chunksize", type=int, default=0, help="ワーカーに一度に渡すファイル数（既定は自動）")
+    ap.add_argument("--concurrent-backends", action="store_true", help="複数バックエンドを 1 ファイル内で同時に実行")
+    ap.add_argument("--memo", action="store_true", help="同一サブツリーの生成結果を再利用する")
+    ap.add_argument("--multi-doc", action="store_true",
+                    help="入力を JSON Lines / 画面の配列として 1 画面ずつ変換（出力は out_dir/<入力名>/<画面名>）")
+    ap.add_argument("--validate", action="store_true", help="生成の前にスキーマ検証を行い、問題のある DSL は失敗にする")
+    ap.add_argument("--cache-dir", help="生成結果キャッシュのディレクトリ（指定時のみ有効）")
+    ap.add_argument("--cache-max-mb", type=float, default=build_cache.DEFAULT_MAX_BYTES / (1024 * 1024),
+                    help="キャッシュのサイズ上限 MB（超えた分は LRU で削除）")
+    ap.add_argument("--clear-cache", action="store_true", help="変換前にキャッシュを空にする")
+    ap.add_argument("-q", "--quiet", action="store_true", help="ファイル毎の結果を表示しない")
+    args = ap.parse_args(argv)
+    try:
+        parse_backends(args.backend)
+    except ValueError as e:
+        ap.error(str(e))
+
+    if args.multi_doc and args.cache_dir:
+        ap.error("--multi-doc と --cache-dir は併用できません")
+
+    cache = None
+    if args.cache_dir:
+        cache = build_cache.BuildCache(args.cache_dir, int(args.cache_max_mb * 1024 * 1024))
+        if args.clear_cache: cache.clear()
+
+    inputs, src_root = collect_inputs(args.src, INPUT_EXTS + (".jsonl",) if args.multi_doc else INPUT_EXTS)
+    start = time.perf_counter()
+    results = run_batch(args.backend, inputs, args.out_dir, src_root,
+                        report=None if args.quiet else print_result,
+                        jobs=args.jobs, chunksize=args.chunksize, concurrent=args.concurrent_backends, cache=cache, memo=args.memo,
+                        multi_doc=args.multi_doc, validate=args.validate)
+    print_summary(results, time.perf_counter() - start)
+    return 1 if any(r.error for r in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
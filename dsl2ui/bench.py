@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成 DSL コーパスによる生成速度のベンチマーク（toJetpackCompose / toSwiftUi）
+
+使い方:
+  ./bench.py                                      # 既定の合成ツリーで両バックエンドを計測
+  ./bench.py --nodes 50000 --depth 10 --fanout 6 --runs 20
+  ./bench.py --mix FRAME=2,TEXT=5,INSTANCE=5,OVERLAY=1,SPACER=1 --repeat 0.2 --visible 0.3
+  ./bench.py --save-baseline bench_baseline.json  # 基準値として保存
+  ./bench.py --baseline bench_baseline.json       # 基準値より遅くなっていれば終了コード 1
+  ./bench.py --write-corpus corpus/ --count 200   # batch.py 用に合成 DSL を書き出す
+
+計測値はバックエンド毎に nodes/sec・bytes/sec・レイテンシのパーセンタイル・ピークメモリ（tracemalloc）。
+乱数は seed 固定なので同じ引数なら同じツリーになる。
+"""
+import sys, os, json, time, math, random, argparse, tracemalloc
+from . import batch
+
+NODE_TYPES = ("FRAME", "TEXT", "INSTANCE", "OVERLAY", "SPACER")
+DEFAULT_MIX = {"FRAME": 3, "TEXT": 4, "INSTANCE": 3, "OVERLAY": 1, "SPACER": 1}
+CONTAINERS = ("FRAME", "OVERLAY")
+
+# 基準値と比べる指標と、大きいほど良いか
+METRICS = {
+    "nodes_per_sec": True,
+    "bytes_per_sec": True,
+    "p50_ms": False,
+    "p90_ms": False,
+    "peak_kb": False,
+}
+
+def parse_mix(spec: str) -> dict:
+    """
+    "FRAME=2,TEXT=5" -> {"FRAME": 2.0, "TEXT": 5.0}（指定のない type は 0）
+    """
+    mix = {}
+    for part in spec.split(","):
+        if not part.strip(): continue
+        k, _, v = part.partition("=")
+        k = k.strip().upper()
+        if k not in NODE_TYPES: raise ValueError(f"unknown node type: {k}")
+        mix[k] = float(v)
+    if not any(mix.values()): raise ValueError("mix の重みがすべて 0")
+    return mix
+
+class CorpusGenerator:
+    def __init__(self, seed: int = 0, components: int = 50):
+        """
+        components: INSTANCE が使うコンポーネント名の種類数
+        """
+        self.rng = random.Random(seed)
+        self.names = [f"Za/{w} {i}" for i, w in
+                      ((i, self.rng.choice(["Button", "Card", "Icon Button", "Badge", "List-Item"])) for i in range(components))]
+
+    def layout(self, frame: bool) -> dict:
+        rng = self.rng
+        out = {}
+        if frame:
+            out["direction"] = rng.choice(["VERTICAL", "HORIZONTAL"])
+            if rng.random() < 0.7: out["spacing"] = rng.choice([4, 8, 12, 16])
+        if rng.random() < 0.5: out["width"] = rng.choice([{"mode": "FILL"}, {"mode": "FIXED", "value": rng.randint(16, 320)}])
+        if rng.random() < 0.3: out["height"] = {"mode": "FIXED", "value": rng.randint(16, 120)}
+        if rng.random() < 0.4: out["padding"] = [rng.choice([0, 8, 16]) for _ in range(4)]
+        return out
+
+    def node(self, t: str, repeat: float, visible: float) -> dict:
+        rng = self.rng
+        if t == "TEXT":
+            n = {"type": "TEXT", "text": "{{item.title}}" if rng.random() < 0.3 else f"Label {rng.randint(0, 999)}"}
+        elif t == "SPACER":
+            n = {"type": "SPACER"}
+        elif t == "INSTANCE":
+            n = {"type": "INSTANCE", "name": rng.choice(self.names),
+                 "props": {"title": f"Item {rng.randint(0, 99)}", "enabled": rng.random() < 0.5, "count": rng.randint(0, 9)}}
+            if rng.random() < 0.5: n["layout"] = self.layout(False)
+        elif t == "OVERLAY":
+            sides = rng.sample(["top", "right", "bottom", "left"], rng.randint(0, 2))
+            n = {"type": "OVERLAY", "position": {s: rng.choice([4, 8, 16]) for s in sides}}
+        else:
+            n = {"type": "FRAME", "layout": self.layout(True), "children": []}
+            if rng.random() < 0.1: n["scroll"] = rng.choice(["vertical", "horizontal"])
+            if rng.random() < repeat: n["repeat"] = {"for": "items", "as": "item"}
+        if rng.random() < visible: n["visible"] = "{{item.visible}}"
+        return n
+
+    def tree(self, nodes: int = 2000, depth: int = 8, fanout: int = 4, mix=None,
+             repeat: float = 0.1, visible: float = 0.1, name: str = "BenchScreen") -> dict:
+        """
+        幅優先でノードを増やし、合計 nodes 個（depth と fanout で収まらなければそれ以下）・深さ depth 以下の画面を作る
+        OVERLAY には必ず子を 1 つ付ける（validate.validate を通る画面になる）
+        fanout: FRAME 1 つあたりの子の数
+        mix: type -> 重み（コンテナは最下段では選ばない）
+        repeat / visible: FRAME に repeat / 各ノードに visible を付ける確率
+        """
+        mix = mix or DEFAULT_MIX
+        types = [t for t in NODE_TYPES if mix.get(t)]
+        weights = [mix[t] for t in types]
+        leaf_types = [t for t in types if t not in CONTAINERS] or ["TEXT"]
+        leaf_weights = [mix.get(t, 1) for t in leaf_types]
+        root = {"type": "FRAME", "name": name, "layout": {"direction": "VERTICAL", "spacing": 12}, "scroll": "vertical",
+                "children": []}
+        queue = [(root, 1)]
+        count = 1
+        head = 0
+        pending = fanout  # 展開待ちのコンテナの空き枠（OVERLAY は 1 枠）
+        owed = 0          # 展開待ちの OVERLAY の数（子を 1 つずつ必ず付けるので予算から取っておく）
+        while head < len(queue) and count < nodes:
+            parent, d = queue[head]
+            head += 1
+            overlay = parent["type"] == "OVERLAY"
+            slots = 1 if overlay else fanout
+            pending -= slots
+            if overlay: owed -= 1
+            for i in range(slots):
+                if count >= nodes - owed: break
+                # 展開待ちのコンテナの空き枠だけでは nodes に届かないなら FRAME にして木を伸ばす
+                room = pending + (slots - i - 1)
+                if d + 1 < depth and room < nodes - count - 1:
+                    t = "FRAME"
+                elif d + 1 < depth:
+                    t = self.rng.choices(types, weights)[0]
+                    # 自分の子を付ける予算が無ければ OVERLAY にしない
+                    if t == "OVERLAY" and count + 2 > nodes - owed:
+                        t = self.rng.choices(leaf_types, leaf_weights)[0]
+                else:
+                    t = self.rng.choices(leaf_types, leaf_weights)[0]
+                child = self.node(t, repeat, visible)
+                count += 1
+                if overlay:
+                    parent["child"] = child
+                else:
+                    parent["children"].append(child)
+                if t in CONTAINERS:
+                    queue.append((child, d + 1))
+                    if t == "OVERLAY":
+                        pending += 1
+                        owed += 1
+                    else:
+                        pending += fanout
+        return root
+
+def count_nodes(tree: dict):
+    """
+    (ノード数, 最大深さ)
+    """
+    count, max_depth = 0, 0
+    stack = [(tree, 1)]
+    while stack:
+        n, d = stack.pop()
+        count += 1
+        max_depth = max(max_depth, d)
+        for ch in n.get("children") or []: stack.append((ch, d + 1))
+        if n.get("child"): stack.append((n["child"], d + 1))
+    return count, max_depth
+
+def percentile(sorted_values, p: float) -> float:
+    # nearest-rank
+    if not sorted_values: return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+def bench_backend(backend, tree: dict, runs: int = 10, warmup: int = 1, memory: bool = True) -> dict:
+    """
+    backend.convert(tree) を runs 回計測する
+    """
+    nodes, depth = count_nodes(tree)
+    for _ in range(warmup): backend.convert(tree)
+    times = []
+    size = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        text = backend.convert(tree)
+        times.append(time.perf_counter() - start)
+        size = len(text.encode("utf-8"))
+    times.sort()
+    total = sum(times)
+    peak = 0
+    if memory:
+        # tracemalloc は計測を遅くするので別に 1 回だけ
+        tracemalloc.start()
+        try:
+            backend.convert(tree)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {
+        "nodes": nodes,
+        "depth": depth,
+        "bytes": size,
+        "runs": runs,
+        "nodes_per_sec": nodes * runs / total if total else 0.0,
+        "bytes_per_sec": size * runs / total if total else 0.0,
+        "p50_ms": percentile(times, 50) * 1000,
+        "p90_ms": percentile(times, 90) * 1000,
+        "p99_ms": percentile(times, 99) * 1000,
+        "peak_kb": peak / 1024,
+    }
+
+def parse_backends(spec) -> list:
+    """
+    "compose" / "compose,compose-stable" / "all" / リストをバックエンド名のリストに正規化（未知の名前は ValueError）
+    ファイルを書き出さないので、batch.parse_backends と違い拡張子が同じバックエンドも並べて計測できる
+    """
+    if isinstance(spec, str):
+        spec = list(batch.ALL) if spec == "all" else [s.strip() for s in spec.split(",") if s.strip()]
+    names = list(dict.fromkeys(spec))
+    for name in names: batch.load_backend(name)
+    return names
+
+def run(backend_names, tree: dict, runs: int = 10, warmup: int = 1, memory: bool = True) -> dict:
+    return {name: bench_backend(batch.load_backend(name), tree, runs, warmup, memory)
+            for name in parse_backends(backend_names)}
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.2) -> list:
+    """
+    基準値から tolerance（割合）を超えて悪化した指標のメッセージのリスト
+    """
+    regressions = []
+    for name, cur in results.items():
+        base = baseline.get(name)
+        if not base: continue
+        for metric, higher_is_better in METRICS.items():
+            b, c = base.get(metric), cur.get(metric)
+            if not b or c is None: continue
+            ratio = c / b
+            if (higher_is_better and ratio < 1 - tolerance) or (not higher_is_better and ratio > 1 + tolerance):
+                regressions.append(f"{name}.{metric}: {c:.1f} (baseline {b:.1f}, {ratio - 1:+.0%})")
+    return regressions
+
+def print_results(results: dict, baseline=None, out=None):
+    out = out or sys.stdout
+    w = max([len("backend")] + [len(name) for name in results])
+    print(f"{'backend':{w}} {'nodes':>8} {'depth':>5} {'KB':>8} {'knodes/s':>10} {'MB/s':>8} "
+          f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'peak KB':>9}", file=out)
+    for name, r in results.items():
+        print(f"{name:{w}} {r['nodes']:8d} {r['depth']:5d} {r['bytes'] / 1024:8.1f} {r['nodes_per_sec'] / 1000:10.1f} "
+              f"{r['bytes_per_sec'] / (1 << 20):8.2f} {r['p50_ms']:8.2f} {r['p90_ms']:8.2f} {r['p99_ms']:8.2f} "
+              f"{r['peak_kb']:9.0f}", file=out)
+        base = (baseline or {}).get(name)
+        if base:
+            diffs = [f"{m} {r[m] / base[m] - 1:+.0%}" for m in METRICS if base.get(m)]
+            print(f"{'':{w}} vs baseline: {', '.join(diffs)}", file=out)
+
+def write_corpus(out_dir: str, count: int, gen: CorpusGenerator, **tree_args) -> list:
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = os.path.join(out_dir, f"screen_{i:05d}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(gen.tree(name=f"Screen {i}", **tree_args), f, ensure_ascii=False)
+        paths.append(path)
+    return paths
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="合成 DSL で emit_node の速度を計測")
+    ap.add_argument("--backend", default="all", help="compose / swiftui / compose,compose-stable / all（既定 all）")
+    ap.add_argument("--nodes", type=int, default=5000, help="ノード総数（既定 5000）")
+    ap.add_argument("--depth", type=int, default=8, help="最大深さ（既定 8）")
+    ap.add_argument("--fanout", type=int, default=4, help="FRAME あたりの子の数（既定 4）")
+    ap.add_argument("--mix", default="", help="type の重み 例: FRAME=3,TEXT=4,INSTANCE=3,OVERLAY=1,SPACER=1")
+    ap.add_argument("--repeat", type=float, default=0.1, help="FRAME に repeat を付ける確率")
+    ap.add_argument("--visible", type=float, default=0.1, help="ノードに visible を付ける確率")
+    ap.add_argument("--seed", type=int, default=0, help="乱数シード")
+    ap.add_argument("--runs", type=int, default=10, help="計測回数")
+    ap.add_argument("--warmup", type=int, default=1, help="計測前の空回し回数")
+    ap.add_argument("--no-memory", action="store_true", help="ピークメモリを計測しない")
+    ap.add_argument("--baseline", help="比較する基準値 JSON（悪化があれば終了コード 1）")
+    ap.add_argument("--tolerance", type=float, default=0.2, help="悪化とみなす割合（既定 0.2）")
+    ap.add_argument("--save-baseline", help="結果を基準値 JSON として保存")
+    ap.add_argument("--json", help="結果を JSON で書き出す")
+    ap.add_argument("--write-corpus", metavar="DIR", help="計測せず合成 DSL を DIR に書き出す")
+    ap.add_argument("--count", type=int, default=100, help="--write-corpus で書き出す画面数")
+    args = ap.parse_args(argv)
+    try:
+        mix = parse_mix(args.mix) if args.mix else None
+        names = parse_backends(args.backend)
+    except ValueError as e:
+        ap.error(str(e))
+
+    gen = CorpusGenerator(args.seed)
+    tree_args = dict(nodes=args.nodes, depth=args.depth, fanout=args.fanout, mix=mix,
+                     repeat=args.repeat, visible=args.visible)
+    if args.write_corpus:
+        paths = write_corpus(args.write_corpus, args.count, gen, **tree_args)
+        print(f"wrote {len(paths)} screens to {args.write_corpus}", file=sys.stderr)
+        return 0
+
+    tree = gen.tree(**tree_args)
+    results = run(names, tree, args.runs, args.warmup, not args.no_memory)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    for path in (args.json, args.save_baseline):
+        if not path: continue
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        for msg in regressions: print(f"REGRESSION {msg}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
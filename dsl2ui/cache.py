@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DSL の内容ハッシュをキーにした生成結果のディスクキャッシュ
+
+キー = sha256(バックエンド名 + GENERATOR_VERSION + wrap_file テンプレートの指紋 + DSL の生バイト)
+キーが一致すれば emit_node を呼ばずに前回の .kt/.swift をそのまま再利用する。
+wrap_file のテンプレートや GENERATOR_VERSION が変われば指紋が変わるので自動的に無効化される。
+
+エントリはファイル 1 つずつで、mtime を最終利用時刻として使う（ヒット時に更新）。
+サイズ上限を超えた分は prune() で古い順に削除する（LRU）。
+書き込みは一時ファイル + os.replace なので、並列ワーカーから同時に使っても壊れない。
+
+エントリは <キーの先頭 2 文字>/<キー（16 進 64 文字）> に置く。entries() / prune() / clear() はこの形の
+ファイルだけを数えて消すので、ほかのファイルがあるディレクトリを --cache-dir にしてもそれらは消さない。
+"""
+import os, re, hashlib, tempfile
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_fingerprints = {}
+
+def template_fingerprint(backend) -> str:
+    """
+    wrap_file の出力テンプレートの指紋（バックエンド毎に 1 回だけ計算）
+    """
+    name = backend.__name__
+    if name not in _fingerprints:
+        sample = backend.wrap_file("\x00SCREEN\x00", "\x00BODY\x00")
+        _fingerprints[name] = hashlib.sha256(sample.encode("utf-8")).hexdigest()
+    return _fingerprints[name]
+
+def cache_key(backend_name: str, backend, content: bytes) -> str:
+    h = hashlib.sha256()
+    for part in (backend_name, backend.GENERATOR_VERSION, template_fingerprint(backend)):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    h.update(content)
+    return h.hexdigest()
+
+_KEY = re.compile(r"[0-9a-f]{64}")
+_SUBDIR = re.compile(r"[0-9a-f]{2}")
+
+class BuildCache:
+    def __init__(self, root: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> str:
+        # キャッシュのエントリとして数えられない名前では書かない（prune / clear で消せなくなる）
+        if not _KEY.fullmatch(key): raise ValueError(f"invalid cache key: {key!r}")
+        return os.path.join(self.root, key[:2], key)
+
+    def get(self, key: str):
+        """
+        ヒットすれば生成済みテキスト、なければ None
+        """
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)  # LRU 用に最終利用時刻を更新
+        except OSError:
+            pass
+        return text
+
+    def put(self, key: str, text: str):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp): os.unlink(tmp)
+            raise
+
+    def entries(self):
+        """
+        (mtime, size, path) のリスト（<キーの先頭 2 文字>/<キー> の形のファイルだけ）
+        """
+        out = []
+        if not os.path.isdir(self.root): return out
+        for sub in os.scandir(self.root):
+            if not _SUBDIR.fullmatch(sub.name) or not sub.is_dir(follow_symlinks=False): continue
+            for e in os.scandir(sub.path):
+                if not _KEY.fullmatch(e.name) or e.name[:2] != sub.name or not e.is_file(follow_symlinks=False): continue
+                st = e.stat()
+                out.append((st.st_mtime, st.st_size, e.path))
+        return out
+
+    def prune(self) -> int:
+        """
+        合計サイズが max_bytes 以下になるまで最終利用が古いものから削除
+        戻り値: 削除したエントリ数
+        """
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes: break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> int:
+        entries = self.entries()
+        for _, _, path in entries:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        return len(entries)
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+DSL の JSON デコーダ（toJetpackCompose / toSwiftUi / batch / watch / server 共通）
+
+orjson / msgspec がインストールされていればそれを使い、無ければ標準の json を使う。
+どのデコーダでも読み込み結果（＝生成されるコード）は同じになるよう、高速なデコーダが受け付けない入力
+（64bit を超えうる整数・NaN / Infinity・BOM・不正なサロゲート・深いネストなど）は標準の json で読み直す。
+不正な JSON のエラーも標準の json の json.JSONDecodeError になる。
+
+デコーダは環境変数 DSL2UI_JSON（auto / orjson / msgspec / json、既定は auto）か use() で選ぶ。
+バッチ変換のワーカープロセスにも環境変数で引き継がれる。
+環境変数による選択（と高速なデコーダの import）は最初に必要になるまで行わない。SMALL_INPUT 以下の入力は
+import の方が高くつくので、use() で明示しない限り標準の json で読む（1 画面だけ変換する CLI の起動を速くする）。
+
+JSON のデコードは大量の dict / list を作るだけで循環参照は作らないので、デコード中は GC を止める
+（世代別 GC が何度も走るのを避けるだけで、標準の json でも大きな DSL では 2 倍程度速くなる）。
+"""
+import os, sys, json
+from . import emit_engine
+from . import nodes
+from . import ir
+from . import dsl_binary
+
+AUTO = "auto"
+ORDER = ("orjson", "msgspec", "json")  # auto で試す順
+SMALL_INPUT = 64 << 10                 # これ以下の入力は標準の json で読む（バイト数・文字数）
+
+# 数字を 0 に揃えてから 19 個続く 0 を探す（64bit に収まらないかもしれない整数。正規表現より 1 桁速い）
+_DIGITS = bytes.maketrans(b"123456789", b"0" * 9)
+_LONG_RUN = b"0" * 19
+
+def _orjson():
+    import orjson
+
+    def loads(data):
+        if isinstance(data, str): data = data.encode("utf-8", "surrogatepass")
+        # orjson は 64bit を超える整数を float にして読むので、その可能性があれば標準の json に任せる
+        if bytes(data).translate(_DIGITS).find(_LONG_RUN) >= 0:
+            raise ValueError("integer may exceed 64-bit range")
+        return orjson.loads(data)
+    return loads
+
+def _msgspec():
+    import msgspec
+    return msgspec.json.Decoder().decode
+
+_FACTORIES = {"orjson": _orjson, "msgspec": _msgspec}
+
+def available() -> list:
+    """
+    インストールされているデコーダ名（ORDER の順、json は常に含む）
+    """
+    names = []
+    for name in ORDER:
+        if name == "json" or _load(name) is not None: names.append(name)
+    return names
+
+_loaded = {}
+
+def _load(name: str):
+    if name not in _loaded:
+        try:
+            _loaded[name] = _FACTORIES[name]()
+        except ImportError:
+            _loaded[name] = None
+    return _loaded[name]
+
+_name = None  # 選んだデコーダ名（None はまだ選んでいない）
+_fast = None  # 高速なデコーダの loads（標準の json なら None）
+
+def _selected():
+    # 最初に必要になったときに環境変数のデコーダを選ぶ。高速なデコーダの loads を返す
+    if _name is None:
+        try:
+            use(os.environ.get("DSL2UI_JSON", AUTO))
+        except ValueError as e:
+            print(f"warning: {e}; using {use(AUTO)}", file=sys.stderr)
+    return _fast
+
+def use(name: str = AUTO) -> str:
+    """
+    デコーダを選ぶ（auto はインストールされている中で最も速いもの）。選んだデコーダ名を返す
+    """
+    global _name, _fast
+    if name == AUTO:
+        # 見つかった時点で止める（インストールされている他のデコーダは import しない）
+        name = next(n for n in ORDER if n == "json" or _load(n) is not None)
+    elif name not in ORDER:
+        raise ValueError(f"unknown JSON decoder: {name} (choose from {', '.join((AUTO,) + ORDER)})")
+    fast = None if name == "json" else _load(name)
+    if name != "json" and fast is None:
+        raise ValueError(f"JSON decoder {name} is not installed")
+    _name, _fast = name, fast
+    return name
+
+def name() -> str:
+    """
+    使用中のデコーダ名
+    """
+    _selected()
+    return _name
+
+def has_fast() -> bool:
+    """
+    高速なデコーダ（orjson / msgspec）を使っているか
+    """
+    return _selected() is not None
+
+def fast_loads(data):
+    """
+    高速なデコーダだけで読む（使えない・受け付けない入力なら例外。dsl_stream の行単位の高速パス用）
+    """
+    fast = _selected()
+    if fast is None: raise ValueError("no fast JSON decoder")
+    with nodes.gc_paused():
+        return fast(data)
+
+def loads(data):
+    """
+    str / bytes の JSON を読み込む（結果はどのデコーダでも json.loads と同じ）
+    """
+    fast = _fast if _name is not None or len(data) <= SMALL_INPUT else _selected()
+    with nodes.gc_paused():
+        if fast is not None:
+            try:
+                return fast(data)
+            except Exception:
+                # 高速なデコーダが受け付けない入力は標準の json で読み直す（不正な JSON ならここでエラー）
+                pass
+        return emit_engine.loads_deep(data)
+
+def load_screen(data) -> ir.Screen:
+    """
+    1 画面分の JSON を読み込み、両バックエンド共通の ir.Screen まで変換する（dict のツリーは lowering の間だけ保持）
+    DSL はオブジェクトでなければ ValueError
+    dsl_binary のバイナリ（bytes）なら JSON の解析をせずにそのまま lowering する（画面が 1 つでなければ ValueError）
+    """
+    if dsl_binary.is_binary(data):
+        doc = dsl_binary.loads(data)
+        if len(doc.roots) != 1: raise ValueError(f"DSL binary has {len(doc.roots)} screens (expected 1)")
+        return ir.screen(doc.root)
+    dsl = loads(data)
+    if not isinstance(dsl, dict): raise ValueError("DSL must be a JSON object")
+    return ir.screen(dsl)
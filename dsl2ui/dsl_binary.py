@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+事前に解析済みの DSL バイナリ形式（.dslb）
+
+同じ DSL のスナップショットを何度も変換するとき、毎回 JSON のテキストを解析し直さずに済むように、
+DSL をノードテーブル + 文字列テーブルのバイナリに変換しておく。
+
+使い方:
+  ./dsl_binary.py dsl/home.json out/home.dslb       # 1 画面 / JSON Lines / 画面の配列を変換
+  ./toJetpackCompose.py out/home.dslb               # 各変換器・batch・watch・server はそのまま読める
+
+ファイルの構成（整数はすべてリトルエンディアンの u32）:
+  ヘッダ   MAGIC, VERSION, ノード数, 画面数, 値テーブルのバイト数
+  画面     各画面のルートのノード番号
+  ノード   1 ノード 12 語: type, name, text, visible, layout, props, position, scroll, repeat,
+           最初の子の番号, 子の数, OVERLAY の child の番号
+  値       値の数 N、ブロックの開始オフセット（ブロック数 + 1 個、最後は終端）、ブロックを並べた本体
+           （値を _BLOCK 個ずつ 1 つの JSON 配列（UTF-8）にしたものがブロック）
+
+ノードは幅優先で並べるので、子は連続した番号になる（最初の子の番号と数だけで表せる）。
+フィールドは値テーブルの番号で、0 は「無い」（値テーブルの先頭は null）。child の番号も 0 なら無し。
+同じ値は 1 つにまとめるので、同じ layout や props の解析は読み込み側でも 1 回で済む。
+値テーブルはブロック毎のオフセットで引けるので、値は最初に参照したときにその値を含むブロックだけをデコードする
+（画面の一部だけを使うときや大きなファイルの読み始めに、全体の JSON を解析しない）。
+値 1 つずつの JSON にすると loads の呼び出しの固定費で全体の変換が 1.5 倍近く遅くなるので、ブロックにまとめる
+（それでも全体を変換するときは値テーブルを 1 回でデコードしていたときより 5〜10% 遅い。README の計測を参照）。
+
+load() はファイルを mmap するだけでコピーも解析もしない（読み込みにかかる時間はサイズによらずほぼ 0）。
+ノードテーブルは mmap をそのまま u32 の配列として読む。
+ノードは nodes.Node のサブクラスで、children / child を参照したときに初めてその子を作る
+（変換器が訪れた部分木だけが Python のオブジェクトになる）。
+ir.lower() にルートを渡すと Node を作らずテーブルから直接 IR にする。テーブルの内容が同じ葉
+（TEXT / SPACER / INSTANCE）は同じ IR の要素を共有する（IR は変換器から書き換えられないので共有してよい）。
+"""
+import sys, os, json, mmap, struct
+from . import nodes
+from . import ir
+from . import decoder
+from .nodes import FRAME, TEXT, INSTANCE, OVERLAY, SPACER, VERTICAL, HORIZONTAL
+
+MAGIC = b"DSLB"
+VERSION = 2
+EXT = ".dslb"
+
+_HEADER = struct.Struct("<4sIIII")  # MAGIC, VERSION, ノード数, 画面数, 値テーブルのバイト数
+_WORDS = 12                         # 1 ノードの語数
+_FIELDS = ("type", "name", "text", "visible", "layout", "props", "position", "scroll", "repeat")
+_BLOCK = 64                         # 値テーブルの 1 ブロックの値の数
+
+def is_binary(data) -> bool:
+    """
+    data（bytes / str）がバイナリ形式か
+    """
+    return data[:len(MAGIC)] == MAGIC
+
+class _Values:
+    # 値テーブルの構築（同じ値は同じ番号、0 は null）
+    def __init__(self):
+        self.index = {}
+        self.values = [None]
+
+    def ref(self, v) -> int:
+        if v is None: return 0
+        # 文字列以外は JSON のテキストで同じ値か判定する（1 と 1.0、True と 1 を区別する）
+        key = v if v.__class__ is str else (json.dumps(v, separators=(",", ":")),)
+        i = self.index.get(key)
+        if i is None:
+            i = self.index[key] = len(self.values)
+            self.values.append(v)
+        return i
+
+    def encode(self) -> bytes:
+        values = self.values
+        blocks = [_encode_block(values[i:i + _BLOCK]) for i in range(0, len(values), _BLOCK)]
+        offsets = [0]
+        for b in blocks: offsets.append(offsets[-1] + len(b))
+        return struct.pack(f"<{len(offsets) + 1}I", len(values), *offsets) + b"".join(blocks)
+
+def _encode_block(values) -> bytes:
+    try:
+        return json.dumps(values, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    except UnicodeEncodeError:  # 対になっていないサロゲートは \ud800 のようにエスケープする
+        return json.dumps(values, separators=(",", ":")).encode("ascii")
+
+class _ValueTable(dict):
+    # 値の番号 -> 値。無い番号は参照されたときにそのブロックだけデコードして覚える（ヒットは dict の参照だけ）
+    __slots__ = ("_view", "_offsets", "_base", "_count")
+
+    def __init__(self, view, offsets, base, count):
+        super().__init__()
+        self[0] = None
+        self._view, self._offsets, self._base, self._count = view, offsets, base, count
+
+    def __missing__(self, i):
+        if not 0 <= i < self._count: raise ValueError("broken DSL binary value table")
+        b, base = i // _BLOCK, self._base
+        data = self._view[base + self._offsets[b]:base + self._offsets[b + 1]].tobytes()
+        try:
+            values = decoder.loads(data)
+        except ValueError:
+            values = None
+        first = b * _BLOCK
+        if values.__class__ is not list or len(values) != min(_BLOCK, self._count - first):
+            raise ValueError("broken DSL binary value table")
+        for k, v in enumerate(values, first): self[k] = v
+        return self[i]
+
+def compile_documents(docs) -> bytes:
+    """
+    DSL（dict）の並びを 1 つのバイナリにする（複数画面のファイルは画面毎にルートを持つ）
+    オブジェクトでない画面・ノード、リストでない children は ValueError
+    """
+    values = _Values()
+    ref = values.ref
+    table, roots = [], []
+    for dsl in docs:
+        if dsl.__class__ is not dict: raise ValueError("DSL must be a JSON object")
+        roots.append(len(table))
+        table.append(None)
+        queue = [(dsl, roots[-1])]
+        i = 0
+        # 幅優先で番号を振る（子は連続した番号になる）
+        while i < len(queue):
+            d, idx = queue[i]
+            i += 1
+            first = count = child = 0
+            kids = d.get("children")
+            if kids:
+                if kids.__class__ is not list: raise ValueError("children must be an array")
+                first, count = len(table), len(kids)
+                for k in kids:
+                    if k.__class__ is not dict: raise ValueError("child nodes must be JSON objects")
+                    queue.append((k, len(table)))
+                    table.append(None)
+            ch = d.get("child")
+            if ch:
+                if ch.__class__ is not dict: raise ValueError("OVERLAY child must be a JSON object")
+                child = len(table)
+                queue.append((ch, child))
+                table.append(None)
+            table[idx] = [ref(d.get(f)) for f in _FIELDS] + [first, count, child]
+    body = values.encode()
+    words = [w for rec in table for w in rec]
+    return b"".join([_HEADER.pack(MAGIC, VERSION, len(table), len(roots), len(body)),
+                     struct.pack(f"<{len(roots)}I", *roots), struct.pack(f"<{len(words)}I", *words), body])
+
+def compile_dsl(dsl) -> bytes:
+    """
+    1 画面の DSL（dict）をバイナリにする
+    """
+    return compile_documents([dsl])
+
+def compile_file(src: str, dst: str) -> int:
+    """
+    JSON の DSL ファイル（1 画面 / JSON Lines / 画面の配列）を dst に書き出す。画面数を返す
+    """
+    from . import dsl_stream
+    data = compile_documents(dsl_stream.open_documents(src))
+    tmp = dst + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, dst)
+    return _HEADER.unpack_from(data)[3]
+
+class Node(nodes.Node):
+    """
+    バイナリ上のノード（children / child は参照したときに作る）
+    """
+    __slots__ = ("_doc", "_index")
+
+    @property
+    def children(self):
+        doc, base = self._doc, self._index * _WORDS
+        first, count = doc.table[base + 9], doc.table[base + 10]
+        return tuple([doc.node(i) for i in range(first, first + count)])
+
+    @property
+    def child(self):
+        i = self._doc.table[self._index * _WORDS + 11]
+        return self._doc.node(i) if i else None
+
+    def to_dict(self) -> dict:
+        """
+        このノード以下を JSON と同じ dict に戻す（validate 用）
+        """
+        return self._doc.to_dict(self._index)
+
+def _lower(n: Node, flow_dir):
+    return n._doc.lower(n._index, flow_dir)
+
+class Document:
+    """
+    バイナリ（mmap / bytes などのバッファ）。with で閉じられる
+    table: ノードテーブル（u32 の配列、バッファをコピーせずに読む）
+    """
+
+    def __init__(self, buf, owner=None):
+        self._owner = owner  # 閉じるもの（mmap）
+        if len(buf) < _HEADER.size: raise ValueError("not a DSL binary file")
+        magic, version, n_nodes, n_roots, n_values = _HEADER.unpack_from(buf)
+        if magic != MAGIC: raise ValueError("not a DSL binary file")
+        if version != VERSION: raise ValueError(f"unsupported DSL binary version: {version}")
+        start = _HEADER.size + n_roots * 4
+        end = start + n_nodes * _WORDS * 4
+        if len(buf) < end + n_values: raise ValueError("truncated DSL binary file")
+        self.roots = struct.unpack_from(f"<{n_roots}I", buf, _HEADER.size)
+        self.n_nodes = n_nodes
+        self._view = memoryview(buf)
+        if sys.byteorder == "little":
+            self.table = self._view[start:end].cast("I")
+        else:
+            import array
+            self.table = array.array("I", self._view[start:end])
+            self.table.byteswap()
+        if n_values < 4: raise ValueError("broken DSL binary value table")
+        count = struct.unpack_from("<I", buf, end)[0]
+        base = end + 4 + (-(-count // _BLOCK) + 1) * 4
+        if base > end + n_values: raise ValueError("broken DSL binary value table")
+        offsets = self._view[end + 4:base].cast("I")
+        if sys.byteorder != "little":
+            import array
+            offsets = array.array("I", offsets)
+            offsets.byteswap()
+        if base + offsets[-1] != end + n_values: raise ValueError("broken DSL binary value table")
+        self._offsets = offsets
+        self._values = _ValueTable(self._view, offsets, base, count)
+        self._layouts = {}
+        self._props = {}
+        self._repeats = {}
+        self._leaves = {}  # (テーブルの内容, flow) -> 葉の IR
+
+    @property
+    def values(self):
+        """
+        値テーブル（番号で引く。各値は最初に参照したときにデコードする）
+        """
+        return self._values
+
+    def node(self, i: int) -> Node:
+        """
+        i 番目のノード（子は参照したときに作る）
+        """
+        t, name, text, vis, lay, props, pos, scroll, rp = self.table[i * _WORDS:i * _WORDS + 9]
+        values = self.values
+        n = Node.__new__(Node)
+        n.type = values[t]
+        n.name = values[name]
+        n.text = values[text]
+        n.visible = nodes.binding(values[vis]) if vis else None
+        n.layout = self._layout(lay)
+        n.props = self._props_of(props)
+        n.position = values[pos]
+        n.scroll = values[scroll]
+        n.repeat = self._repeat(rp)
+        n._doc, n._index = self, i
+        return n
+
+    def _layout(self, ref):
+        if not ref: return None
+        try:
+            return self._layouts[ref]
+        except KeyError:
+            layout = self._layouts[ref] = nodes.build_layout(self.values[ref])
+            return layout
+
+    def _props_of(self, ref):
+        if not ref: return ()
+        try:
+            return self._props[ref]
+        except KeyError:
+            d = self.values[ref]
+            props = self._props[ref] = tuple(d.items()) if d else ()
+            return props
+
+    def _repeat(self, ref):
+        if not ref: return None
+        try:
+            return self._repeats[ref]
+        except KeyError:
+            rp = self.values[ref]
+            repeat = self._repeats[ref] = nodes.build_repeat(rp)
+            return repeat
+
+    def lower(self, i: int, flow_dir=None):
+        """
+        i 番目のノード以下を IR にする（ir.lower(Node) と同じ結果。明示スタックで走査する）
+        """
+        table, element = self.table, self._element
+        top = element(i, flow_dir)
+        stack = [(i, top, flow_dir)]
+        while stack:
+            i, el, flow = stack.pop()
+            base = i * _WORDS
+            if el.__class__ is ir.Stack:
+                count = table[base + 10]
+                if count:
+                    fd = el.direction
+                    idx = range(table[base + 9], table[base + 9] + count)
+                    els = tuple([element(j, fd) for j in idx])
+                    el.children = els
+                    stack.extend([(j, e, fd) for j, e in zip(idx, els) if e.__class__ is ir.Stack or e.__class__ is ir.Overlay])
+            elif el.__class__ is ir.Overlay:
+                # child が無いときは type の無いノード（unsupported）
+                j = table[base + 11]
+                if j:
+                    el.child = element(j, flow)
+                    stack.append((j, el.child, flow))
+                else:
+                    el.child = ir.Unsupported(None, None)
+        return top
+
+    def _element(self, i: int, flow):
+        base = i * _WORDS
+        r = self.table[base:base + 9]
+        values = self._values
+        t = values[r[0]]
+        vis = values[r[3]]
+        if vis is not None: vis = nodes.binding(vis)
+        if t == FRAME:
+            layout = self._layout(r[4])
+            repeat = self._repeat(r[8])
+            axis, scroll, lazy = ir.container(layout, values[r[7]], repeat is not None)
+            return ir.Stack(vis, axis, scroll, lazy, layout.direction if layout else None, layout, repeat)
+        if t == OVERLAY:
+            pos = values[r[6]]
+            if pos.__class__ is not dict: pos = {}
+            v, h = ir.alignment(pos)
+            return ir.Overlay(vis, v, h, tuple((e, pos[e]) for e in ir._EDGES if e in pos))
+        key = (r[0], r[1], r[2], r[3], r[4], r[5], flow)
+        el = self._leaves.get(key)
+        if el is not None: return el
+        if t == TEXT:
+            txt = values[r[2]] or ""
+            expr = nodes.binding(txt)
+            el = ir.Text(vis, txt, False) if expr is None else ir.Text(vis, expr, True)
+        elif t == SPACER:
+            el = ir.Spacer(vis, HORIZONTAL if flow == HORIZONTAL else VERTICAL)
+        elif t == INSTANCE:
+            name = values[r[1]]
+            props = tuple([(k,) + ir.prop_value(v) for k, v in self._props_of(r[5])])
+            el = ir.Instance(vis, name if name is not None else "Unknown", props, self._layout(r[4]))
+        else:
+            el = ir.Unsupported(vis, t)
+        self._leaves[key] = el
+        return el
+
+    def to_dict(self, i: int) -> dict:
+        """
+        i 番目のノード以下を dict に戻す（明示スタックで走査する）
+        バイナリに無いもの（_FIELDS 以外のキー・null のフィールド・空の children）は戻らない
+        """
+        table, values = self.table, self.values
+
+        def fields(j):
+            return {f: values[v] for f, v in zip(_FIELDS, table[j * _WORDS:j * _WORDS + 9]) if v}
+        top = fields(i)
+        stack = [(i, top)]
+        while stack:
+            j, d = stack.pop()
+            base = j * _WORDS
+            first, count, child = table[base + 9], table[base + 10], table[base + 11]
+            if count:
+                kids = d["children"] = [fields(k) for k in range(first, first + count)]
+                stack.extend(zip(range(first, first + count), kids))
+            if child:
+                d["child"] = fields(child)
+                stack.append((child, d["child"]))
+        return top
+
+    def documents(self) -> list:
+        """
+        各画面のルート
+        """
+        return [self.node(i) for i in self.roots]
+
+    @property
+    def root(self) -> Node:
+        """
+        最初の画面のルート
+        """
+        if not self.roots: raise ValueError("DSL binary file has no screens")
+        return self.node(self.roots[0])
+
+    def close(self):
+        # mmap を閉じる前にバッファを参照している memoryview を解放する
+        if self.table.__class__ is memoryview: self.table.release()
+        if self._offsets.__class__ is memoryview: self._offsets.release()
+        self._view.release()
+        if self._owner is not None:
+            self._owner.close()
+            self._owner = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+ir.LOWERERS[Node] = _lower
+
+def loads(data) -> Document:
+    """
+    読み込み済みのバイナリ（bytes / bytearray / memoryview）から Document を作る（コピーしない）
+    """
+    return Document(data)
+
+def load(path: str) -> Document:
+    """
+    path を mmap して Document を作る（空のファイルは ValueError）
+    """
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise ValueError("not a DSL binary file") from None
+    try:
+        return Document(mm, mm)
+    except Exception:
+        mm.close()
+        raise
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="DSL の JSON を事前解析済みのバイナリ（.dslb）に変換")
+    ap.add_argument("src", help="DSL の JSON（1 画面 / JSON Lines / 画面の配列）")
+    ap.add_argument("dst", nargs="?", help=f"出力ファイル（既定は src の拡張子を {EXT} にしたもの）")
+    args = ap.parse_args(argv)
+    dst = args.dst or os.path.splitext(args.src)[0] + EXT
+    try:
+        n = compile_file(args.src, dst)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    print(f"{args.src} -> {dst} ({n} screens)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
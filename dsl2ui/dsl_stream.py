@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+複数画面の DSL を 1 画面ずつ読み込むストリーミング入力（toJetpackCompose / toSwiftUi / batch 共通）
+
+対応する入力:
+  - 1 画面の JSON オブジェクト（従来どおり）
+  - JSON Lines / 空白区切りで連結したオブジェクト列
+  - 画面オブジェクトのトップレベル配列 [{...}, {...}, ...]
+
+入力はチャンク単位で読み、json.JSONDecoder.raw_decode で 1 画面分ずつ切り出して yield する。
+読み込み済みで未使用のテキストと、いま処理中の 1 画面分のツリーしか保持しないので、
+ピークメモリは書き出し全体ではなく最大の 1 画面で決まる。
+小さいファイル（WHOLE_FILE_LIMIT 以下）で先頭が "{" なら、まず 1 行目だけを decoder で読む。
+読めれば改行の無い 1 画面か JSON Lines なので、残りはストリーミングで読む（JSON Lines のファイル全体は読み込まない）。
+1 行目で閉じていなければ整形された 1 画面とみなしてファイル全体を decoder で読む
+（raw_decode でチャンク毎に読み直さずに済む）。それでも読めなければ（整形された画面の連結や不正な JSON）、
+読み込んだテキストを捨ててファイルの先頭からストリーミングで読む。
+1 行に 1 画面（JSON Lines、配列の 1 行 1 要素、改行の無い 1 画面）の行は decoder の高速なデコーダで読み、
+受け付けられなければ（整形された複数行の画面など）raw_decode で読む。どちらでも結果は同じ。
+"""
+import io, os, json, re
+from . import emit_engine
+from . import decoder
+from . import dsl_binary
+from . import nodes
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+# ファイル全体を 1 画面として読んでみる上限（バイト）
+WHOLE_FILE_LIMIT = 64 << 20
+
+_WS = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+def _raw_decode(buf: str, pos: int):
+    try:
+        with nodes.gc_paused():
+            return _decoder.raw_decode(buf, pos)
+    except RecursionError:
+        # 深い DSL は emit_engine.loads_deep と同じくスタックを確保したスレッドで再試行
+        return emit_engine.call_deep(_decoder.raw_decode, buf, pos)
+
+_MISSING = object()
+
+class _Reader:
+    __slots__ = ("f", "chunk_size", "buf", "pos", "eof")
+
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """
+        チャンクを追加で読む。未使用分の長さ以上を読むので 1 画面の再デコードは償却で線形
+        """
+        data = self.f.read(max(self.chunk_size, len(self.buf) - self.pos))
+        if isinstance(data, (bytes, bytearray)):
+            raise TypeError("iter_documents にはテキストモードのファイルを渡してください")
+        if not data:
+            self.eof = True
+        # 使用済みの前方を捨てる（1 画面処理する度ではなく読み足すときだけコピーする）
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+
+    def peek(self) -> str:
+        """
+        空白を読み飛ばして次の 1 文字を返す（入力の終わりなら ""）
+        """
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf): return self.buf[self.pos]
+            if self.eof: return ""
+            self.fill()
+
+    def line_value(self, extend: bool):
+        """
+        次の行（末尾の "," は配列の区切りとして除く）を高速なデコーダで読む。読めなければ _MISSING
+        extend: 行の終わりまで読み足す（配列の中では 1 行に全要素が並んでいることがあるので読み足さない）
+        """
+        end = self.buf.find("\n", self.pos)
+        if end < 0 and not self.eof and not extend: return _MISSING
+        while end < 0 and not self.eof:
+            seen = len(self.buf) - self.pos
+            self.fill()
+            end = self.buf.find("\n", seen)
+        body = self.buf[self.pos:end if end >= 0 else len(self.buf)].rstrip()
+        if body.endswith(","): body = body[:-1]
+        try:
+            obj = decoder.fast_loads(body)
+        except Exception:
+            return _MISSING
+        self.pos += len(body)
+        return obj
+
+    def value(self, in_array: bool = False):
+        # 残りが小さければ高速なデコーダは使わない（import の方が高くつく）
+        if len(self.buf) - self.pos > decoder.SMALL_INPUT and decoder.has_fast():
+            obj = self.line_value(not in_array)
+            if obj is not _MISSING: return obj
+        while True:
+            try:
+                obj, end = _raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # 途中で切れているだけかもしれないので、読み足せる限り読み足して再試行
+                if self.eof: raise
+                self.fill()
+                continue
+            if end == len(self.buf) and not self.eof and not isinstance(obj, (dict, list)):
+                # 数値などは次のチャンクに続きがありうる
+                self.fill()
+                continue
+            self.pos = end
+            return obj
+
+    def error(self, msg: str):
+        return json.JSONDecodeError(msg, self.buf, self.pos)
+
+class _Prefixed:
+    # 先に読んだ head を返してから残りを f から読む（read(size) だけ実装）
+    def __init__(self, head: str, f):
+        self.head, self.f = head, f
+
+    def read(self, size: int) -> str:
+        if self.head:
+            out, self.head = self.head, ""
+            return out
+        return self.f.read(size)
+
+def iter_documents(f, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    テキストモードのファイル f から DSL を 1 画面ずつ yield する
+    不正な JSON は json.JSONDecodeError（それまでの画面は yield 済み）
+    """
+    r = _Reader(f, chunk_size)
+    c = r.peek()
+    if c == "[":
+        # トップレベル配列: 要素を 1 つずつ取り出す
+        r.pos += 1
+        if r.peek() == "]":
+            r.pos += 1
+        else:
+            while True:
+                if not r.peek(): raise r.error("Unterminated array")
+                yield r.value(in_array=True)
+                c = r.peek()
+                r.pos += 1
+                if c == "]": break
+                if c != ",": raise r.error("Expecting ',' delimiter")
+        if r.peek(): raise r.error("Extra data")
+        return
+    # 単一オブジェクト / JSON Lines / 連結オブジェクト
+    while c:
+        yield r.value()
+        c = r.peek()
+
+def open_documents(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    path の DSL を 1 画面ずつ yield する（UTF-8、BOM 付きも可）
+    dsl_binary のバイナリなら mmap して各画面のルート（dsl_binary.Node）を yield する
+    """
+    with io.open(path, "rb") as f:
+        binary = dsl_binary.is_binary(f.read(len(dsl_binary.MAGIC)))
+    if binary:
+        with dsl_binary.load(path) as doc:
+            for i in doc.roots:
+                yield doc.node(i)
+        return
+    with io.open(path, "r", encoding="utf-8-sig") as f:
+        head = f.read(chunk_size)
+        start = _WS.match(head).end()
+        if head[start:start + 1] != "{" or os.path.getsize(path) > WHOLE_FILE_LIMIT:
+            yield from iter_documents(_Prefixed(head, f), chunk_size)
+            return
+        head, end = _read_line(f, head, start, chunk_size)
+        try:
+            doc = decoder.loads(head[start:end])
+        except ValueError:  # 1 行目で閉じていない（整形された画面）・不正な JSON
+            doc = None
+        if doc is not None:
+            yield doc
+            r = _Reader(_Prefixed(head[end:], f), chunk_size)
+            while r.peek():
+                yield r.value()
+            return
+        text = head + f.read()
+        head = None
+        try:
+            doc = decoder.loads(text)
+        except ValueError:  # 整形された画面の連結など（不正な JSON もストリーミング側でエラーにする）
+            doc = None
+        if doc is not None:
+            yield doc
+            return
+        text = None
+        f.seek(0)
+        yield from iter_documents(f, chunk_size)
+
+def _read_line(f, head: str, start: int, chunk_size: int):
+    """
+    head の start から始まる行の終わり（改行かファイルの終わり）まで f から読み足す。(head, 行の終わり) を返す
+    """
+    end = head.find("\n", start)
+    if end >= 0: return head, end
+    parts = [head]
+    while True:
+        data = f.read(chunk_size)
+        if not data:
+            head = "".join(parts)
+            return head, len(head)
+        parts.append(data)
+        n = data.find("\n")
+        if n >= 0:
+            head = "".join(parts)
+            return head, len(head) - len(data) + n
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+明示スタックによるツリー走査エンジン（toJetpackCompose / toSwiftUi 共通）
+
+各変換器はノード 1 つ分の展開関数 expand(n, level, flow_dir, bare) だけを持ち、
+戻り値は「出力文字列」と「子タスク (node, level, flow_dir, bare)」を出力順に並べたシーケンス。
+エンジンはそれをスタックに積んで順に処理するので、Python の再帰を使わずどれだけ深いツリーでも生成できる。
+bare=True は visible ガードを処理済みであることを表す（{**n, "visible": None} のコピーを作らない）。
+"""
+import sys, json
+
+class _Capture:
+    # メモ化用: このマーカーまでに出力された文字列が 1 ノード分の断片
+    __slots__ = ("key", "start", "level")
+
+    def __init__(self, key, start, level):
+        self.key, self.start, self.level = key, start, level
+
+def iter_chunks(root, level, flow_dir, expand, memo=None):
+    """
+    出力文字列の断片を順に yield する
+    memo: FragmentMemo。対象ノードはヒットすれば展開せず再インデントした断片を返し、
+          ミスなら展開中の出力を記録して level 0 に戻した断片を保存する
+          （記録は一番外側の 1 つだけ。その内側はヒットすれば使うが記録はしない）
+    """
+    stack = [(root, level, flow_dir, False)]
+    rec = []       # 記録中の出力（記録中のノードがあるときだけ追記）
+    recording = 0  # 記録中のノード数
+    while stack:
+        op = stack.pop()
+        if op.__class__ is str:
+            if recording: rec.append(op)
+            yield op
+            continue
+        if op.__class__ is _Capture:
+            memo.put(op.key, memo.dedent("".join(rec[op.start:]), op.level))
+            recording -= 1
+            if not recording: rec.clear()
+            continue
+        n, lv, fd, bare = op
+        if memo is not None and (n.get("type") if n.__class__ is dict else n.type) in memo.types:
+            key = memo.key(n, fd, bare)
+            if key is not None:
+                frag = memo.get(key)
+                if frag is not None:
+                    frag = memo.reindent(frag, lv)
+                    if recording: rec.append(frag)
+                    yield frag
+                    continue
+                # 記録中の断片の内側は記録しない（入れ子の数だけ同じ出力を写すと深いツリーで 2 乗になる）
+                if not recording:
+                    stack.append(_Capture(key, len(rec), lv))
+                    recording += 1
+        ops = expand(n, lv, fd, bare)
+        stack.extend(reversed(ops))
+
+def emit(root, level, flow_dir, expand, memo=None) -> str:
+    if memo is not None:
+        return "".join(iter_chunks(root, level, flow_dir, expand, memo))
+    # メモ無しの高速パス（ジェネレータを介さずリストに直接積む）
+    out = []
+    push = out.append
+    stack = [(root, level, flow_dir, False)]
+    pop, extend = stack.pop, stack.extend
+    while stack:
+        op = pop()
+        if op.__class__ is str:
+            push(op)
+        else:
+            extend(reversed(expand(*op)))
+    return "".join(out)
+
+def write_chunks(chunks, write, buffer_size: int = 64 * 1024):
+    """
+    断片を buffer_size 程度にまとめて write(str) に渡す（細かい write の連発を避けつつメモリは一定）
+    """
+    buf = []
+    size = 0
+    for c in chunks:
+        buf.append(c)
+        size += len(c)
+        if size >= buffer_size:
+            write("".join(buf))
+            buf.clear()
+            size = 0
+    if buf: write("".join(buf))
+
+def lines(head, items, tail):
+    """
+    "\\n".join([head] + items + [tail]) と同じ出力になる操作列（items には子タスクを含められる）
+    """
+    ops = [head]
+    for it in items:
+        ops.append("\n")
+        ops.append(it)
+    ops.append("\n")
+    ops.append(tail)
+    return ops
+
+def loads_deep(data):
+    """
+    json.loads は入れ子の深さだけ C レベルで再帰するため、深い DSL では RecursionError になる。
+    その場合は深さに見合うスタックを確保したスレッドで再帰上限を上げて再試行する
+    """
+    try:
+        return json.loads(data)
+    except RecursionError:
+        pass
+    return call_deep(json.loads, data)
+
+def call_deep(func, data, *args):
+    """
+    func(data, *args) を data の入れ子の深さに見合うスタックと再帰上限を持つスレッドで実行する
+    """
+    if isinstance(data, (bytes, bytearray)):
+        depth = data.count(b"{") + data.count(b"[")
+    else:
+        depth = data.count("{") + data.count("[")
+    # 1 段あたり数百バイト程度なので余裕を見て 1KB / 段（ページ境界に切り上げ）
+    stack = min(max(32 << 20, depth * 1024), 2 << 30)
+    stack = (stack + 0xFFFF) & ~0xFFFF
+    result = {}
+
+    def run():
+        sys.setrecursionlimit(max(sys.getrecursionlimit(), depth + 1000))
+        try:
+            result["value"] = func(data, *args)
+        except BaseException as e:
+            result["error"] = e
+
+    import threading  # 深い入力のときだけ必要（起動時には読み込まない）
+    old_limit = sys.getrecursionlimit()
+    old_stack = threading.stack_size(stack)
+    try:
+        t = threading.Thread(target=run)
+        t.start()
+        t.join()
+    finally:
+        threading.stack_size(old_stack)
+        sys.setrecursionlimit(old_limit)
+    if "error" in result: raise result["error"]
+    return result["value"]
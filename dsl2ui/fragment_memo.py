@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+同一サブツリーの生成結果をメモ化する（toJetpackCompose / toSwiftUi 共通）
+
+デザインシステムの書き出しでは同じカード FRAME や同じ props の INSTANCE が何百回も現れるので、
+ノード内容 + flow_dir をキーに level 0 相当の断片を保持し、呼び出し位置の level に合わせて
+インデントし直して返す。生成される各行は必ず indent(level) で始まるため、行頭の付け外しだけで
+その level で生成した場合と同じ文字列になる。走査は emit_engine.iter_chunks が行う。
+"""
+import json, hashlib
+from . import ir
+from collections import OrderedDict
+
+class FragmentMemo:
+    def __init__(self, backend: str = "", types=("FRAME", "INSTANCE"), max_entries: int = 4096, unit: str = "  "):
+        """
+        backend: キーに含めるバックエンド名（1 つのメモを複数バックエンドで共有しても混ざらない）
+        types: メモ化対象のノード type
+        max_entries: 保持する断片数の上限（超えたら最も使われていないものから捨てる）
+        unit: インデント 1 段分の文字列（各変換器の indent(1) と同じ）
+        """
+        self.backend = backend
+        self.types = frozenset(types)
+        self.max_entries = max_entries
+        self.unit = unit
+        self.hits = 0
+        self.misses = 0
+        self._frags = OrderedDict()
+        self._seen = set()  # 1 回だけ出てきたキー（2 回目から断片を記録する）
+
+    def key(self, n, flow_dir, bare: bool = False):
+        """
+        構造ハッシュ（n は dict または ir の要素）。キーの順序も出力（props の並び）に影響するのでソートしない
+        bare: visible ガードを処理済みの状態で展開するか（ガード付きの断片とは別物）
+        改行を含む文字列があると再インデントで中身が変わるため None（メモ化しない）
+        初めて見たキーも None（1 回しか出てこないサブツリーまで記録すると、入れ子の数だけ同じ出力を
+        写すことになり深いツリーで出力の大きさの 2 乗かかる）。2 回目からキーを返して記録・再利用する
+        ir の要素は ir.digest（子の digest から 1 回だけ求めて要素に覚えたもの）を使うので、
+        コンテナ毎にサブツリー全体を直列化し直さない
+        """
+        if n.__class__ is not dict:
+            digest = ir.digest(n)
+            if digest is False: return None
+        else:
+            try:
+                s = json.dumps(n, ensure_ascii=False, separators=(",", ":"))
+            except (TypeError, ValueError, RecursionError):
+                return None
+            if "\\n" in s: return None
+            digest = hashlib.blake2b(s.encode("utf-8"), digest_size=16).digest()
+        key = (self.backend, flow_dir, bare, digest)
+        if key in self._frags: return key
+        seen = self._seen
+        if key not in seen:
+            if len(seen) >= self.max_entries * 8: seen.clear()
+            seen.add(key)
+            return None
+        return key
+
+    def get(self, key):
+        frag = self._frags.get(key)
+        if frag is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._frags.move_to_end(key)
+        return frag
+
+    def put(self, key, frag: str):
+        """
+        frag は level 0 で生成した断片（dedent 済み）
+        """
+        self._frags[key] = frag
+        if len(self._frags) > self.max_entries:
+            self._frags.popitem(last=False)
+
+    def reindent(self, frag: str, level: int) -> str:
+        if level == 0: return frag
+        pre = self.unit * level
+        return "\n".join(pre + line if line else line for line in frag.split("\n"))
+
+    def dedent(self, frag: str, level: int) -> str:
+        # reindent の逆。level で生成した断片の各行から indent(level) を取り除く
+        if level == 0: return frag
+        cut = len(self.unit) * level
+        return "\n".join(line[cut:] for line in frag.split("\n"))
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._frags),
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def clear(self):
+        self._frags.clear()
+        self._seen.clear()
+        self.hits = self.misses = 0
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+"""
+バックエンド共通のレイアウト IR と lowering（toJetpackCompose / toSwiftUi 共通）
+
+nodes.Node（DSL をそのまま型付けしたもの）を 1 回だけ解析して、各変換器が「出力するだけ」で済む形にする。
+
+- FRAME   → Stack: 並び方向（axis）・スクロール方向・Lazy かどうか・子の並び方向（direction）を解決済み
+- OVERLAY → Overlay: position から配置（vertical / horizontal）と余白（insets）を解決済み
+- SPACER  → Spacer: 親の並び方向から伸ばす向き（axis）を解決済み（flow_dir を持ち回らない）
+- TEXT    → Text: バインディング（{{expr}}）かリテラルかを解決済み
+- INSTANCE → Instance: props を種類（BOOL / NUMBER / BINDING / STRING / UNSUPPORTED）付きの値に解決済み
+- visible は全要素の visible（"{{expr}}" の expr、無ければ None）
+
+サイズ・padding・spacing は共有された nodes.Layout をそのまま持つ（変換器は Layout.derive で文字列を 1 回だけ作る）。
+type はクラス属性で DSL の type と同じ値（FragmentMemo の対象判定や計測の集計はそのまま使える）。
+digest はサブツリーの構造ハッシュ（ir.digest() が初めて呼ばれたときに葉の側から 1 回だけ埋める。FragmentMemo のキー）。
+"""
+import sys
+import hashlib
+from . import nodes
+from .nodes import FRAME, TEXT, INSTANCE, OVERLAY, SPACER, VERTICAL, HORIZONTAL
+
+# props の値の種類
+BOOL = "bool"
+NUMBER = "number"
+BINDING = "binding"
+STRING = "string"
+UNSUPPORTED = "unsupported"
+
+# Overlay の配置
+TOP, BOTTOM, START, END, CENTER = "top", "bottom", "start", "end", "center"
+
+def prop_value(v):
+    """
+    props の値を (種類, 値) に（BINDING は式、STRING はエスケープ前の文字列）
+    """
+    if isinstance(v, bool): return (BOOL, v)
+    if isinstance(v, (int, float)): return (NUMBER, v)
+    if isinstance(v, str):
+        if v.startswith("{{") and v.endswith("}}"):
+            return (BINDING, v[2:-2].strip())
+        return (STRING, v)
+    return (UNSUPPORTED, None)
+
+def alignment(position):
+    """
+    position（left / top / right / bottom のどれが指定されているか）から (vertical, horizontal) を決める
+    片側だけ指定された向きに寄せ、両側または未指定は CENTER
+    """
+    if not position: return (CENTER, CENTER)
+    has_top, has_bottom = "top" in position, "bottom" in position
+    has_left, has_right = "left" in position, "right" in position
+    v = TOP if has_top and not has_bottom else BOTTOM if has_bottom and not has_top else CENTER
+    h = START if has_left and not has_right else END if has_right and not has_left else CENTER
+    return (v, h)
+
+def container(layout, scroll, repeat=False):
+    """
+    FRAME の (axis, scroll, lazy) を決める
+    axis: 並べる方向（scroll が horizontal なら横、それ以外は layout.direction）
+    scroll: スクロール方向（VERTICAL / HORIZONTAL / None）
+    lazy: 横スクロールと、縦スクロールする縦並びの repeat は Lazy なリスト
+          （LazyRow / LazyColumn、SwiftUI は repeat なら ScrollView + LazyHStack / LazyVStack）
+    """
+    if scroll == "horizontal": return (HORIZONTAL, HORIZONTAL, True)
+    axis = HORIZONTAL if layout is not None and layout.direction == HORIZONTAL else VERTICAL
+    if scroll == "vertical": return (axis, VERTICAL, repeat and axis == VERTICAL)
+    return (axis, None, False)
+
+class Text:
+    __slots__ = ("visible", "value", "bound", "digest")
+    type = TEXT
+
+    def __init__(self, visible, value, bound):
+        self.visible = visible
+        self.value = value  # bound なら式、それ以外はエスケープ前の文字列
+        self.bound = bound
+        self.digest = None
+
+    def fields(self) -> tuple:
+        # digest に含める自分自身の値（子は含めない）
+        return (TEXT, self.visible, self.value, self.bound)
+
+    def to_dict(self) -> dict:
+        return {"type": TEXT, "visible": self.visible, "value": self.value, "bound": self.bound}
+
+class Spacer:
+    __slots__ = ("visible", "axis", "digest")
+    type = SPACER
+
+    def __init__(self, visible, axis):
+        self.visible = visible
+        self.axis = axis  # 伸ばす向き（親の並び方向）
+        self.digest = None
+
+    def fields(self) -> tuple:
+        return (SPACER, self.visible, self.axis)
+
+    def to_dict(self) -> dict:
+        return {"type": SPACER, "visible": self.visible, "axis": self.axis}
+
+class Instance:
+    __slots__ = ("visible", "name", "props", "layout", "digest")
+    type = INSTANCE
+
+    def __init__(self, visible, name, props, layout):
+        self.visible = visible
+        self.name = name      # DSL の name（各変換器が自分の命名規則で変換する）
+        self.props = props    # ((key, 種類, 値), ...)
+        self.layout = layout
+        self.digest = None
+
+    def fields(self) -> tuple:
+        return (INSTANCE, self.visible, self.name, self.props, _layout_key(self.layout))
+
+    def to_dict(self) -> dict:
+        return {"type": INSTANCE, "visible": self.visible, "name": self.name, "props": [list(p) for p in self.props],
+                "layout": self.layout.to_dict() if self.layout else None}
+
+class Stack:
+    __slots__ = ("visible", "axis", "scroll", "lazy", "direction", "layout", "repeat", "children", "digest")
+    type = FRAME
+
+    def __init__(self, visible, axis, scroll, lazy, direction, layout, repeat, children=()):
+        self.visible = visible
+        self.axis = axis
+        self.scroll = scroll
+        self.lazy = lazy
+        self.direction = direction  # 子の並び方向（layout.direction そのまま）
+        self.layout = layout
+        self.repeat = repeat        # nodes.Repeat
+        self.children = children
+        self.digest = None
+
+    def fields(self) -> tuple:
+        return (FRAME, self.visible, self.axis, self.scroll, self.lazy, self.direction, _layout_key(self.layout),
+                repr(self.repeat.to_dict()) if self.repeat else None)
+
+    def to_dict(self) -> dict:
+        return {"type": FRAME, "visible": self.visible, "axis": self.axis, "scroll": self.scroll, "lazy": self.lazy,
+                "direction": self.direction, "layout": self.layout.to_dict() if self.layout else None,
+                "repeat": self.repeat.to_dict() if self.repeat else None,
+                "children": [ch.to_dict() for ch in self.children]}
+
+class Overlay:
+    __slots__ = ("visible", "vertical", "horizontal", "insets", "child", "digest")
+    type = OVERLAY
+
+    def __init__(self, visible, vertical, horizontal, insets, child=None):
+        self.visible = visible
+        self.vertical = vertical
+        self.horizontal = horizontal
+        self.insets = insets  # 指定された辺だけ ((辺, 値), ...)（left, top, right, bottom の順）
+        self.child = child
+        self.digest = None
+
+    def fields(self) -> tuple:
+        return (OVERLAY, self.visible, self.vertical, self.horizontal, self.insets)
+
+    def to_dict(self) -> dict:
+        return {"type": OVERLAY, "visible": self.visible, "vertical": self.vertical, "horizontal": self.horizontal,
+                "insets": [list(p) for p in self.insets], "child": self.child.to_dict()}
+
+class Unsupported:
+    __slots__ = ("visible", "type", "digest")
+
+    def __init__(self, visible, type):
+        self.visible = visible
+        self.type = type
+        self.digest = None
+
+    def fields(self) -> tuple:
+        return (self.type, self.visible)
+
+    def to_dict(self) -> dict:
+        return {"type": self.type, "visible": self.visible}
+
+class Screen:
+    """
+    1 画面分の IR（画面名と本体）。複数バックエンドに同じ Screen を渡せば解析は 1 回で済む
+    """
+    __slots__ = ("name", "body")
+
+    def __init__(self, name, body):
+        self.name = name  # DSL の画面名（各変換器が PascalCase にする）
+        self.body = body
+
+ELEMENTS = (Text, Spacer, Instance, Stack, Overlay, Unsupported)
+
+def _layout_key(layout):
+    # Layout は共有されるので文字列は Layout ごとに 1 回だけ作る
+    return layout.derive("ir.digest", lambda lay: repr(lay.to_dict())) if layout else None
+
+def _children(el):
+    if el.__class__ is Stack: return el.children
+    if el.__class__ is Overlay and el.child is not None: return (el.child,)
+    return ()
+
+def digest(el):
+    """
+    要素のサブツリーの構造ハッシュ（16 バイト）。改行を含む文字列があれば False
+    （再インデントで中身が変わるのでメモ化できない）
+    初めて呼ばれたときに、まだ求めていない子孫を葉の側から 1 回ずつ計算して digest に覚える。
+    各要素は自分の値と子の digest だけをハッシュするので、サブツリー全体の大きさによらず一定の手間で済む
+    """
+    d = el.digest
+    if d is not None: return d
+    # 前順に並べて逆から処理すれば子が必ず先に求まる
+    order, stack = [], [el]
+    while stack:
+        e = stack.pop()
+        order.append(e)
+        cls = e.__class__
+        if cls is Stack: stack.extend([k for k in e.children if k.digest is None])
+        elif cls is Overlay and e.child is not None and e.child.digest is None: stack.append(e.child)
+    blake2b = hashlib.blake2b
+    for e in reversed(order):
+        own = repr(e.fields())
+        if "\\n" in own:
+            e.digest = False
+            continue
+        own = own.encode("utf-8")
+        h = blake2b(len(own).to_bytes(8, "little"), digest_size=16)
+        h.update(own)
+        for k in _children(e):
+            if k.digest is False:
+                e.digest = False
+                break
+            h.update(k.digest)
+        else:
+            e.digest = h.digest()
+    return el.digest
+
+# Node のサブクラス -> 専用の lowering 関数 (n, flow_dir) -> IR（dsl_binary.Node はテーブルから直接 IR にする）
+LOWERERS = {}
+
+_EDGES = ("left", "top", "right", "bottom")
+
+def _lower(n, flow):
+    # 子を持たない要素はここで完成。Stack / Overlay の子は lower() が埋める
+    t, vis = n.type, n.visible
+    if t == TEXT:
+        txt = n.text or ""
+        expr = nodes.binding(txt)
+        return Text(vis, txt, False) if expr is None else Text(vis, expr, True)
+    if t == SPACER:
+        return Spacer(vis, HORIZONTAL if flow == HORIZONTAL else VERTICAL)
+    if t == INSTANCE:
+        props = tuple([(k,) + prop_value(v) for k, v in n.props])
+        return Instance(vis, n.name if n.name is not None else "Unknown", props, n.layout)
+    if t == FRAME:
+        layout = n.layout
+        axis, scroll, lazy = container(layout, n.scroll, n.repeat is not None)
+        return Stack(vis, axis, scroll, lazy, layout.direction if layout else None, layout, n.repeat)
+    if t == OVERLAY:
+        pos = n.position if n.position.__class__ is dict else {}
+        v, h = alignment(pos)
+        return Overlay(vis, v, h, tuple((e, pos[e]) for e in _EDGES if e in pos))
+    return Unsupported(vis, t)
+
+def _lower_dict(d, flow, intern=sys.intern):
+    # _lower と同じ変換を dict から直接行う（nodes.Node のツリーを作らない）
+    g = d.get
+    t, vis = g("type"), g("visible")
+    if vis is not None: vis = nodes.binding(vis)
+    if t == TEXT:
+        txt = g("text") or ""
+        expr = nodes.binding(txt)
+        return Text(vis, txt, False) if expr is None else Text(vis, expr, True)
+    if t == SPACER:
+        return Spacer(vis, HORIZONTAL if flow == HORIZONTAL else VERTICAL)
+    if t == INSTANCE:
+        name, props = g("name", "Unknown"), g("props")
+        props = tuple([(k,) + prop_value(v) for k, v in props.items()]) if props else ()
+        return Instance(vis, intern(name) if name.__class__ is str else name, props, nodes.build_layout(g("layout")))
+    if t == FRAME:
+        layout = nodes.build_layout(g("layout"))
+        repeat = nodes.build_repeat(g("repeat"))
+        axis, scroll, lazy = container(layout, g("scroll"), repeat is not None)
+        return Stack(vis, axis, scroll, lazy, layout.direction if layout else None, layout, repeat)
+    if t == OVERLAY:
+        pos = g("position")
+        if pos.__class__ is not dict: pos = {}
+        v, h = alignment(pos)
+        return Overlay(vis, v, h, tuple((e, pos[e]) for e in _EDGES if e in pos))
+    return Unsupported(vis, t)
+
+def lower(dsl, flow_dir=None):
+    """
+    DSL（dict / nodes.Node）を IR に変換する（IR の要素ならそのまま返す）
+    flow_dir: ルートを並べる親の方向（ルートが SPACER のときの向き）
+    明示スタックで走査するので深さの制限はない。循環参照は作らないので GC は止めておく
+    """
+    if dsl.__class__ in ELEMENTS: return dsl
+    with nodes.gc_paused():
+        if dsl.__class__ is dict:
+            return _walk_dict(dsl, flow_dir)
+        lowerer = LOWERERS.get(dsl.__class__)
+        if lowerer is not None: return lowerer(dsl, flow_dir)
+        return _walk_nodes(nodes.build(dsl), flow_dir)
+
+def _walk_dict(root, flow_dir):
+    top = _lower_dict(root, flow_dir)
+    stack = [(root, top, flow_dir)]
+    while stack:
+        d, el, flow = stack.pop()
+        cls = el.__class__
+        if cls is Stack:
+            kids = d.get("children")
+            if kids:
+                fd = el.direction
+                els = tuple([_lower_dict(k, fd) for k in kids])
+                el.children = els
+                stack.extend((k, e, fd) for k, e in zip(kids, els))
+        elif cls is Overlay:
+            # child が無いときは type の無いノード（unsupported）として出力する
+            ch = d.get("child") or {}
+            el.child = _lower_dict(ch, flow)
+            stack.append((ch, el.child, flow))
+    return top
+
+def _walk_nodes(root, flow_dir):
+    top = _lower(root, flow_dir)
+    stack = [(root, top, flow_dir)]
+    while stack:
+        n, el, flow = stack.pop()
+        cls = el.__class__
+        if cls is Stack:
+            kids = n.children
+            if kids:
+                fd = el.direction
+                els = tuple([_lower(k, fd) for k in kids])
+                el.children = els
+                stack.extend((k, e, fd) for k, e in zip(kids, els))
+        elif cls is Overlay:
+            ch = n.child or nodes.EMPTY
+            el.child = _lower(ch, flow)
+            stack.append((ch, el.child, flow))
+    return top
+
+def screen(dsl) -> Screen:
+    """
+    1 画面分の DSL（dict / nodes.Node）を Screen に（Screen ならそのまま返す）
+    """
+    if dsl.__class__ is Screen: return dsl
+    name = dsl.get("name") if dsl.__class__ is dict else nodes.build(dsl).name
+    return Screen(name if name is not None else "GeneratedScreen", lower(dsl))
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+コンポーネント名・画面名から識別子への変換（toJetpackCompose / toSwiftUi 共通）
+
+デザインシステムの書き出しでは数百種類のコンポーネント名が何万もの INSTANCE で繰り返し現れるので、
+正規表現はモジュール読み込み時に 1 回だけコンパイルし、変換結果は上限付きの LRU に保持する。
+"""
+import re
+from functools import lru_cache
+
+MAX_ENTRIES = 4096
+
+_WORD_SEP = re.compile(r"[-_\s]+")
+_NON_ALNUM = re.compile(r"[^A-Za-z0-9]")
+_NON_ALNUM_RUN = re.compile(r"[^0-9A-Za-z]+")
+
+@lru_cache(maxsize=MAX_ENTRIES)
+def component_name(name: str) -> str:
+    # "Za/FooBar" -> "ZaFooBar", "My Component/Sub Page" -> "MyComponentSubPage"
+    # 階層区切りで分割
+    parts = [p for p in name.split("/") if p]
+    result_parts = []
+    for part in parts:
+        # 各パート内のハイフン・アンダースコア・スペースで単語分割
+        words = _WORD_SEP.sub(" ", part).split()
+        # PascalCase化
+        result_parts.append("".join(w[:1].upper() + w[1:] for w in words))
+    # 階層を結合
+    out = "".join(result_parts) if result_parts else "Unknown"
+    # 非英数字を除去（念のため）
+    out = _NON_ALNUM.sub("", out)
+    # 数字始まりの場合は先頭にアンダースコアを追加
+    if out[:1].isdigit(): out = "_" + out
+    return out
+
+@lru_cache(maxsize=MAX_ENTRIES)
+def pascal(s: str) -> str:
+    parts = _NON_ALNUM_RUN.sub(" ", s).split()
+    return "".join(p[:1].upper() + p[1:] for p in parts) or "GeneratedScreen"
+
+def stats() -> dict:
+    """
+    変換結果のキャッシュの統計（FragmentMemo.stats と同じ形）
+    """
+    hits = misses = entries = 0
+    for f in (component_name, pascal):
+        info = f.cache_info()
+        hits += info.hits
+        misses += info.misses
+        entries += info.currsize
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "entries": entries,
+        "hit_rate": hits / total if total else 0.0,
+    }
+
+def clear():
+    component_name.cache_clear()
+    pascal.cache_clear()
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+DSL の型付きノード表現（toJetpackCompose / toSwiftUi 共通）
+
+json.loads の dict をそのまま走査すると、ノード毎に layout / width / height の dict が並び、
+emit のたびに n.get(...) を繰り返すことになる。build() で 1 回だけ __slots__ のノードに変換し、
+各変換器の expand_node は属性を直接読む。
+
+- type / direction / mode / scroll / コンポーネント名は sys.intern した文字列（同じ値は同じオブジェクト）
+- Layout / Size は不変なので同じ内容のものを 1 つに共有する
+- visible は "{{expr}}" 形式のときだけ expr を持つ（それ以外は None）
+- props は (key, value) のタプル、children はタプル
+"""
+import gc
+import sys
+from contextlib import contextmanager
+
+# type
+FRAME = sys.intern("FRAME")
+TEXT = sys.intern("TEXT")
+INSTANCE = sys.intern("INSTANCE")
+OVERLAY = sys.intern("OVERLAY")
+SPACER = sys.intern("SPACER")
+# layout.direction
+VERTICAL = sys.intern("VERTICAL")
+HORIZONTAL = sys.intern("HORIZONTAL")
+# width / height の mode
+FILL = sys.intern("FILL")
+FIXED = sys.intern("FIXED")
+HUG = sys.intern("HUG")
+
+# 共有する Layout / Size の上限（超えたら共有をやめるだけで動作は変わらない）
+MAX_SHARED = 1 << 16
+
+def _intern(v):
+    return sys.intern(v) if v.__class__ is str else v
+
+def binding(v):
+    """
+    "{{expr}}" なら expr、それ以外は None
+    """
+    if v.__class__ is str and v.startswith("{{") and v.endswith("}}"):
+        return v[2:-2].strip()
+    return None
+
+class Size:
+    __slots__ = ("mode", "value")
+
+    def __init__(self, mode, value):
+        self.mode = mode
+        self.value = value
+
+    def to_dict(self) -> dict:
+        out = {}
+        if self.mode is not None: out["mode"] = self.mode
+        if self.value is not None: out["value"] = self.value
+        return out
+
+class Layout:
+    __slots__ = ("direction", "spacing", "width", "height", "padding", "derived")
+
+    def __init__(self, direction=None, spacing=None, width=None, height=None, padding=None):
+        self.direction = direction
+        self.spacing = spacing
+        self.width = width
+        self.height = height
+        self.padding = padding  # 4 要素のタプル（左, 上, 右, 下）か None
+        self.derived = None     # derive() の結果
+
+    def derive(self, key, func):
+        """
+        func(self) の結果を key で覚えておく（Layout は不変で共有されるので、変換器の Modifier 文字列などを 1 回だけ作る）
+        """
+        d = self.derived
+        if d is None: d = self.derived = {}
+        v = d.get(key)
+        if v is None: v = d[key] = func(self)
+        return v
+
+    def to_dict(self) -> dict:
+        out = {}
+        if self.direction is not None: out["direction"] = self.direction
+        if self.spacing is not None: out["spacing"] = self.spacing
+        if self.width is not None: out["width"] = self.width.to_dict()
+        if self.height is not None: out["height"] = self.height.to_dict()
+        if self.padding is not None: out["padding"] = list(self.padding)
+        return out
+
+class Repeat:
+    __slots__ = ("source", "alias", "key", "content_type")
+
+    def __init__(self, source="items", alias="item", key=None, content_type=None):
+        self.source = source              # repeat.for
+        self.alias = alias                # repeat.as
+        self.key = key                    # repeat.key / id（要素の安定した識別子のプロパティ。"id" / "meta.sku"、要素そのものは "self"）
+        self.content_type = content_type  # repeat.contentType（Lazy リストの再利用単位。文字列か "{{expr}}"）
+
+    def to_dict(self) -> dict:
+        out = {"for": self.source, "as": self.alias}
+        if self.key is not None: out["key"] = self.key
+        if self.content_type is not None: out["contentType"] = self.content_type
+        return out
+
+class Node:
+    __slots__ = ("type", "name", "text", "visible", "layout", "props", "children", "child",
+                 "position", "scroll", "repeat")
+
+    def __init__(self, type=None, name=None, text=None, visible=None, layout=None, props=(), children=(),
+                 child=None, position=None, scroll=None, repeat=None):
+        self.type = type
+        self.name = name
+        self.text = text
+        self.visible = visible    # visible ガードの式
+        self.layout = layout      # Layout（空なら None）
+        self.props = props        # ((key, value), ...)
+        self.children = children
+        self.child = child        # OVERLAY の子
+        self.position = position  # OVERLAY の position（dict のまま）
+        self.scroll = scroll
+        self.repeat = repeat      # Repeat
+
+    def to_dict(self) -> dict:
+        """
+        出力に影響するフィールドだけの dict（メモ化のキーや確認用。深いツリーでは RecursionError になりうる）
+        """
+        out = {"type": self.type}
+        if self.name is not None: out["name"] = self.name
+        if self.text is not None: out["text"] = self.text
+        if self.visible is not None: out["visible"] = "{{" + self.visible + "}}"
+        if self.layout is not None: out["layout"] = self.layout.to_dict()
+        if self.props: out["props"] = dict(self.props)
+        if self.children: out["children"] = [ch.to_dict() for ch in self.children]
+        if self.child is not None: out["child"] = self.child.to_dict()
+        if self.position is not None: out["position"] = self.position
+        if self.scroll is not None: out["scroll"] = self.scroll
+        if self.repeat is not None: out["repeat"] = self.repeat.to_dict()
+        return out
+
+# OVERLAY の child が無いときの代わり（元の実装の `n.get("child") or {}` に相当）
+EMPTY = Node()
+
+_sizes = {}
+_layouts = {}
+
+def _size(key):
+    # key は (mode, value)。== で等しい値（1 と 1.0 など）はどちらの変換器でも同じ出力になるので共有してよい
+    if key is None: return None
+    size = _sizes.get(key)
+    if size is None:
+        size = Size(_intern(key[0]), key[1])
+        if len(_sizes) < MAX_SHARED: _sizes[key] = size
+    return size
+
+def build_size(d):
+    if not d or d.__class__ is not dict: return None
+    key = (d.get("mode"), d.get("value"))
+    try:
+        return _size(key)
+    except TypeError:  # value にリストなど hashable でないものが入っている
+        return Size(_intern(key[0]), key[1])
+
+def build_layout(d):
+    """
+    layout の dict を Layout に（空や dict 以外は None）
+    """
+    if not d or d.__class__ is not dict: return None
+    g = d.get
+    w, h, pad = g("width"), g("height"), g("padding")
+    wk = (w.get("mode"), w.get("value")) if w and w.__class__ is dict else None
+    hk = (h.get("mode"), h.get("value")) if h and h.__class__ is dict else None
+    padding = tuple(pad) if pad.__class__ is list and len(pad) == 4 else None
+    key = (g("direction"), g("spacing"), wk, hk, padding)
+    try:
+        layout = _layouts.get(key)
+    except TypeError:  # hashable でない値が含まれる（共有しない）
+        return Layout(_intern(key[0]), key[1], build_size(w), build_size(h), padding)
+    if layout is None:
+        layout = Layout(_intern(key[0]), key[1], _size(wk), _size(hk), padding)
+        if len(_layouts) < MAX_SHARED: _layouts[key] = layout
+    return layout
+
+def build_repeat(d):
+    """
+    repeat の dict を Repeat に（空や dict 以外は None）
+    """
+    if not d or d.__class__ is not dict: return None
+    g = d.get
+    key = g("key")
+    if key is None: key = g("id")  # id は key の別名
+    return Repeat(g("for", "items"), g("as", "item"), key, g("contentType"))
+
+def is_key_path(s) -> bool:
+    """
+    repeat.key に使える「識別子を . で繋いだもの」か（\\.id / it.id としてそのまま出力できる）
+    """
+    return s.__class__ is str and all(part.isidentifier() for part in s.split("."))
+
+def _shell(d: dict, intern=sys.intern) -> Node:
+    g = d.get
+    t = g("type")
+    name = g("name")
+    vis = g("visible")
+    lay = g("layout")
+    props = g("props")
+    scroll = g("scroll")
+    return Node(
+        intern(t) if t.__class__ is str else t,
+        intern(name) if name.__class__ is str else name,
+        g("text"),
+        binding(vis) if vis is not None else None,
+        build_layout(lay) if lay else None,
+        tuple(props.items()) if props else (),
+        (),
+        None,
+        g("position"),
+        intern(scroll) if scroll.__class__ is str else scroll,
+        build_repeat(g("repeat")),
+    )
+
+def screen_name(root: Node) -> str:
+    """
+    画面名（ルートの name、無ければ GeneratedScreen）
+    """
+    return root.name if root.name is not None else "GeneratedScreen"
+
+def build(dsl):
+    """
+    DSL の dict を Node のツリーに変換する（Node とそのサブクラス（dsl_binary.Node）ならそのまま返す）
+    明示スタックで走査するので深さの制限はない
+    循環参照は作らないので、変換中は GC を止める（大量のノード生成で世代別 GC が何度も走るのを避ける）
+    """
+    if isinstance(dsl, Node): return dsl
+    with gc_paused():
+        return _build(dsl)
+
+@contextmanager
+def gc_paused():
+    """
+    with の間 GC を止める（元から止まっていればそのまま）
+    """
+    paused = gc.isenabled()
+    if paused: gc.disable()
+    try:
+        yield
+    finally:
+        if paused: gc.enable()
+
+def _build(dsl) -> Node:
+    root = _shell(dsl)
+    stack = [(dsl, root)]
+    while stack:
+        d, n = stack.pop()
+        kids = d.get("children")
+        if kids:
+            shells = tuple(_shell(k) for k in kids)
+            n.children = shells
+            stack.extend(zip(kids, shells))
+        ch = d.get("child")
+        if ch:
+            n.child = _shell(ch)
+            stack.append((ch, n.child))
+    return root
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+変換器の計測モード（toJetpackCompose / toSwiftUi 共通）
+
+  ./toJetpackCompose.py dsl.json --profile > Screen.kt          # 標準エラーに集計を表示
+  ./toSwiftUi.py dsl.json --profile-json prof.json > Screen.swift  # 集計を JSON で書き出す
+
+フェーズ（parse / build / lower / emit / wrap / write、build は nodes.Node への変換、lower は ir への変換）・ノード type 毎の expand_node・各変換器の PROFILE_FUNCS に挙げた
+補助関数（to_compose_name / apply_size など）の時間と呼び出し回数、画面毎のノード数と最大深さを記録する。
+計測中だけ変換器モジュールのグローバル関数を計測用のラッパーに差し替えるので、
+無効時は何も差し替えず追加のコストはない（差し替えはプロセス全体に効くので、計測はスレッドを使わない CLI 向け）。
+expand_node は子を展開せずに返るため、type 毎の時間はそのノード自身の処理時間（子を含まない）になる。
+"""
+import sys, json, time
+from . import names
+from . import nodes
+from . import ir
+from contextlib import contextmanager
+
+class _Stat:
+    __slots__ = ("calls", "seconds")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+
+    def to_dict(self) -> dict:
+        return {"calls": self.calls, "ms": self.seconds * 1000}
+
+def tree_stats(dsl) -> dict:
+    """
+    画面（dict または nodes.Node）のノード数（type 毎）と最大深さ（ルートが 1）
+    """
+    root = nodes.build(dsl)
+    types = {}
+    count, max_depth = 0, 0
+    stack = [(root, 1)]
+    while stack:
+        n, d = stack.pop()
+        count += 1
+        if d > max_depth: max_depth = d
+        t = str(n.type)
+        types[t] = types.get(t, 0) + 1
+        for ch in n.children: stack.append((ch, d + 1))
+        if n.child is not None: stack.append((n.child, d + 1))
+    return {"nodes": count, "max_depth": max_depth, "types": types}
+
+class Profile:
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.phases = {}
+        self.node_types = {}
+        self.funcs = {}
+        self.screens = []
+        self.summary = False   # finish() で集計を表示する
+        self.json_path = None  # finish() で集計を書き出す JSON
+
+    def _stat(self, table: dict, key: str) -> _Stat:
+        st = table.get(key)
+        if st is None: st = table[key] = _Stat()
+        return st
+
+    @contextmanager
+    def phase(self, name: str):
+        st = self._stat(self.phases, name)
+        start = self.clock()
+        try:
+            yield
+        finally:
+            st.calls += 1
+            st.seconds += self.clock() - start
+
+    def iter_phase(self, name: str, it):
+        """
+        イテレータ it の各要素の取り出しを name のフェーズとして計測する（ストリーミング入力のパース用）
+        """
+        it = iter(it)
+        while True:
+            with self.phase(name):
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+            yield item
+
+    def _timed(self, table: dict, key: str, func):
+        st = self._stat(table, key)
+        clock = self.clock
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                st.calls += 1
+                st.seconds += clock() - start
+        return timed
+
+    def _timed_expand(self, func):
+        node_types, clock, stat = self.node_types, self.clock, self._stat
+
+        def expand_node(n, level, flow_dir=None, bare=False):
+            start = clock()
+            try:
+                return func(n, level, flow_dir, bare)
+            finally:
+                # visible ガードの展開は type とは別に数える
+                guard = not bare and n.visible is not None
+                st = stat(node_types, "visible" if guard else str(n.type))
+                st.calls += 1
+                st.seconds += clock() - start
+        return expand_node
+
+    @contextmanager
+    def instrument(self, module):
+        """
+        with の間だけ module の emit_node / wrap_file / expand_node と PROFILE_FUNCS を計測用に差し替える
+        """
+        saved = {}
+        patches = {
+            "emit_node": self._timed(self.phases, "emit", module.emit_node),
+            "wrap_file": self._timed(self.phases, "wrap", module.wrap_file),
+            "expand_node": self._timed_expand(module.expand_node),
+        }
+        for name in getattr(module, "PROFILE_FUNCS", ()):
+            patches[name] = self._timed(self.funcs, name, getattr(module, name))
+        try:
+            for name, func in patches.items():
+                saved[name] = getattr(module, name)
+                setattr(module, name, func)
+            yield self
+        finally:
+            for name, func in saved.items():
+                setattr(module, name, func)
+
+    def convert(self, module, dsl: dict, write):
+        """
+        module.convert(dsl) を計測しながら実行して write(str) に書き出す（出力は write_file と同じ）
+        """
+        with self.phase("build"):
+            root = nodes.build(dsl)
+        stats = tree_stats(root)
+        with self.phase("lower"):
+            screen = ir.screen(root)
+        stats["name"] = screen.name
+        self.screens.append(stats)
+        with self.instrument(module):
+            text = module.convert(screen)
+        with self.phase("write"):
+            write(text)
+            write("\n")
+
+    def to_dict(self) -> dict:
+        emit = self.phases.get("emit")
+        expand_ms = sum(st.seconds for st in self.node_types.values()) * 1000
+        return {
+            "phases": {k: v.to_dict() for k, v in self.phases.items()},
+            # emit から expand_node の時間を除いた分（スタック操作と文字列の結合）
+            "engine_ms": max(0.0, emit.seconds * 1000 - expand_ms) if emit else 0.0,
+            "node_types": {k: v.to_dict() for k, v in sorted(self.node_types.items(), key=lambda kv: -kv[1].seconds)},
+            "funcs": {k: v.to_dict() for k, v in sorted(self.funcs.items(), key=lambda kv: -kv[1].seconds)},
+            "screens": self.screens,
+            # 名前変換キャッシュ（names.py）はプロセス全体の累計
+            "name_cache": names.stats(),
+        }
+
+    def print_summary(self, out=None):
+        out = out or sys.stderr
+        d = self.to_dict()
+
+        def table(title, rows):
+            print(f"{title:<24} {'calls':>9} {'ms':>10}", file=out)
+            for k, v in rows.items():
+                if not v["calls"]: continue
+                print(f"  {k:<22} {v['calls']:9d} {v['ms']:10.3f}", file=out)
+
+        table("phase", d["phases"])
+        print(f"  {'(engine overhead)':<22} {'':9} {d['engine_ms']:10.3f}", file=out)
+        table("node type (self)", d["node_types"])
+        table("function", d["funcs"])
+        nc = d["name_cache"]
+        print(f"name cache: {nc['hits']} hits, {nc['misses']} misses, {nc['entries']} entries ({nc['hit_rate']:.1%})", file=out)
+        for s in d["screens"]:
+            types = ", ".join(f"{k}={v}" for k, v in sorted(s["types"].items()))
+            print(f"screen {s['name']}: {s['nodes']} nodes, max depth {s['max_depth']} ({types})", file=out)
+
+    def write_json(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def finish(self):
+        if self.json_path: self.write_json(self.json_path)
+        if self.summary: self.print_summary()
+
+def from_argv(argv):
+    """
+    --profile / --profile-json PATH を取り除いた引数と Profile（どちらも無ければ None）を返す
+    """
+    rest, prof = [], None
+    it = iter(argv)
+    for a in it:
+        if a == "--profile":
+            prof = prof or Profile()
+            prof.summary = True
+        elif a == "--profile-json" or a.startswith("--profile-json="):
+            path = a.split("=", 1)[1] if "=" in a else next(it, None)
+            if not path: raise SystemExit("--profile-json には出力先のパスが必要です")
+            prof = prof or Profile()
+            prof.json_path = path
+        else:
+            rest.append(a)
+    return rest, prof
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+起動の速さを優先した 1 画面変換の入口（Xcode の Build Phase などから画面毎に呼ぶ用）
+
+使い方:
+  python3 -S -I quickgen.py swiftui dsl/home.json -o Generated/HomeScreen.swift
+  python3 -S -I quickgen.py compose dsl/home.json > HomeScreen.kt
+  cat dsl/home.json | python3 -S quickgen.py compose - --timing
+
+出力は toJetpackCompose.py / toSwiftUi.py と同じ（1 画面 / JSON Lines / 画面の配列 / .dslb）。
+
+- 最初に読むのは sys と time だけで、変換器は引数を確認した後で import する（argparse も使わない）
+- -S（site を読まない）や -I（環境変数・ユーザーの site-packages を無視、スクリプトのディレクトリも
+  sys.path に入らない）でも動くよう、リポジトリ直下の quickgen.py が自分のディレクトリを sys.path に追加する
+  （dsl2ui/__init__.py は import 時に何も読み込まないので、パッケージを経由しても起動は遅くならない）
+- 小さな入力は標準の json で読むので、orjson などが無い（-S で site-packages が見えない）環境でも遅くならない
+- --timing で import・変換・書き出しにかかった時間を標準エラーに出す（--timing-json PATH で JSON）
+  startup_ms はリポジトリ直下の quickgen.py の実行開始（main の t0）から変換器の import までで、
+  インタプリタ自体の起動は含まない。t0 が渡されない（dsl2ui コマンド・python -m）ときは出さない
+"""
+import sys
+import time
+
+BACKENDS = {"compose": "toJetpackCompose", "swiftui": "toSwiftUi", "compose-stable": "toJetpackComposeStable",
+            "swiftui-split": "toSwiftUiSplit"}
+
+USAGE = "usage: quickgen.py {compose,swiftui,compose-stable,swiftui-split} SRC|- [-o OUT] [--timing] [--timing-json PATH]"
+
+def parse_args(argv):
+    """
+    (backend, src, out, timing, timing_json) を返す。不正な引数は SystemExit(2)
+    """
+    pos, out, timing, timing_json = [], None, False, None
+    it = iter(argv)
+    for a in it:
+        if a in ("-o", "--output"):
+            out = next(it, None)
+            if out is None: _usage("-o には出力先のパスが必要です")
+        elif a == "--timing":
+            timing = True
+        elif a == "--timing-json":
+            timing_json = next(it, None)
+            if timing_json is None: _usage("--timing-json には出力先のパスが必要です")
+        elif a in ("-h", "--help"):
+            print(USAGE)
+            raise SystemExit(0)
+        elif a.startswith("-") and a != "-":
+            _usage(f"unknown option: {a}")
+        else:
+            pos.append(a)
+    if len(pos) != 2: _usage("バックエンドと入力を指定してください")
+    if pos[0] not in BACKENDS: _usage(f"unknown backend: {pos[0]} (choose from {', '.join(BACKENDS)})")
+    return pos[0], pos[1], out, timing, timing_json
+
+def _usage(msg):
+    print(f"{USAGE}\nerror: {msg}", file=sys.stderr)
+    raise SystemExit(2)
+
+def main(argv=None, t0=None) -> int:
+    """
+    t0: 起動の計測の起点（呼び出し元のスクリプトの実行開始時の time.perf_counter()）
+    """
+    t_start = time.perf_counter()
+    backend_name, src, out, timing, timing_json = parse_args(sys.argv[1:] if argv is None else argv)
+    t_import = time.perf_counter()
+    # from . import <変換器> と同じ（importlib は warnings まで読み込むので使わない）
+    backend = getattr(__import__("", globals(), None, (BACKENDS[backend_name],), 1), BACKENDS[backend_name])
+    from . import dsl_stream
+    t_convert = time.perf_counter()
+
+    chunks = []
+    try:
+        docs = dsl_stream.iter_documents(sys.stdin) if src == "-" else dsl_stream.open_documents(src)
+        for dsl in docs:
+            backend.write_file(dsl, chunks.append)
+    except (OSError, ValueError) as e:
+        print(f"error: {type(e).__name__}: {e}", file=sys.stderr)
+        return 1
+    t_write = time.perf_counter()
+
+    text = "".join(chunks)
+    if out is None:
+        sys.stdout.write(text)
+        sys.stdout.flush()
+    else:
+        with open(out, "w", encoding="utf-8") as f:
+            f.write(text)
+    t_end = time.perf_counter()
+
+    if timing or timing_json:
+        report = {} if t0 is None else {"startup_ms": (t_import - t0) * 1000}
+        report.update({
+            "import_ms": (t_convert - t_import) * 1000,
+            "convert_ms": (t_write - t_convert) * 1000,
+            "write_ms": (t_end - t_write) * 1000,
+            "total_ms": (t_end - (t_start if t0 is None else t0)) * 1000,
+            "modules": len(sys.modules),
+        })
+        if timing:
+            print("quickgen: " + "  ".join(f"{k} {v:.2f}" if isinstance(v, float) else f"{k} {v}"
+                                           for k, v in report.items()), file=sys.stderr)
+        if timing_json:
+            import json
+            with open(timing_json, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
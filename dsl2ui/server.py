@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+変換器を読み込んだまま常駐し、HTTP（localhost または Unix ソケット）で DSL を受け付ける生成サーバ
+
+ビルドフェーズや IDE プラグインから 1 回ずつスクリプトを起動すると Python の起動と import の時間が毎回かかるので、
+1 プロセスに toJetpackCompose / toSwiftUi を読み込んだまま、リクエスト毎に生成だけを行う。
+リクエストはスレッドで同時に処理し、生成結果はメモリ上の LRU（と任意で cache.BuildCache）に保持する。
+
+使い方:
+  ./server.py --port 8765
+  ./server.py --unix /tmp/dsl2ui.sock --cache-dir .dsl2ui-cache
+
+  curl --data-binary @dsl.json http://127.0.0.1:8765/generate/compose
+  curl --unix-socket /tmp/dsl2ui.sock --data-binary @dsl.json http://localhost/generate/swiftui
+
+API:
+  POST /generate/<backend>   本文: DSL JSON（1 画面）  応答: 生成コード（main() の出力と同じ内容）
+                             ヘッダ X-Dsl2ui-Cache: hit / miss、X-Dsl2ui-Ms: サーバ側の処理時間
+  GET  /health               応答: 統計の JSON
+"""
+import sys, os, stat, json, time, socket, argparse, threading, http.client
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from . import batch
+from . import cache as build_cache
+from . import decoder
+from .fragment_memo import FragmentMemo
+
+class GeneratorService:
+    """
+    バックエンドを読み込んだまま生成する（スレッドセーフ）
+    """
+    def __init__(self, max_entries: int = 1024, cache=None, memo: bool = False):
+        """
+        max_entries: メモリ上に保持する生成結果の数
+        cache: BuildCache（プロセスを再起動しても再利用したいとき）
+        memo: 同一サブツリーの生成結果をリクエストをまたいで再利用する（同じ大きなサブツリーが何度も出てくる画面向け）
+        """
+        self.backends = {name: batch.load_backend(name) for name in batch.BACKENDS}
+        self.max_entries = max_entries
+        self.cache = cache
+        self.memo = memo
+        self._lock = threading.Lock()
+        self._results = OrderedDict()
+        # FragmentMemo はスレッドセーフではないので、バックエンド毎にプールして 1 リクエストに 1 つ貸し出す
+        self._memos = {name: [] for name in self.backends}
+        self.requests = 0
+        self.hits = 0
+        self.errors = 0
+
+    def _acquire_memo(self, name: str):
+        if not self.memo: return None
+        with self._lock:
+            pool = self._memos[name]
+            return pool.pop() if pool else FragmentMemo(name)
+
+    def _release_memo(self, name: str, memo):
+        if memo is None: return
+        with self._lock:
+            self._memos[name].append(memo)
+
+    def generate(self, name: str, content: bytes):
+        """
+        content（DSL JSON のバイト列）を name のバックエンドで生成する
+        戻り値: (生成コード, キャッシュヒットか)
+        未知のバックエンドは KeyError、壊れた JSON は ValueError
+        """
+        backend = self.backends[name]
+        key = build_cache.cache_key(name, backend, content)
+        with self._lock:
+            self.requests += 1
+            text = self._results.get(key)
+            if text is not None:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return text, True
+        if self.cache:
+            text = self.cache.get(key)
+        hit = text is not None
+        if not hit:
+            try:
+                dsl = decoder.load_screen(content)
+            except ValueError:
+                with self._lock: self.errors += 1
+                raise
+            memo = self._acquire_memo(name)
+            try:
+                # main() の print と同じく末尾に改行を付ける
+                text = backend.convert(dsl, memo) + "\n"
+            finally:
+                self._release_memo(name, memo)
+            if self.cache: self.cache.put(key, text)
+        with self._lock:
+            if hit: self.hits += 1
+            self._results[key] = text
+            if len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+        return text, hit
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hits": self.hits,
+                "errors": self.errors,
+                "entries": len(self._results),
+                "backends": sorted(self.backends),
+            }
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    quiet = True
+
+    def address_string(self):
+        # Unix ソケットでは client_address がホストとポートの組にならない
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        if not self.quiet: super().log_message(format, *args)
+
+    def _send(self, status: int, body: bytes, content_type: str, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items(): self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, msg: str):
+        self._send(status, (msg + "\n").encode("utf-8"), "text/plain; charset=utf-8")
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, json.dumps(self.server.service.stats()).encode("utf-8"), "application/json")
+        else:
+            self._error(404, f"not found: {self.path}")
+
+    def do_POST(self):
+        start = time.perf_counter()
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length < 0: raise ValueError(length)
+        except ValueError:
+            # 本文の長さが分からないので、この接続は続けて使えない
+            self.close_connection = True
+            return self._error(400, f"invalid Content-Length: {self.headers.get('Content-Length')}")
+        content = self.rfile.read(length)
+        prefix = "/generate/"
+        if not self.path.startswith(prefix):
+            return self._error(404, f"not found: {self.path}")
+        name = self.path[len(prefix):]
+        service = self.server.service
+        if name not in service.backends:
+            return self._error(404, f"unknown backend: {name} (choose from {', '.join(service.backends)})")
+        try:
+            text, hit = service.generate(name, content)
+        except ValueError as e:
+            return self._error(400, f"{type(e).__name__}: {e}")
+        except Exception as e:
+            return self._error(500, f"{type(e).__name__}: {e}")
+        ms = (time.perf_counter() - start) * 1000
+        self._send(200, text.encode("utf-8"), "text/plain; charset=utf-8",
+                   {"X-Dsl2ui-Cache": "hit" if hit else "miss", "X-Dsl2ui-Ms": f"{ms:.2f}"})
+
+class TCPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service: GeneratorService):
+        super().__init__(address, Handler)
+        self.service = service
+
+class UnixServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, service: GeneratorService):
+        """
+        path に前回のソケットが残っていれば消して使う。ソケット以外のファイルがあれば FileExistsError
+        """
+        try:
+            mode = os.lstat(path).st_mode
+        except FileNotFoundError:
+            pass
+        else:
+            if not stat.S_ISSOCK(mode):
+                raise FileExistsError(f"not a socket, refusing to replace: {path}")
+            os.unlink(path)
+        super().__init__(path, Handler)
+        self.service = service
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+def make_server(service: GeneratorService, host: str = "127.0.0.1", port: int = 8765, unix: str = None):
+    """
+    unix を指定すれば Unix ソケット、そうでなければ host:port で待ち受けるサーバ（serve_forever は呼び出し側）
+    """
+    if unix: return UnixServer(unix, service)
+    return TCPServer((host, port), service)
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+def generate(address, backend: str, dsl, timeout: float = 30.0) -> str:
+    """
+    クライアント: サーバに DSL（dict / str / bytes）を送って生成コードを返す
+    address: (host, port) または Unix ソケットのパス
+    サーバがエラーを返したら RuntimeError
+    """
+    if isinstance(dsl, dict): dsl = json.dumps(dsl, ensure_ascii=False)
+    if isinstance(dsl, str): dsl = dsl.encode("utf-8")
+    if isinstance(address, str):
+        conn = _UnixConnection(address, timeout)
+    else:
+        conn = http.client.HTTPConnection(*address, timeout=timeout)
+    try:
+        conn.request("POST", f"/generate/{backend}", body=dsl, headers={"Content-Type": "application/json"})
+        res = conn.getresponse()
+        body = res.read().decode("utf-8")
+    finally:
+        conn.close()
+    if res.status != 200:
+        raise RuntimeError(f"{res.status}: {body.strip()}")
+    return body
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="変換器を常駐させ HTTP で DSL を生成するサーバ")
+    ap.add_argument("--host", default="127.0.0.1", help="待ち受けアドレス（既定 127.0.0.1）")
+    ap.add_argument("--port", type=int, default=8765, help="待ち受けポート（既定 8765）")
+    ap.add_argument("--unix", help="TCP の代わりに待ち受ける Unix ソケットのパス")
+    ap.add_argument("--max-entries", type=int, default=1024, help="メモリに保持する生成結果の数")
+    ap.add_argument("--memo", action="store_true", help="同一サブツリーの生成結果を再利用する")
+    ap.add_argument("--cache-dir", help="生成結果のディスクキャッシュ（再起動後も再利用）")
+    ap.add_argument("--cache-max-mb", type=float, default=build_cache.DEFAULT_MAX_BYTES / (1024 * 1024),
+                    help="ディスクキャッシュのサイズ上限 MB")
+    ap.add_argument("-v", "--verbose", action="store_true", help="リクエスト毎のログを表示")
+    args = ap.parse_args(argv)
+
+    cache = build_cache.BuildCache(args.cache_dir, int(args.cache_max_mb * 1024 * 1024)) if args.cache_dir else None
+    service = GeneratorService(args.max_entries, cache, memo=args.memo)
+    Handler.quiet = not args.verbose
+    try:
+        server = make_server(service, args.host, args.port, args.unix)
+    except OSError as e:
+        ap.error(str(e))
+    where = args.unix or "http://%s:%d" % server.server_address[:2]
+    print(f"dsl2ui server listening on {where}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if cache: cache.prune()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
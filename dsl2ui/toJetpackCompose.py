@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+import sys, json, math
+from . import emit_engine
+from . import dsl_stream
+from . import profiler
+from . import names
+from . import nodes
+from . import ir
+from .nodes import FRAME, TEXT, INSTANCE, OVERLAY, SPACER, VERTICAL, HORIZONTAL, FILL, FIXED
+
+def dp(n):
+    if n is None or (isinstance(n, (int, float)) and n == 0):
+        return None
+    return f"{int(round(n))}.dp"
+
+def indent(n): return "  " * n
+
+def apply_size(layout, extras=None):
+    """
+    レイアウト（nodes.Layout または dict）から Modifier を生成
+    extras: スクロール Modifier などの追加 Modifier リスト
+    """
+    if layout.__class__ is dict: layout = nodes.build_layout(layout)
+    if layout:
+        # Layout は共有されるので同じ extras の結果は Layout に覚えておく
+        key = ("compose.size",) + tuple(extras) if extras else "compose.size"
+        return layout.derive(key, lambda lay: _size_modifier(lay, extras))
+    return _size_modifier(layout, extras)
+
+def _size_modifier(layout, extras):
+    if not layout and not extras: return ""
+    mods = []
+    # extras を先に追加（スクロール Modifier など）
+    if extras:
+        mods.extend(extras)
+    # サイズ Modifier
+    if layout:
+        w = layout.width
+        h = layout.height
+        if w and w.mode == FILL: mods.append("fillMaxWidth()")
+        if h and h.mode == FILL: mods.append("fillMaxHeight()")
+        if w and w.mode == FIXED and w.value: mods.append(f"width({dp(w.value)})")
+        if h and h.mode == FIXED and h.value: mods.append(f"height({dp(h.value)})")
+        # padding
+        pad = layout.padding
+        if pad:
+            l,t,r,b = (dp(p) or "0.dp" for p in pad)
+            mods.append(f"padding(start = {l}, top = {t}, end = {r}, bottom = {b})")
+    return f"modifier = Modifier.{'.'.join(mods)}" if mods else ""
+
+def map_arrangement(layout):
+    if layout.__class__ is dict: layout = nodes.build_layout(layout)
+    if not layout: return ""
+    return layout.derive("compose.arrangement", _arrangement)
+
+def _arrangement(layout):
+    spacing = layout.spacing
+    if not spacing: return ""
+    spaced = f"Arrangement.spacedBy({dp(spacing)})"
+    d = layout.direction
+    if d == VERTICAL:   return f"verticalArrangement = {spaced}"
+    if d == HORIZONTAL: return f"horizontalArrangement = {spaced}"
+    return ""
+
+def map_container(layout, scroll):
+    """
+    コンテナタイプと追加 Modifier、Lazy フラグを返す
+    戻り値: (name, extraMods, lazy)
+    """
+    if layout.__class__ is dict: layout = nodes.build_layout(layout)
+    return stack_container(*ir.container(layout, scroll))
+
+def stack_container(axis, scroll, lazy):
+    """
+    ir.Stack の (axis, scroll, lazy) からコンテナタイプと追加 Modifier、Lazy フラグを返す
+    """
+    if lazy: return ("LazyRow" if axis == HORIZONTAL else "LazyColumn", [], True)
+    if axis == HORIZONTAL:
+        extras = ["horizontalScroll(rememberScrollState())"] if scroll == VERTICAL else []
+        return ("Row", extras, False)
+    extras = ["verticalScroll(rememberScrollState())"] if scroll == VERTICAL else []
+    return ("Column", extras, False)
+
+_ALIGNMENTS = {
+    (ir.TOP, ir.START): "Alignment.TopStart", (ir.TOP, ir.END): "Alignment.TopEnd", (ir.TOP, ir.CENTER): "Alignment.TopCenter",
+    (ir.BOTTOM, ir.START): "Alignment.BottomStart", (ir.BOTTOM, ir.END): "Alignment.BottomEnd",
+    (ir.BOTTOM, ir.CENTER): "Alignment.BottomCenter",
+    (ir.CENTER, ir.START): "Alignment.CenterStart", (ir.CENTER, ir.END): "Alignment.CenterEnd",
+    (ir.CENTER, ir.CENTER): "Alignment.Center",
+}
+
+def calculate_alignment(position):
+    """
+    position から Alignment を計算
+    """
+    return alignment_name(*ir.alignment(position))
+
+def alignment_name(vertical, horizontal):
+    """
+    ir.Overlay の (vertical, horizontal) を Alignment に
+    """
+    return _ALIGNMENTS[(vertical, horizontal)]
+
+# 正規表現のコンパイルと変換結果のキャッシュは names.py（toSwiftUi と共通）
+to_compose_name = names.component_name
+
+def stringify_prop(k, v):
+    return prop_arg(k, *ir.prop_value(v))
+
+def prop_arg(k, kind, v):
+    """
+    ir.Instance の props 1 つ分 (key, 種類, 値) を引数に
+    """
+    if kind == ir.BOOL: return f"{k} = {'true' if v else 'false'}"
+    if kind == ir.NUMBER or kind == ir.BINDING: return f"{k} = {v}"
+    if kind == ir.STRING:
+        esc = v.replace('"', '\\"')
+        return f'{k} = "{esc}"'
+    return f"/* unsupported prop {k} */"
+
+def emit_node(n, level, flow_dir=None, memo=None):
+    """
+    ノード（dict / nodes.Node / ir の要素）を Compose コードに変換（明示スタックで走査するので深さの制限はない）
+    flow_dir: 親の並び方向（ルートが SPACER のときの向き）
+    memo: FragmentMemo を渡すと同一サブツリー（FRAME / INSTANCE）の生成結果を再利用する
+    """
+    return emit_engine.emit(ir.lower(n, flow_dir), level, None, expand_node, memo)
+
+# Lazy の item {} / items {} 直下の SPACER に渡す flow_dir（LazyItemScope には weight が無い）
+LAZY_ITEM = "LAZY_ITEM"
+
+def expand_node(n, level, flow_dir=None, bare=False):
+    """
+    ir の要素 1 つ分を「出力文字列」と「子タスク (node, level, flow_dir, bare)」の列に展開
+    並び方向などは ir.lower で解決済みなので、flow_dir は Lazy の直下の SPACER に LAZY_ITEM を渡すのにだけ使う
+    bare: visible ガードを処理済み
+    """
+    ind = indent(level)
+
+    # visible guard
+    if not bare and n.visible is not None:
+        return (f"{ind}if ({n.visible}) {{\n", (n, level + 1, flow_dir, True), f"\n{ind}}}")
+
+    t = n.type
+    if t == TEXT:
+        if n.bound:
+            return (f'{ind}Text({n.value})',)
+        esc = n.value.replace('"', '\\"')
+        return (f'{ind}Text("{esc}")',)
+
+    if t == SPACER:
+        # Lazy の中では伸ばす先が無いので大きさ 0 の Spacer にする
+        if flow_dir == LAZY_ITEM:
+            return (f"{ind}Spacer(Modifier.{'width' if n.axis == HORIZONTAL else 'height'}(0.dp))",)
+        if n.axis == HORIZONTAL:
+            return (f"{ind}Spacer(Modifier.width(0.dp).weight(1f))",)
+        else:
+            return (f"{ind}Spacer(Modifier.height(0.dp).weight(1f))",)
+
+    if t == INSTANCE:
+        return (instance_call(n, level, apply_size(n.layout)),)
+
+    if t == FRAME:
+        layout = n.layout
+        cont, extras, lazy = stack_container(n.axis, n.scroll, n.lazy)
+        args = [x for x in [apply_size(layout, extras), map_arrangement(layout)] if x]
+        return expand_frame(n, level, cont, args, lazy)
+
+    if t == OVERLAY:
+        alignment = alignment_name(n.vertical, n.horizontal)
+        # padding（position で指定された辺だけ）
+        pads = [f"{_PAD_EDGES[e]} = {dp(v)}" for e, v in n.insets]
+        pad = f".padding({', '.join(pads)})" if pads else ""
+        return (f"{ind}Box(Modifier.align({alignment}){pad}) {{\n", (n.child, level+1, None, False), f"\n{ind}}}")
+
+    return (f"{ind}// TODO unsupported type: {t}",)
+
+def instance_call(n, level, size_mod):
+    """
+    ir.Instance の呼び出し 1 行（size_mod: "modifier = ..." か ""）
+    """
+    args = [prop_arg(k, kind, v) for k, kind, v in n.props]
+    if size_mod: args.append(size_mod)
+    return f"{indent(level)}{to_compose_name(n.name)}({', '.join(args)})"
+
+def expand_frame(n, level, cont, args, lazy):
+    """
+    ir.Stack をコンテナ cont（引数 args）で展開する（repeat・Lazy の item / items・子の並びを含む）
+    """
+    ind = indent(level)
+    children = n.children
+    head = f"{ind}{cont}({', '.join(args)}) {{"
+    tail = f"{ind}}}"
+
+    # repeat がある場合
+    if n.repeat:
+        arrname, alias = n.repeat.source, n.repeat.alias
+        if lazy:
+            # LazyRow/LazyColumn の場合は items() を使用（key / contentType は repeat の指定から）
+            item_args = ", ".join([arrname] + items_args(n.repeat))
+            loop = f"{indent(level+1)}items({item_args}) {{ {alias} ->"
+            items = [loop] + [_item_task(ch, level+2) for ch in children] + [f"{indent(level+1)}}}"]
+            return emit_engine.lines(head, items, tail)
+        elif n.repeat.key is not None:
+            # 通常のコンテナでも key() で要素を識別する（並べ替え・挿入で他の行を作り直さない）
+            items = [f"{indent(level+1)}{arrname}.forEach {{ {alias} ->",
+                     f"{indent(level+2)}key({key_expr(n.repeat, alias)}) {{"]
+            items += [(ch, level+3, None, False) for ch in children]
+            items += [f"{indent(level+2)}}}", f"{indent(level+1)}}}"]
+            return emit_engine.lines(head, items, tail)
+        else:
+            # 通常のコンテナの場合は forEach を使用
+            loop = f"{indent(level+1)}{arrname}.forEach {{ {alias} ->"
+        items = [loop] + [(ch, level+2, None, False) for ch in children] + [f"{indent(level+1)}}}"]
+        return emit_engine.lines(head, items, tail)
+
+    # repeat がない場合
+    if lazy:
+        # LazyRow/LazyColumn の場合は各子要素を item {} でラップ
+        items = []
+        for ch in children:
+            items.append(f"{indent(level+1)}item {{")
+            items.append(_item_task(ch, level+2))
+            items.append(f"{indent(level+1)}}}")
+        return emit_engine.lines(head, items, tail)
+    else:
+        # 通常のコンテナの場合（子が無くても head と tail の間に空行が入る）
+        ops = [head, "\n"]
+        for i, ch in enumerate(children):
+            if i: ops.append("\n")
+            ops.append((ch, level+1, None, False))
+        ops.append("\n")
+        ops.append(tail)
+        return ops
+
+def _item_task(ch, level):
+    # Lazy の item {} / items {} の中に置く子タスク（SPACER にだけ LAZY_ITEM を渡す。他は memo のキーを変えない）
+    return (ch, level, LAZY_ITEM if ch.type == SPACER else None, False)
+
+_PAD_EDGES = {"left": "start", "top": "top", "right": "end", "bottom": "bottom"}
+
+def key_expr(repeat, var):
+    """
+    要素 var の識別子の式（repeat.key が "self" なら要素そのもの）
+    """
+    return var if repeat.key == "self" else f"{var}.{repeat.key}"
+
+def items_args(repeat):
+    """
+    items() の key / contentType 引数（repeat.key はプロパティ、contentType は文字列か "{{expr}}"）
+    """
+    args = []
+    if repeat.key is not None:
+        args.append(f"key = {{ {key_expr(repeat, 'it')} }}")
+    ct = repeat.content_type
+    if ct is not None:
+        expr = nodes.binding(ct)
+        if expr is None:
+            esc = ct.replace('"', '\\"')
+            args.append(f'contentType = {{ "{esc}" }}')
+        else:
+            args.append(f"contentType = {{ {repeat.alias} -> {expr} }}")
+    return args
+
+to_pascal = names.pascal
+
+def wrap_file(screen_name: str, body: str) -> str:
+    return f"""@file:Suppress("UnusedImport")
+
+package ui.generated
+
+import androidx.compose.foundation.layout.*
+import androidx.compose.foundation.rememberScrollState
+import androidx.compose.foundation.verticalScroll
+import androidx.compose.foundation.horizontalScroll
+import androidx.compose.foundation.lazy.LazyColumn
+import androidx.compose.foundation.lazy.LazyRow
+import androidx.compose.foundation.lazy.items
+import androidx.compose.material3.Text
+import androidx.compose.runtime.Composable
+import androidx.compose.runtime.key
+import androidx.compose.ui.Alignment
+import androidx.compose.ui.Modifier
+import androidx.compose.ui.unit.dp
+
+@Composable
+fun {screen_name}(
+    items: List<Any> = emptyList()
+) {{
+  Box(Modifier.fillMaxSize()) {{
+{body}
+  }}
+}}
+"""
+
+_BODY_MARK = "\x00BODY\x00"
+
+def wrap_parts(screen_name: str):
+    """
+    wrap_file のテンプレートを body の前後 (head, tail) に分割（ストリーミング出力用）
+    """
+    head, tail = wrap_file(screen_name, _BODY_MARK).split(_BODY_MARK)
+    return head, tail
+
+FILE_EXT = ".kt"
+# 出力形式を変えたら上げる（生成キャッシュのキーに含まれる）
+GENERATOR_VERSION = "4"
+
+def convert(dsl, memo=None) -> str:
+    """
+    パース済み DSL 1 画面分（dict / nodes.Node / ir.Screen）をファイル内容に変換（main / batch 共通）
+    memo: FragmentMemo（複数画面で共有すると画面をまたいで断片を再利用できる）
+    """
+    screen = ir.screen(dsl)
+    # ルートは Box 包みで OVERLAY 対応しやすく
+    root = emit_node(screen.body, 2, None, memo)
+    return wrap_file(to_pascal(screen.name), root)
+
+def iter_file(dsl, memo=None):
+    """
+    convert() と同じ内容を断片ごとに yield する（ファイル全体を 1 つの文字列にしない）
+    """
+    screen = ir.screen(dsl)
+    head, tail = wrap_parts(to_pascal(screen.name))
+    yield head
+    # ルートは Box 包みで OVERLAY 対応しやすく
+    yield from emit_engine.iter_chunks(screen.body, 2, None, expand_node, memo)
+    yield tail
+
+def write_file(dsl, write, memo=None):
+    """
+    生成しながら write(str) に逐次書き出す（print(convert(dsl)) と同じ内容で末尾に改行）
+    """
+    emit_engine.write_chunks(iter_file(dsl, memo), write)
+    write("\n")
+
+# --profile 時に時間と呼び出し回数を計測する補助関数
+PROFILE_FUNCS = ("to_compose_name", "to_pascal", "apply_size", "map_arrangement", "stack_container", "alignment_name", "prop_arg", "dp")
+
+def main():
+    """
+    入力は 1 画面の JSON / JSON Lines / 画面のトップレベル配列。1 画面ずつ読み込んで順に書き出す
+    --profile で計測結果を標準エラーに、--profile-json PATH で JSON に出力する
+    """
+    argv, prof = profiler.from_argv(sys.argv[1:])
+    docs = dsl_stream.iter_documents(sys.stdin) if not argv else dsl_stream.open_documents(argv[0])
+    if prof is None:
+        for dsl in docs:
+            write_file(dsl, sys.stdout.write)
+        return
+    for dsl in prof.iter_phase("parse", docs):
+        prof.convert(sys.modules[__name__], dsl, sys.stdout.write)
+    prof.finish()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+再コンポーズのコストを下げる Jetpack Compose 出力（バックエンド名 compose-stable）
+
+toJetpackCompose と同じ画面を、実行時に Compose がスキップしやすい形で生成する。
+- 画面の引数は @Immutable な data class（<画面名>State）にまとめる。List<Any> のままの引数は不安定で、
+  画面全体が再コンポーズのたびに実行される。配列は kotlinx.collections.immutable の ImmutableList にする
+  （List は中身を書き換えられる実装も渡せるので、@Immutable を付けても不変の保証にならない）
+- 定数の Modifier チェーンと Arrangement.spacedBy はファイル末尾の private val にして 1 回だけ作る
+  （スクロール Modifier は remember を含むので Modifier.verticalScroll(...).then(定数) の形にする）
+- バインディング・visible・repeat を含まない FRAME のうち SPLIT_MIN_NODES 以上のものは、
+  引数なしの private な @Composable に切り出す（親が再コンポーズされてもスキップされる）
+- 出力を小さくするため、バインディングを含まない同じ INSTANCE の呼び出しが画面の中で DEDUP_MIN_USES 回以上
+  出てくるときは private な @Composable（<コンポーネント名>Instance<n>）にまとめる
+
+使い方:
+  ./toJetpackComposeStable.py dsl.json > InventoryScreen.kt
+  ./batch.py compose-stable dsl/ out/android/
+
+FragmentMemo は使わない（定数名・関数名はファイル毎に決まるので断片を画面をまたいで再利用できない）。
+"""
+import sys
+from . import emit_engine
+from . import dsl_stream
+from . import ir
+from . import toJetpackCompose as base
+from .nodes import FRAME, INSTANCE
+
+FILE_EXT = base.FILE_EXT
+# 出力形式を変えたら上げる（生成キャッシュのキーに含まれる）
+GENERATOR_VERSION = "4"
+
+# これ以上のノード数の静的な FRAME を @Composable に切り出す
+SPLIT_MIN_NODES = 8
+
+# 画面の中でこの回数以上出てくる INSTANCE の呼び出しを 1 つにまとめる
+DEDUP_MIN_USES = 2
+
+to_pascal = base.to_pascal
+
+# State のフィールドにできない名前（Kotlin のハードキーワード）
+_KEYWORDS = frozenset((
+    "as", "break", "class", "continue", "do", "else", "false", "for", "fun", "if", "in", "interface",
+    "is", "null", "object", "package", "return", "super", "this", "throw", "true", "try", "typealias",
+    "typeof", "val", "var", "when", "while"))
+
+_MODIFIER = "modifier = "
+
+def _kids(el):
+    if el.__class__ is ir.Stack: return el.children
+    if el.__class__ is ir.Overlay and el.child is not None: return (el.child,)
+    return ()
+
+def _static(el):
+    # その要素自身がバインディングや repeat を含まないか（visible は呼び出し側で見る）
+    cls = el.__class__
+    if cls is ir.Text: return not el.bound
+    if cls is ir.Instance: return all(kind != ir.BINDING for _, kind, _ in el.props)
+    if cls is ir.Stack: return el.repeat is None
+    return True
+
+def _static_call(el):
+    # バインディングを含まない INSTANCE の呼び出し（インデントなし、Modifier 込み）。それ以外は None
+    if el.__class__ is not ir.Instance or not _static(el): return None
+    return base.instance_call(el, 0, base.apply_size(el.layout))
+
+def analyze(body):
+    """
+    IR を 1 回走査して (切り出す Stack の id -> ノード数, 画面の State に持たせる配列名のリスト,
+    まとめる INSTANCE の呼び出しの集合) を返す
+    配列名は repeat.for のうち別の repeat の as（要素）を指していないもの。items は常に含める
+    （Kotlin のキーワードは除く）
+    """
+    results = {}  # id(要素) -> (ノード数, 静的か)
+    split = {}
+    calls = {}
+    sources, aliases = ["items"], set()
+    stack = [(body, False)]
+    while stack:
+        el, done = stack.pop()
+        kids = _kids(el)
+        if not done:
+            stack.append((el, True))
+            stack.extend((k, False) for k in kids)
+            if el.__class__ is ir.Stack and el.repeat is not None:
+                sources.append(el.repeat.source)
+                aliases.add(el.repeat.alias)
+            call = _static_call(el)
+            if call is not None: calls[call] = calls.get(call, 0) + 1
+            continue
+        count, ok = 1, el.visible is None and _static(el)
+        for k in kids:
+            c, s = results[id(k)]
+            count += c
+            ok = ok and s
+        results[id(el)] = (count, ok)
+        if ok and el.__class__ is ir.Stack and count >= SPLIT_MIN_NODES and el is not body:
+            split[id(el)] = count
+    fields = [s for s in dict.fromkeys(sources) if s.__class__ is str and s.isidentifier()
+              and s not in aliases and s not in _KEYWORDS]
+    return split, fields, {c for c, k in calls.items() if k >= DEDUP_MIN_USES}
+
+class StableFile:
+    """
+    1 ファイル分の生成状態（ファイル末尾に書き出す定数と切り出した・まとめた @Composable）
+    """
+
+    def __init__(self, screen_name: str, split=None, shared_calls=()):
+        self.screen_name = screen_name
+        self.split = split or {}   # id(ir.Stack) -> ノード数（切り出す FRAME）
+        self.splitting = True      # 切り出した関数の本体を書き出す間は False（入れ子にしない）
+        self.consts = {}           # 式 -> 定数名（出現順）
+        self.counts = {}           # 定数名の接頭辞 -> 使った数
+        self.parts = []            # 切り出した ir.Stack（出現順）
+        self.shared_calls = shared_calls
+        self.calls = {}            # INSTANCE の呼び出し -> (関数名, ir.Instance)（出現順）
+        self.call_counts = {}      # コンポーネント名 -> 使った関数の数
+
+    def const(self, expr: str, prefix: str) -> str:
+        """
+        expr を private val にして定数名を返す（同じ式は同じ定数）
+        """
+        name = self.consts.get(expr)
+        if name is None:
+            i = self.counts.get(prefix, 0)
+            self.counts[prefix] = i + 1
+            name = self.consts[expr] = f"{prefix}{i}"
+        return name
+
+    def modifier(self, layout, extras=None) -> str:
+        """
+        base.apply_size と同じ Modifier を、サイズ・padding 部分を定数にして返す
+        """
+        size = base.apply_size(layout)
+        chain = self.const(size[len(_MODIFIER):], "Modifier") if size else None
+        if extras:
+            mods = "Modifier." + ".".join(extras)
+            return f"{_MODIFIER}{mods}.then({chain})" if chain else _MODIFIER + mods
+        return _MODIFIER + chain if chain else ""
+
+    def arrangement(self, layout) -> str:
+        arg = base.map_arrangement(layout)
+        if not arg: return ""
+        param, expr = arg.split(" = ", 1)
+        return f"{param} = {self.const(expr, 'Spacing')}"
+
+    def expand(self, n, level, flow_dir=None, bare=False):
+        """
+        base.expand_node と同じ展開（FRAME と INSTANCE の Modifier を定数にし、静的な大きい FRAME は切り出す）
+        """
+        t = n.type
+        if (t != FRAME and t != INSTANCE) or (not bare and n.visible is not None):
+            return base.expand_node(n, level, flow_dir, bare)
+        if t == INSTANCE:
+            return (self.instance(n, level),)
+        if self.splitting and id(n) in self.split:
+            self.parts.append(n)
+            return (f"{base.indent(level)}{self.part_name(len(self.parts) - 1)}()",)
+        cont, extras, lazy = base.stack_container(n.axis, n.scroll, n.lazy)
+        args = [x for x in (self.modifier(n.layout, extras), self.arrangement(n.layout)) if x]
+        return base.expand_frame(n, level, cont, args, lazy)
+
+    def instance(self, n, level) -> str:
+        if self.shared_calls:
+            key = base.instance_call(n, 0, base.apply_size(n.layout))
+            if key in self.shared_calls:
+                entry = self.calls.get(key)
+                if entry is None:
+                    call = base.to_compose_name(n.name)
+                    i = self.call_counts.get(call, 0)
+                    self.call_counts[call] = i + 1
+                    entry = self.calls[key] = (f"{call}Instance{i}", n)
+                return f"{base.indent(level)}{entry[0]}()"
+        return base.instance_call(n, level, self.modifier(n.layout))
+
+    def part_name(self, i: int) -> str:
+        return f"{self.screen_name}Section{i}"
+
+    def iter_trailer(self):
+        """
+        画面の関数の後ろに置く、切り出した・まとめた @Composable と定数の宣言を yield する
+        """
+        self.splitting = False
+        for i, part in enumerate(self.parts):
+            yield f"\n@Composable\nprivate fun {self.part_name(i)}() {{\n"
+            yield from emit_engine.iter_chunks(part, 1, None, self.expand)
+            yield "\n}\n"
+        for name, n in self.calls.values():
+            yield f"\n@Composable\nprivate fun {name}() {{\n{base.instance_call(n, 1, self.modifier(n.layout))}\n}}\n"
+        if self.consts:
+            yield "\n" + "".join(f"private val {name} = {expr}\n" for expr, name in self.consts.items())
+
+def state_param(fields) -> str:
+    """
+    画面の関数の State 引数名。フィールドと同じ名前だと val state = state.state で引数を隠すので避ける
+    """
+    name, i = "state", 1
+    while name in fields:
+        name, i = f"screenState{i if i > 1 else ''}", i + 1
+    return name
+
+def wrap_file(screen_name: str, body: str, fields=("items",)) -> str:
+    param = state_param(fields)
+    decls = ",\n".join(f"    val {f}: ImmutableList<Any> = persistentListOf()" for f in fields)
+    locals_ = "".join(f"  val {f} = {param}.{f}\n" for f in fields)
+    return f"""@file:Suppress("UnusedImport")
+
+package ui.generated
+
+import androidx.compose.foundation.layout.*
+import androidx.compose.foundation.rememberScrollState
+import androidx.compose.foundation.verticalScroll
+import androidx.compose.foundation.horizontalScroll
+import androidx.compose.foundation.lazy.LazyColumn
+import androidx.compose.foundation.lazy.LazyRow
+import androidx.compose.foundation.lazy.items
+import androidx.compose.material3.Text
+import androidx.compose.runtime.Composable
+import androidx.compose.runtime.Immutable
+import androidx.compose.runtime.key
+import androidx.compose.ui.Alignment
+import androidx.compose.ui.Modifier
+import androidx.compose.ui.unit.dp
+import kotlinx.collections.immutable.ImmutableList
+import kotlinx.collections.immutable.persistentListOf
+
+@Immutable
+data class {screen_name}State(
+{decls}
+)
+
+@Composable
+fun {screen_name}(
+    {param}: {screen_name}State = {screen_name}State()
+) {{
+{locals_}  Box(Modifier.fillMaxSize()) {{
+{body}
+  }}
+}}
+"""
+
+_BODY_MARK = "\x00BODY\x00"
+
+def wrap_parts(screen_name: str, fields=("items",)):
+    """
+    wrap_file のテンプレートを body の前後 (head, tail) に分割（ストリーミング出力用）
+    """
+    head, tail = wrap_file(screen_name, _BODY_MARK, fields).split(_BODY_MARK)
+    return head, tail
+
+def iter_file(dsl, memo=None):
+    """
+    1 画面分（dict / nodes.Node / ir.Screen）のファイル内容を断片ごとに yield する（memo は使わない）
+    """
+    screen = ir.screen(dsl)
+    name = to_pascal(screen.name)
+    split, fields, shared = analyze(screen.body)
+    f = StableFile(name, split, shared)
+    head, tail = wrap_parts(name, fields)
+    yield head
+    # ルートは Box 包みで OVERLAY 対応しやすく
+    yield from emit_engine.iter_chunks(screen.body, 2, None, f.expand)
+    yield tail
+    yield from f.iter_trailer()
+
+def convert(dsl, memo=None) -> str:
+    """
+    パース済み DSL 1 画面分をファイル内容に変換（main / batch 共通。memo は使わない）
+    """
+    return "".join(iter_file(dsl))
+
+def write_file(dsl, write, memo=None):
+    """
+    生成しながら write(str) に逐次書き出す（print(convert(dsl)) と同じ内容で末尾に改行）
+    """
+    emit_engine.write_chunks(iter_file(dsl), write)
+    write("\n")
+
+def main(argv=None):
+    """
+    入力は 1 画面の JSON / JSON Lines / 画面のトップレベル配列。1 画面ずつ読み込んで順に書き出す
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    docs = dsl_stream.iter_documents(sys.stdin) if not argv else dsl_stream.open_documents(argv[0])
+    for dsl in docs:
+        write_file(dsl, sys.stdout.write)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import sys, json
+from . import emit_engine
+from . import dsl_stream
+from . import profiler
+from . import names
+from . import nodes
+from . import ir
+from .nodes import FRAME, TEXT, INSTANCE, OVERLAY, SPACER, VERTICAL, HORIZONTAL, FILL, FIXED
+
+def px(n):
+    if n is None: return None
+    if isinstance(n, (int, float)):
+        return f"{int(round(n))}"
+    return None
+
+def indent(n): return "  " * n
+
+# 正規表現のコンパイルと変換結果のキャッシュは names.py（toJetpackCompose と共通）
+to_pascal = names.pascal
+to_swift_name = names.component_name
+
+def edge_insets(pad):
+    if not isinstance(pad, (list, tuple)) or len(pad) != 4: return None
+    l,t,r,b = [int(round(x or 0)) for x in pad]
+    return f"EdgeInsets(top: {t}, leading: {l}, bottom: {b}, trailing: {r})"
+
+def apply_frame(layout) -> str:
+    """
+    レイアウト（nodes.Layout または dict）から .frame / .padding を生成
+    """
+    if layout.__class__ is dict: layout = nodes.build_layout(layout)
+    if not layout: return ""
+    # Layout は共有されるので結果を Layout に覚えておく
+    return layout.derive("swiftui.frame", _frame)
+
+def _frame(layout):
+    mods = []
+    w = layout.width or _NO_SIZE
+    h = layout.height or _NO_SIZE
+    if w.mode == FILL:  mods.append("maxWidth: .infinity")
+    elif w.mode == FIXED and w.value is not None: mods.append(f"width: {px(w.value)}")
+    if h.mode == FILL:  mods.append("maxHeight: .infinity")
+    elif h.mode == FIXED and h.value is not None: mods.append(f"height: {px(h.value)}")
+    out = ""
+    if mods: out += f".frame({', '.join(mods)})"
+    ei = edge_insets(layout.padding)
+    if ei: out += f".padding({ei})"
+    return out
+
+_NO_SIZE = nodes.Size(None, None)
+
+# 注釈は文字列のままにして typing を import しない（起動を軽くする。3.8/3.9 でも動く）
+def stack_head(layout, scroll: "Optional[str]"):
+    if layout.__class__ is dict: layout = nodes.build_layout(layout)
+    return stack_views(layout, *ir.container(layout, scroll))
+
+def stack_views(layout, axis, scroll, lazy):
+    """
+    ir.Stack の (axis, scroll, lazy) から (外側のビュー, 内側のスタック or None) を返す
+    """
+    if layout: return layout.derive(("swiftui.head", axis, scroll, lazy), lambda lay: _stack_views(lay, axis, scroll, lazy))
+    return _stack_views(layout, axis, scroll, lazy)
+
+def _stack_views(layout, axis, scroll, lazy):
+    spacing = layout.spacing if layout else None
+    sp_arg = f"spacing: {int(round(spacing))}" if spacing else ""
+    if lazy:
+        return ("ScrollView(.horizontal, showsIndicators: false)", f"HStack({sp_arg})")
+    if axis == HORIZONTAL:
+        return (f"HStack({sp_arg})", None)
+    if scroll == VERTICAL:
+        return ("ScrollView(.vertical, showsIndicators: true)", f"VStack({sp_arg})")
+    return (f"VStack({sp_arg})", None)
+
+def lazy_views(layout, axis):
+    """
+    スクロールする repeat の (ScrollView, LazyVStack / LazyHStack)
+    """
+    if layout: return layout.derive(("swiftui.lazy", axis), lambda lay: _lazy_views(lay, axis))
+    return _lazy_views(layout, axis)
+
+def _lazy_views(layout, axis):
+    spacing = layout.spacing if layout else None
+    sp_arg = f"spacing: {int(round(spacing))}" if spacing else ""
+    if axis == HORIZONTAL:
+        return ("ScrollView(.horizontal, showsIndicators: false)", f"LazyHStack({sp_arg})")
+    return ("ScrollView(.vertical, showsIndicators: true)", f"LazyVStack({sp_arg})")
+
+_ALIGNMENTS = {
+    (ir.TOP, ir.START): ".topLeading", (ir.TOP, ir.END): ".topTrailing", (ir.TOP, ir.CENTER): ".top",
+    (ir.BOTTOM, ir.START): ".bottomLeading", (ir.BOTTOM, ir.END): ".bottomTrailing", (ir.BOTTOM, ir.CENTER): ".bottom",
+    (ir.CENTER, ir.START): ".leading", (ir.CENTER, ir.END): ".trailing", (ir.CENTER, ir.CENTER): ".center",
+}
+
+def calculate_swiftui_alignment(position):
+    """
+    position から SwiftUI の Alignment を計算
+    """
+    return alignment_name(*ir.alignment(position))
+
+def alignment_name(vertical, horizontal):
+    """
+    ir.Overlay の (vertical, horizontal) を SwiftUI の Alignment に
+    """
+    return _ALIGNMENTS[(vertical, horizontal)]
+
+def stringify_prop(k, v):
+    return prop_arg(k, *ir.prop_value(v))
+
+def prop_arg(k, kind, v):
+    """
+    ir.Instance の props 1 つ分 (key, 種類, 値) を引数に
+    """
+    if kind == ir.BOOL: return f"{k}: {str(v).lower()}"
+    if kind == ir.NUMBER: return f"{k}: {int(round(v))}"
+    if kind == ir.BINDING: return f"{k}: {v}"
+    if kind == ir.STRING:
+        esc = v.replace('"','\\"')
+        return f'{k}: "{esc}"'
+    return f"/* unsupported prop {k} */"
+
+def emit_node(n, level, flow_dir=None, memo=None):
+    """
+    ノード（dict / nodes.Node / ir の要素）を SwiftUI コードに変換（明示スタックで走査するので深さの制限はない）
+    memo: FragmentMemo を渡すと同一サブツリー（FRAME / INSTANCE）の生成結果を再利用する
+    """
+    return emit_engine.emit(ir.lower(n, flow_dir), level, None, expand_node, memo)
+
+def expand_node(n, level, flow_dir=None, bare=False):
+    """
+    ir の要素 1 つ分を「出力文字列」と「子タスク (node, level, flow_dir, bare)」の列に展開
+    並び方向などは ir.lower で解決済みなので flow_dir は使わない
+    bare: visible ガードを処理済み
+    """
+    ind = indent(level)
+
+    if not bare and n.visible is not None:
+        return (f"{ind}if {n.visible} {{\n", (n, level + 1, None, True), f"\n{ind}}}")
+
+    t = n.type
+    if t == TEXT:
+        if n.bound:
+            return (f'{ind}Text({n.value})',)
+        esc = n.value.replace('"','\\"')
+        return (f'{ind}Text("{esc}")',)
+
+    if t == SPACER:
+        return (f"{ind}Spacer()",)
+
+    if t == INSTANCE:
+        return (instance_call(n, level, apply_frame(n.layout)),)
+
+    if t == FRAME:
+        return expand_frame(n, level, apply_frame(n.layout))
+
+    if t == OVERLAY:
+        alignment = alignment_name(n.vertical, n.horizontal)
+        # padding（position で指定された辺だけ、trailing, leading, top, bottom の順）
+        insets = dict(n.insets)
+        pad = "".join(f".padding({edge}, {px(insets[e])})" for e, edge in _PAD_EDGES if e in insets)
+        return (f"{ind}ZStack(alignment: {alignment}) {{\n", (n.child, level+1, None, False), f"\n{ind}}}{pad}")
+
+    return (f"{ind}// TODO unsupported type: {t}",)
+
+def instance_call(n, level, sz):
+    """
+    ir.Instance の呼び出し 1 行（sz: 後ろに付ける .frame / .padding）
+    """
+    args = [prop_arg(k, kind, v) for k, kind, v in n.props]
+    return f"{indent(level)}{to_swift_name(n.name)}({', '.join(a for a in args if a)}){sz}"
+
+def expand_frame(n, level, sz):
+    """
+    ir.Stack を展開する（sz: 閉じ括弧の後ろに付ける .frame / .padding。repeat・Lazy の ForEach を含む）
+    """
+    ind = indent(level)
+    layout = n.layout
+    children = n.children
+    if n.repeat:
+        if n.lazy:
+            # スクロールする repeat は ScrollView + LazyVStack / LazyHStack（表示される行だけ作る）
+            head, inner = lazy_views(layout, n.axis)
+        else:
+            # それ以外の ForEach はスクロール指定に関わらず layout.direction のスタックに入れる
+            axis = HORIZONTAL if n.direction == HORIZONTAL else VERTICAL
+            head, inner = stack_views(layout, axis, None, False)
+        if inner:
+            items = [f"{indent(level+1)}{inner} {{"]
+            items += for_each(n.repeat, children, level+2)
+            items += [f"{indent(level+1)}}}"]
+        else:
+            items = for_each(n.repeat, children, level+1)
+        return emit_engine.lines(f"{ind}{head} {{", items, f"{ind}}}{sz}")
+
+    head, inner = stack_views(layout, n.axis, n.scroll, n.lazy)
+    if inner:
+        items = [f"{indent(level+1)}{inner} {{"]
+        items += [(ch, level+2, None, False) for ch in children]
+        items += [f"{indent(level+1)}}}"]
+    else:
+        items = [(ch, level+1, None, False) for ch in children]
+    return emit_engine.lines(f"{ind}{head} {{", items, f"{ind}}}{sz}")
+
+_PAD_EDGES = (("right", ".trailing"), ("left", ".leading"), ("top", ".top"), ("bottom", ".bottom"))
+
+def for_each(repeat, children, level):
+    """
+    repeat の ForEach（出力行と子タスクの列）。repeat.key があれば要素そのものをその key path で識別する
+    contentType に当たるものは SwiftUI には無い（Lazy スタックはビューの型で再利用する）
+    """
+    arrname, alias = repeat.source, repeat.alias
+    if repeat.key is not None:
+        items = [f"{indent(level)}ForEach({arrname}, id: \\.{repeat.key}) {{ {alias} in"]
+        items += [(ch, level+1, None, False) for ch in children]
+    else:
+        items = [
+            f"{indent(level)}ForEach({arrname}.indices, id: \\.self) {{ idx in",
+            f"{indent(level+1)}let {alias} = {arrname}[idx]",
+        ]
+        items += [(ch, level+1, None, False) for ch in children]
+    items.append(f"{indent(level)}}}")
+    return items
+
+def wrap_file(screen_name: str, body: str) -> str:
+    return f"""import SwiftUI
+
+struct {screen_name}: View {{
+    var items: [Any] = []
+
+    var body: some View {{
+        ZStack(alignment: .center) {{
+{body}
+        }}
+    }}
+}}
+
+#Preview {{
+    {screen_name}()
+}}
+"""
+
+_BODY_MARK = "\x00BODY\x00"
+
+def wrap_parts(screen_name: str):
+    """
+    wrap_file のテンプレートを body の前後 (head, tail) に分割（ストリーミング出力用）
+    """
+    head, tail = wrap_file(screen_name, _BODY_MARK).split(_BODY_MARK)
+    return head, tail
+
+FILE_EXT = ".swift"
+# 出力形式を変えたら上げる（生成キャッシュのキーに含まれる）
+GENERATOR_VERSION = "2"
+
+def convert(dsl, memo=None) -> str:
+    """
+    パース済み DSL 1 画面分（dict / nodes.Node / ir.Screen）をファイル内容に変換（main / batch 共通）
+    memo: FragmentMemo（複数画面で共有すると画面をまたいで断片を再利用できる）
+    """
+    screen = ir.screen(dsl)
+    body = emit_node(screen.body, 2, None, memo)
+    return wrap_file(to_pascal(screen.name), body)
+
+def iter_file(dsl, memo=None):
+    """
+    convert() と同じ内容を断片ごとに yield する（ファイル全体を 1 つの文字列にしない）
+    """
+    screen = ir.screen(dsl)
+    head, tail = wrap_parts(to_pascal(screen.name))
+    yield head
+    yield from emit_engine.iter_chunks(screen.body, 2, None, expand_node, memo)
+    yield tail
+
+def write_file(dsl, write, memo=None):
+    """
+    生成しながら write(str) に逐次書き出す（print(convert(dsl)) と同じ内容で末尾に改行）
+    """
+    emit_engine.write_chunks(iter_file(dsl, memo), write)
+    write("\n")
+
+# --profile 時に時間と呼び出し回数を計測する補助関数
+PROFILE_FUNCS = ("to_swift_name", "to_pascal", "apply_frame", "edge_insets", "stack_views", "alignment_name", "prop_arg", "px")
+
+def main():
+    """
+    入力は 1 画面の JSON / JSON Lines / 画面のトップレベル配列。1 画面ずつ読み込んで順に書き出す
+    --profile で計測結果を標準エラーに、--profile-json PATH で JSON に出力する
+    """
+    argv, prof = profiler.from_argv(sys.argv[1:])
+    docs = dsl_stream.iter_documents(sys.stdin) if not argv else dsl_stream.open_documents(argv[0])
+    if prof is None:
+        for dsl in docs:
+            write_file(dsl, sys.stdout.write)
+        return
+    for dsl in prof.iter_phase("parse", docs):
+        prof.convert(sys.modules[__name__], dsl, sys.stdout.write)
+    prof.finish()
+
+if __name__ == "__main__":
+    main()
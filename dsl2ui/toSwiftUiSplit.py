@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+大きな画面を複数の View struct に分けて出力する SwiftUI（バックエンド名 swiftui-split）
+
+toSwiftUi は画面全体を 1 つの var body に入れるため、大きな画面ではジェネリクスの型が巨大になり
+Swift の型チェックに時間がかかり、状態が変わるたびに body 全体が評価し直される。
+ここでは FRAME の境界でツリーを切り、切った FRAME を `struct <画面名>Section<n>: View` にする。
+
+- 葉の側から数えて、1 つの body に残るノード数が max_nodes 以上、または入れ子の深さが max_depth 以上に
+  なった FRAME を切る（0 でその条件を使わない）。ルートの FRAME は切らない
+- 切った FRAME の中で使われるバインディング（{{expr}} の先頭の名前、repeat.for、visible）のうち、
+  その中の repeat が導入したもの以外をプロパティにして呼び出し側から渡す
+  （repeat.for に使われる名前は [Any]、visible にそのまま使われる名前は Bool、それ以外は Any）
+- 出力を小さくするため、画面の中で DEDUP_MIN_USES 回以上出てくる同じ .frame / .padding の並びは
+  private extension View のメソッド（layout<n>()）に、バインディングを含まない同じ INSTANCE の呼び出しは
+  private な View struct（<コンポーネント名>Instance<n>）にまとめる
+
+使い方:
+  ./toSwiftUiSplit.py dsl.json > InventoryScreen.swift
+  ./toSwiftUiSplit.py dsl.json --max-nodes 20 --max-depth 4 > InventoryScreen.swift
+  ./batch.py swiftui-split dsl/ out/ios/
+
+FragmentMemo は使わない（struct 名はファイル毎に決まるので断片を画面をまたいで再利用できない）。
+"""
+import sys, re
+from . import emit_engine
+from . import dsl_stream
+from . import ir
+from . import toSwiftUi as base
+from .nodes import FRAME, INSTANCE
+
+FILE_EXT = base.FILE_EXT
+# 出力形式を変えたら上げる（生成キャッシュのキーに含まれる）
+GENERATOR_VERSION = "3"
+
+# 既定の切り方（convert / CLI の引数で変えられる）
+MAX_NODES = 32
+MAX_DEPTH = 6
+
+# 画面の中でこの回数以上出てくる修飾子の並び・INSTANCE の呼び出しを 1 つにまとめる
+DEDUP_MIN_USES = 2
+
+to_pascal = base.to_pascal
+wrap_file = base.wrap_file
+wrap_parts = base.wrap_parts
+
+# 式の中の名前（. の後ろのプロパティ名と、( が続く関数名は除く）
+_NAME = re.compile(r"(?<![\w.])[A-Za-z_]\w*(?!\w|\s*\()")
+_KEYWORDS = frozenset(("true", "false", "nil", "self", "is", "as", "in", "let", "var", "if", "else"))
+
+def _code(expr: str) -> str:
+    # 文字列リテラルの中身を空白にした式（\( … ) の補間の中は式として残す）
+    out = []
+    in_str = False
+    depths = []  # 補間の中で開いている括弧の数（補間の入れ子ごと）
+    i, n = 0, len(expr)
+    while i < n:
+        c = expr[i]
+        if in_str:
+            if c == "\\" and i + 1 < n:
+                if expr[i + 1] == "(":
+                    in_str = False
+                    depths.append(0)
+                out.append("  ")
+                i += 2
+                continue
+            if c == '"': in_str = False
+            out.append(" ")
+        elif c == '"':
+            in_str = True
+            out.append(" ")
+        elif depths and c == "(":
+            depths[-1] += 1
+            out.append(c)
+        elif depths and c == ")":
+            if depths[-1]:
+                depths[-1] -= 1
+                out.append(c)
+            else:
+                # 補間の終わり。文字列に戻る
+                depths.pop()
+                in_str = True
+                out.append(" ")
+        else:
+            out.append(c)
+        i += 1
+    return "".join(out)
+
+def expr_names(expr):
+    """
+    式の中で参照される名前（先頭の識別子）を出現順に
+    文字列リテラルの中（補間 \\( … ) を除く）と関数呼び出しの名前は含めない
+    """
+    if not expr: return ()
+    if '"' in expr: expr = _code(expr)
+    return [m for m in _NAME.findall(expr) if m not in _KEYWORDS]
+
+def _kids(el):
+    if el.__class__ is ir.Stack: return el.children
+    if el.__class__ is ir.Overlay and el.child is not None: return (el.child,)
+    return ()
+
+def _own_names(el):
+    # visible 以外で要素自身が参照する名前
+    cls = el.__class__
+    if cls is ir.Text: return expr_names(el.value) if el.bound else ()
+    if cls is ir.Instance: return [m for _, kind, v in el.props if kind == ir.BINDING for m in expr_names(v)]
+    if cls is ir.Stack and el.repeat is not None: return expr_names(el.repeat.source)
+    return ()
+
+def analyze(body, max_nodes, max_depth):
+    """
+    IR を 1 回走査して (切る Stack の id -> 渡す名前のリスト, 名前 -> Swift の型) を返す
+    """
+    results = {}  # id(要素) -> (body に残るノード数, 深さ, 参照する名前（visible を含む）)
+    cuts = {}
+    types = {}
+    stack = [(body, False)]
+    while stack:
+        el, done = stack.pop()
+        kids = _kids(el)
+        if not done:
+            stack.append((el, True))
+            stack.extend((k, False) for k in kids)
+            continue
+        size, height = 1, 0
+        inner = dict.fromkeys(_own_names(el))
+        for k in kids:
+            s, h, names = results[id(k)]
+            size += s
+            height = max(height, h)
+            inner.update(names)
+        height += 1
+        if el.__class__ is ir.Stack and el.repeat is not None:
+            inner.pop(el.repeat.alias, None)
+            if el.repeat.source.isidentifier(): types[el.repeat.source] = "[Any]"
+        if el.visible is not None:
+            if el.visible.isidentifier() and types.get(el.visible) != "[Any]": types[el.visible] = "Bool"
+            names = dict.fromkeys(expr_names(el.visible))
+            names.update(inner)
+        else:
+            names = inner
+        if el.__class__ is ir.Stack and el is not body and (
+                (max_nodes and size >= max_nodes) or (max_depth and height >= max_depth)):
+            cuts[id(el)] = list(inner)
+            size, height = 1, 1  # 呼び出し 1 行になる
+        results[id(el)] = (size, height, names)
+    return cuts, types
+
+def _static_call(el):
+    # バインディングを含まない INSTANCE の呼び出し（インデントなし、.frame / .padding 込み）。それ以外は None
+    if el.__class__ is not ir.Instance or any(kind == ir.BINDING for _, kind, _ in el.props): return None
+    return base.instance_call(el, 0, base.apply_frame(el.layout))
+
+def find_shared(body):
+    """
+    IR を 1 回走査して、まとめる (INSTANCE の呼び出しの集合, .frame / .padding の並びの集合) を返す
+    まとめた INSTANCE の修飾子は struct の中に 1 回だけ書かれるので 1 回と数える
+    """
+    calls, chains, statics = {}, {}, []
+    stack = [body]
+    while stack:
+        el = stack.pop()
+        stack.extend(_kids(el))
+        call = _static_call(el)
+        if call is not None:
+            calls[call] = calls.get(call, 0) + 1
+            statics.append((call, el.layout))
+        elif el.__class__ is ir.Stack or el.__class__ is ir.Instance:
+            sz = base.apply_frame(el.layout)
+            if sz: chains[sz] = chains.get(sz, 0) + 1
+    shared = {c for c, k in calls.items() if k >= DEDUP_MIN_USES}
+    seen = set()
+    for call, layout in statics:
+        if call in shared:
+            if call in seen: continue
+            seen.add(call)
+        sz = base.apply_frame(layout)
+        if sz: chains[sz] = chains.get(sz, 0) + 1
+    return shared, {sz for sz, k in chains.items() if k >= DEDUP_MIN_USES}
+
+class SplitFile:
+    """
+    1 ファイル分の生成状態（切り出した View struct、まとめた INSTANCE と修飾子）
+    """
+
+    def __init__(self, screen_name: str, cuts=None, types=None, shared_calls=(), shared_chains=()):
+        self.screen_name = screen_name
+        self.cuts = cuts or {}     # id(ir.Stack) -> 渡す名前
+        self.types = types or {}
+        self.parts = []            # 切り出した ir.Stack（出現順）
+        self.root = None           # 本体を書き出し中の struct のルート（それ自身は切らない）
+        self.shared_calls = shared_calls
+        self.shared_chains = shared_chains
+        self.calls = {}            # INSTANCE の呼び出し -> (struct 名, ir.Instance)（出現順）
+        self.chains = {}           # .frame / .padding の並び -> メソッド名（出現順）
+        self.counts = {}           # コンポーネント名 -> 使った struct の数
+
+    def expand(self, n, level, flow_dir=None, bare=False):
+        """
+        toSwiftUi.expand_node と同じ展開（切る FRAME は struct の呼び出しにする。visible ガードは呼び出し側に残す）
+        """
+        if n is self.root:
+            bare = True
+        elif not bare and n.visible is not None:
+            return base.expand_node(n, level, flow_dir, bare)
+        t = n.type
+        if t == INSTANCE:
+            return (self.instance(n, level),)
+        if t != FRAME:
+            return base.expand_node(n, level, flow_dir, bare)
+        if n is not self.root:
+            names = self.cuts.get(id(n))
+            if names is not None:
+                self.parts.append(n)
+                args = ", ".join(f"{v}: {v}" for v in names)
+                return (f"{base.indent(level)}{self.part_name(len(self.parts) - 1)}({args})",)
+        return base.expand_frame(n, level, self.modifier(base.apply_frame(n.layout)))
+
+    def modifier(self, sz: str) -> str:
+        """
+        まとめる修飾子の並びはメソッド呼び出しにする
+        """
+        if sz not in self.shared_chains: return sz
+        name = self.chains.get(sz)
+        if name is None:
+            name = self.chains[sz] = f"layout{len(self.chains)}"
+        return f".{name}()"
+
+    def instance(self, n, level) -> str:
+        sz = base.apply_frame(n.layout)
+        if self.shared_calls:
+            key = base.instance_call(n, 0, sz)
+            if key in self.shared_calls:
+                entry = self.calls.get(key)
+                if entry is None:
+                    call = base.to_swift_name(n.name)
+                    i = self.counts.get(call, 0)
+                    self.counts[call] = i + 1
+                    entry = self.calls[key] = (f"{call}Instance{i}", n)
+                return f"{base.indent(level)}{entry[0]}()"
+        return base.instance_call(n, level, self.modifier(sz))
+
+    def part_name(self, i: int) -> str:
+        return f"{self.screen_name}Section{i}"
+
+    def iter_trailer(self):
+        """
+        画面の struct の後ろに置く View struct を出現順に yield する（struct の中で切った FRAME も続けて出す）
+        続けて、まとめた INSTANCE の struct と修飾子のメソッドを yield する
+        """
+        i = 0
+        while i < len(self.parts):
+            n = self.root = self.parts[i]
+            names = self.cuts[id(n)]
+            yield f"\nstruct {self.part_name(i)}: View {{\n"
+            if names:
+                yield "".join(f"    let {v}: {self.types.get(v, 'Any')}\n" for v in names) + "\n"
+            yield "    var body: some View {\n"
+            yield from emit_engine.iter_chunks(n, 4, None, self.expand)
+            yield "\n    }\n}\n"
+            i += 1
+        self.root = None
+        for name, n in self.calls.values():
+            line = base.instance_call(n, 4, self.modifier(base.apply_frame(n.layout)))
+            yield f"\nprivate struct {name}: View {{\n    var body: some View {{\n{line}\n    }}\n}}\n"
+        if self.chains:
+            yield "\nprivate extension View {\n" + "\n".join(
+                f"    func {name}() -> some View {{\n        self{sz}\n    }}\n" for sz, name in self.chains.items()) + "}\n"
+
+def iter_file(dsl, memo=None, max_nodes=None, max_depth=None):
+    """
+    1 画面分（dict / nodes.Node / ir.Screen）のファイル内容を断片ごとに yield する（memo は使わない）
+    max_nodes / max_depth: 切る条件（None で MAX_NODES / MAX_DEPTH、0 でその条件を使わない）
+    """
+    screen = ir.screen(dsl)
+    name = to_pascal(screen.name)
+    cuts, types = analyze(screen.body, MAX_NODES if max_nodes is None else max_nodes,
+                          MAX_DEPTH if max_depth is None else max_depth)
+    f = SplitFile(name, cuts, types, *find_shared(screen.body))
+    head, tail = wrap_parts(name)
+    yield head
+    yield from emit_engine.iter_chunks(screen.body, 2, None, f.expand)
+    yield tail
+    yield from f.iter_trailer()
+
+def convert(dsl, memo=None, max_nodes=None, max_depth=None) -> str:
+    """
+    パース済み DSL 1 画面分をファイル内容に変換（main / batch 共通。memo は使わない）
+    """
+    return "".join(iter_file(dsl, None, max_nodes, max_depth))
+
+def write_file(dsl, write, memo=None, max_nodes=None, max_depth=None):
+    """
+    生成しながら write(str) に逐次書き出す（print(convert(dsl)) と同じ内容で末尾に改行）
+    """
+    emit_engine.write_chunks(iter_file(dsl, None, max_nodes, max_depth), write)
+    write("\n")
+
+def main(argv=None):
+    """
+    入力は 1 画面の JSON / JSON Lines / 画面のトップレベル配列。1 画面ずつ読み込んで順に書き出す
+    """
+    import argparse
+    ap = argparse.ArgumentParser(description="DSL を View struct に分けた SwiftUI に変換")
+    ap.add_argument("src", nargs="?", help="DSL（省略時は標準入力）")
+    ap.add_argument("--max-nodes", type=int, default=MAX_NODES,
+                    help=f"1 つの body に残すノード数の上限（0 で無制限、既定 {MAX_NODES}）")
+    ap.add_argument("--max-depth", type=int, default=MAX_DEPTH,
+                    help=f"1 つの body の入れ子の深さの上限（0 で無制限、既定 {MAX_DEPTH}）")
+    args = ap.parse_args(argv)
+    docs = dsl_stream.iter_documents(sys.stdin) if not args.src else dsl_stream.open_documents(args.src)
+    for dsl in docs:
+        write_file(dsl, sys.stdout.write, None, args.max_nodes, args.max_depth)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DSL のスキーマ検証（生成を行わずに壊れたノードをまとめて見つける）
+
+使い方:
+  ./validate.py dsl/                          # 配下の *.json をすべて検証
+  ./validate.py "dsl/**/*.json" --jobs 0      # 全コアで並列に検証
+  ./validate.py dsl/ --fail-fast              # 各ファイルで最初のエラーだけ報告
+  ./validate.py dsl/ --cache-dir .dsl2ui-cache   # 内容が変わっていないファイルは検証結果を再利用
+
+変換器は未知の type を "// TODO unsupported type" のコメントにし、長さの違う padding などは黙って捨てる。
+validate() はツリーを明示スタックで 1 回だけ走査し、そうした問題をすべて JSON Pointer（RFC 6901）の
+パス付きで返す。パスは親へのリンクとして持ち、エラーになったノードの分だけ文字列にするので走査は線形。
+検証結果は DSL の内容ハッシュをキーに cache.BuildCache に保存できる（生成結果のキャッシュと同じディレクトリでよい）。
+"""
+import sys, os, json, math, time, hashlib, argparse
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from . import cache as build_cache
+from . import decoder
+from . import dsl_binary
+from . import nodes
+
+# スキーマを変えたら上げる（キャッシュ済みの検証結果が無効になる）
+SCHEMA_VERSION = "3"
+
+# 1 件の問題（path は JSON Pointer、ルートは ""）
+Issue = namedtuple("Issue", "path message")
+
+# 1 ファイル分の検証結果（error は読み込めなかったときのメッセージ、cached はキャッシュから再利用したか）
+FileIssues = namedtuple("FileIssues", "src issues seconds error cached", defaults=(None, False))
+
+TYPES = ("FRAME", "TEXT", "SPACER", "INSTANCE", "OVERLAY")
+DIRECTIONS = ("VERTICAL", "HORIZONTAL")
+MODES = ("FILL", "FIXED", "HUG")
+SCROLLS = ("vertical", "horizontal")
+EDGES = ("left", "top", "right", "bottom")
+
+# type 毎に意味を持つフィールド（それ以外の type に付いていても変換器は無視する）
+_ONLY = {
+    "children": ("FRAME",),
+    "scroll": ("FRAME",),
+    "repeat": ("FRAME",),
+    "layout": ("FRAME", "INSTANCE"),
+    "text": ("TEXT",),
+    "props": ("INSTANCE",),
+    "position": ("OVERLAY",),
+    "child": ("OVERLAY",),
+}
+
+class _FailFast(Exception):
+    pass
+
+def escape(key) -> str:
+    """
+    JSON Pointer の 1 要素分のエスケープ（~ -> ~0、/ -> ~1）
+    """
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+def pointer(path) -> str:
+    # (親のパス, 要素) のリンクを JSON Pointer の文字列に
+    parts = []
+    while path is not None:
+        path, key = path
+        parts.append(escape(key))
+    return "".join("/" + p for p in reversed(parts))
+
+def _is_number(v) -> bool:
+    return (v.__class__ is int or v.__class__ is float) and math.isfinite(v)
+
+def validate(dsl, fail_fast: bool = False) -> list:
+    """
+    DSL（json.loads の結果か dsl_binary.Node）を検証して Issue のリストを返す（問題が無ければ空）
+    dsl_binary.Node は dict に戻して検証する（バイナリに残らない未知のキーは見つからない）
+    fail_fast: 最初の問題を見つけた時点で止める（戻り値は高々 1 件）
+    """
+    if dsl.__class__ is dsl_binary.Node: dsl = dsl.to_dict()
+    issues = []
+
+    def report(path, message):
+        issues.append(Issue(pointer(path), message))
+        if fail_fast: raise _FailFast
+
+    try:
+        stack = [(dsl, None)]
+        while stack:
+            n, path = stack.pop()
+            if n.__class__ is not dict:
+                report(path, "node must be an object")
+                continue
+            kids = _check_node(n, path, report)
+            if kids: stack.extend(reversed(kids))
+    except _FailFast:
+        pass
+    return issues
+
+def _check_node(n: dict, path, report) -> list:
+    # ノード 1 つ分を検証し、続けて検証する子 (node, path) を返す
+    t = n.get("type")
+    if t is None:
+        report(path, "missing type")
+    elif t not in TYPES:
+        report((path, "type"), f"unknown type {t!r} (expected one of {', '.join(TYPES)})")
+        t = None
+    for key, types in _ONLY.items():
+        if t is not None and key in n and t not in types:
+            report((path, key), f"{key} is ignored on {t} (only for {', '.join(types)})")
+
+    if "visible" in n:
+        vis = n["visible"]
+        if vis.__class__ is not str or not (vis.startswith("{{") and vis.endswith("}}")) or not vis[2:-2].strip():
+            report((path, "visible"), "visible must be a binding like \"{{expr}}\"")
+    if "layout" in n:
+        _check_layout(n["layout"], (path, "layout"), report)
+
+    kids = []
+    if t == "FRAME":
+        if "scroll" in n and n["scroll"] not in SCROLLS:
+            report((path, "scroll"), f"scroll must be one of {', '.join(SCROLLS)}")
+        if "repeat" in n:
+            _check_repeat(n["repeat"], (path, "repeat"), report)
+        children = n.get("children")
+        if children is not None:
+            if children.__class__ is not list:
+                report((path, "children"), "children must be an array")
+            else:
+                cpath = (path, "children")
+                kids = [(ch, (cpath, i)) for i, ch in enumerate(children)]
+    elif t == "TEXT":
+        if "text" in n and n["text"].__class__ is not str:
+            report((path, "text"), "text must be a string")
+    elif t == "INSTANCE":
+        name = n.get("name")
+        if name.__class__ is not str or not name:
+            report((path, "name"), "INSTANCE requires a component name")
+        if "props" in n:
+            _check_props(n["props"], (path, "props"), report)
+    elif t == "OVERLAY":
+        if "position" in n:
+            _check_position(n["position"], (path, "position"), report)
+        child = n.get("child")
+        if child is None:
+            report(path, "OVERLAY requires a child")
+        else:
+            kids = [(child, (path, "child"))]
+    return kids
+
+def _check_layout(layout, path, report):
+    if layout.__class__ is not dict:
+        report(path, "layout must be an object")
+        return
+    if "direction" in layout and layout["direction"] not in DIRECTIONS:
+        report((path, "direction"), f"direction must be one of {', '.join(DIRECTIONS)}")
+    if "spacing" in layout and not _is_number(layout["spacing"]):
+        report((path, "spacing"), "spacing must be a number")
+    for axis in ("width", "height"):
+        if axis in layout:
+            _check_size(layout[axis], (path, axis), report)
+    if "padding" in layout:
+        pad = layout["padding"]
+        if pad.__class__ is not list or len(pad) != 4:
+            report((path, "padding"), "padding must be an array of 4 numbers [left, top, right, bottom]")
+        else:
+            for i, p in enumerate(pad):
+                if not _is_number(p): report(((path, "padding"), i), "padding must be a number")
+
+def _check_size(size, path, report):
+    if size.__class__ is not dict:
+        report(path, "size must be an object like {\"mode\": \"FIXED\", \"value\": 120}")
+        return
+    mode = size.get("mode")
+    if mode not in MODES:
+        report((path, "mode"), f"mode must be one of {', '.join(MODES)}")
+    if "value" in size:
+        if not _is_number(size["value"]): report((path, "value"), "value must be a number")
+    elif mode == "FIXED":
+        report(path, "FIXED size requires a value")
+
+def _check_repeat(repeat, path, report):
+    if repeat.__class__ is not dict:
+        report(path, "repeat must be an object like {\"for\": \"items\", \"as\": \"item\"}")
+        return
+    for key in ("for", "as", "contentType"):
+        if key in repeat and (repeat[key].__class__ is not str or not repeat[key]):
+            report((path, key), f"repeat.{key} must be a non-empty string")
+    for key in ("key", "id"):
+        if key in repeat and not nodes.is_key_path(repeat[key]):
+            report((path, key), f"repeat.{key} must be a property path like \"id\" or \"meta.sku\" (or \"self\")")
+    if "key" in repeat and "id" in repeat:
+        report((path, "id"), "repeat.id is ignored when repeat.key is set")
+
+def _check_props(props, path, report):
+    if props.__class__ is not dict:
+        report(path, "props must be an object")
+        return
+    for k, v in props.items():
+        if v.__class__ is not str and v.__class__ is not bool and not _is_number(v):
+            report((path, k), "prop value must be a string, number or boolean")
+
+def _check_position(pos, path, report):
+    if pos.__class__ is not dict:
+        report(path, "position must be an object")
+        return
+    for k, v in pos.items():
+        if k not in EDGES:
+            report((path, k), f"unknown edge (expected one of {', '.join(EDGES)})")
+        elif not _is_number(v):
+            report((path, k), "position must be a number")
+
+def cache_key(content: bytes, fail_fast: bool = False) -> str:
+    h = hashlib.sha256()
+    h.update(f"validate\x00{SCHEMA_VERSION}\x00{int(fail_fast)}\x00".encode("utf-8"))
+    h.update(content)
+    return h.hexdigest()
+
+def validate_content(content: bytes, fail_fast: bool = False, cache=None):
+    """
+    DSL ファイルの内容（バイト列）を検証する。戻り値: (issues, cached)
+    1 画面のオブジェクトか画面の配列（パスは /0, /1 ... から始まる）。不正な JSON は json.JSONDecodeError
+    dsl_binary のバイナリは各画面を dict に戻して同じように検証する（画面が複数ならパスは /0, /1 ...）
+    cache: BuildCache。同じ内容の検証結果を再利用する
+    """
+    key = None
+    if cache:
+        key = cache_key(content, fail_fast)
+        text = cache.get(key)
+        if text is not None:
+            return [Issue(*i) for i in json.loads(text)], True
+    if dsl_binary.is_binary(content):
+        with dsl_binary.loads(content) as doc:
+            docs = [doc.to_dict(i) for i in doc.roots]
+        dsl = docs if len(docs) != 1 else docs[0]
+    else:
+        dsl = decoder.loads(content)
+    if dsl.__class__ is list:
+        issues = []
+        for i, doc in enumerate(dsl):
+            issues += [Issue(f"/{i}{p.path}", p.message) for p in validate(doc, fail_fast)]
+            if fail_fast and issues: break
+    else:
+        issues = validate(dsl, fail_fast)
+    if key:
+        cache.put(key, json.dumps([list(i) for i in issues], ensure_ascii=False))
+    return issues, False
+
+def validate_file(src: str, fail_fast: bool = False, cache=None) -> FileIssues:
+    start = time.perf_counter()
+    try:
+        with open(src, "rb") as f:
+            content = f.read()
+        issues, cached = validate_content(content, fail_fast, cache)
+    except Exception as e:
+        return FileIssues(src, [], time.perf_counter() - start, f"{type(e).__name__}: {e}")
+    return FileIssues(src, issues, time.perf_counter() - start, None, cached)
+
+def _validate_chunk(job) -> list:
+    # ProcessPoolExecutor から呼ばれるワーカー（pickle 可能なトップレベル関数）
+    srcs, fail_fast, cache = job
+    return [validate_file(src, fail_fast, cache) for src in srcs]
+
+def run_validate(inputs, jobs: int = 1, fail_fast: bool = False, cache=None, report=None) -> list:
+    """
+    inputs を検証して FileIssues のリストを返す（順序は inputs と同じ）
+    jobs: ワーカープロセス数（1 なら直列、0 以下なら CPU コア数）
+    report: FileIssues を受け取るコールバック（進捗表示用）
+    """
+    jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+    if jobs == 1 or len(inputs) < 2:
+        return _collect(([validate_file(src, fail_fast, cache)] for src in inputs), report)
+    # ファイル毎の検証は軽いので、まとめて渡して IPC の回数を減らす
+    size = max(1, len(inputs) // (jobs * 4))
+    chunks = [(inputs[i:i + size], fail_fast, cache) for i in range(0, len(inputs), size)]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(chunks))) as pool:
+        return _collect(pool.map(_validate_chunk, chunks), report)
+
+def _collect(per_chunk, report) -> list:
+    results = []
+    for rs in per_chunk:
+        for r in rs:
+            results.append(r)
+            if report: report(r)
+    return results
+
+def print_result(r: FileIssues, out=None):
+    out = out or sys.stdout
+    if r.error:
+        print(f"{r.src}: {r.error}", file=out)
+    for issue in r.issues:
+        print(f"{r.src}#{issue.path}: {issue.message}", file=out)
+
+def main(argv=None):
+    from . import batch
+    ap = argparse.ArgumentParser(description="DSL を生成せずに検証する（問題は JSON Pointer 付きで表示）")
+    ap.add_argument("src", nargs="+", help="DSL ファイル・ディレクトリまたは glob パターン")
+    ap.add_argument("-j", "--jobs", type=int, default=1, help="ワーカープロセス数（0 で CPU コア数、既定 1）")
+    ap.add_argument("--fail-fast", action="store_true", help="各ファイルで最初の問題だけ報告する")
+    ap.add_argument("--cache-dir", help="検証結果キャッシュのディレクトリ（指定時のみ有効）")
+    ap.add_argument("-q", "--quiet", action="store_true", help="問題の一覧を表示しない")
+    args = ap.parse_args(argv)
+
+    inputs = []
+    for src in args.src:
+        inputs += batch.collect_inputs(src, (".json",))[0]
+    cache = build_cache.BuildCache(args.cache_dir) if args.cache_dir else None
+    start = time.perf_counter()
+    results = run_validate(inputs, args.jobs, args.fail_fast, cache, report=None if args.quiet else print_result)
+    if cache: cache.prune()
+    bad = sum(1 for r in results if r.issues or r.error)
+    n_issues = sum(len(r.issues) for r in results)
+    print(f"{len(results)} files, {bad} invalid, {n_issues} issues in {time.perf_counter() - start:.3f}s", file=sys.stderr)
+    return 1 if bad else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DSL ディレクトリを監視し、変更された画面だけを再生成するウォッチモード
+
+使い方:
+  ./watch.py compose dsl/ out/android/
+  ./watch.py all dsl/ out/ --debounce-ms 80
+
+依存ライブラリを増やさないよう、監視は (mtime, size) のポーリングで行う。
+入力ファイルの一覧は覚えておき、ディレクトリを辿り直すのはいずれかのディレクトリの mtime が変わったとき
+（ファイルの追加・削除・名前の変更）だけにする。毎回のポーリングは各ディレクトリと各ファイルの stat だけ。
+変更を見つけたら debounce の間それ以上変化がなくなるのを待ってから（保存の連打やエディタの一時ファイル書き込みをまとめる）
+変更されたファイルだけを読み込み・パースして emit_node を呼ぶ。
+パース済みツリーと生成結果はメモリに保持し、内容が変わらない保存はパースせず、生成結果が同じ出力は書き込まない。
+"""
+import sys, os, time, hashlib, argparse
+from . import batch
+from .batch import FileResult
+from . import decoder
+from .fragment_memo import FragmentMemo
+
+class WatchState:
+    def __init__(self, backend_spec, src: str, out_dir: str, memo: bool = False):
+        """
+        backend_spec: batch.run_batch と同じ（"compose" / "swiftui" / "all" など）
+        memo: バックエンド毎の FragmentMemo を再生成のたびに使い回す
+        """
+        self.names = batch.parse_backends(backend_spec)
+        self.backends = [batch.load_backend(b) for b in self.names]
+        self.src = src
+        self.out_dir = out_dir
+        self.memos = [FragmentMemo(name) for name in self.names] if memo else [None] * len(self.names)
+        self.stamps = {}   # path -> (mtime_ns, size)
+        self.digests = {}  # path -> DSL の内容ハッシュ
+        self.trees = {}    # path -> 解析済みの画面（ir.Screen、全バックエンドで共有）
+        self.outputs = {}  # 出力パス -> 生成結果
+        self.dirs = None   # 監視するディレクトリ -> mtime_ns（None は未走査）
+        self.files = []    # 前回辿ったときの入力ファイル
+
+    def walk(self):
+        """
+        src 以下を辿って入力ファイルの一覧を作り直す（batch.collect_inputs と同じく . で始まる名前は除く）
+        ディレクトリの mtime は一覧を読む前に取る（その間に追加されたファイルは次の scan で辿り直す）
+        """
+        dirs, files = {}, []
+        stack = [self.src]
+        while stack:
+            d = stack.pop()
+            try:
+                mtime = os.stat(d).st_mtime_ns
+                entries = list(os.scandir(d))
+            except OSError:
+                continue
+            dirs[d] = mtime
+            for e in entries:
+                if e.name.startswith("."): continue
+                if e.is_dir():
+                    stack.append(e.path)
+                elif e.name.endswith(batch.INPUT_EXTS) and e.is_file():
+                    files.append(e.path)
+        self.dirs, self.files = dirs, sorted(files)
+
+    def inputs(self) -> list:
+        """
+        入力ファイルの一覧（ディレクトリの mtime が前回と同じなら辿り直さない）
+        """
+        if not os.path.isdir(self.src): return batch.collect_inputs(self.src)[0]
+        if self.dirs is None or any(_mtime(d) != m for d, m in self.dirs.items()): self.walk()
+        return self.files
+
+    def scan(self) -> dict:
+        inputs = self.inputs()
+        stamps = {}
+        for path in inputs:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            stamps[path] = (st.st_mtime_ns, st.st_size)
+        return stamps
+
+    def changes(self, stamps=None):
+        """
+        前回の scan からの差分 (変更・追加されたパス, 削除されたパス)
+        """
+        stamps = self.scan() if stamps is None else stamps
+        changed = sorted(p for p, s in stamps.items() if self.stamps.get(p) != s)
+        removed = sorted(p for p in self.stamps if p not in stamps)
+        return changed, removed
+
+    def dsts(self, path: str) -> list:
+        return [batch.output_path(path, self.src, self.out_dir, b.FILE_EXT) for b in self.backends]
+
+    def update(self, paths) -> list:
+        """
+        paths を再生成する（内容が前回と同じファイルはパースしない）
+        戻り値: 再生成した出力毎の FileResult（生成結果が同じで書き込まなかったものは cached=True）
+        """
+        results = []
+        for path in paths:
+            start = time.perf_counter()
+            dsts = self.dsts(path)
+            try:
+                st = os.stat(path)
+                with open(path, "rb") as f:
+                    content = f.read()
+            except OSError as e:
+                results += [FileResult(path, dst, time.perf_counter() - start, f"{type(e).__name__}: {e}") for dst in dsts]
+                continue
+            self.stamps[path] = (st.st_mtime_ns, st.st_size)
+            digest = hashlib.sha256(content).digest()
+            if self.digests.get(path) == digest and path in self.trees:
+                continue
+            self.digests[path] = digest
+            try:
+                self.trees[path] = decoder.load_screen(content)
+            except Exception as e:
+                self.trees.pop(path, None)
+                results += [FileResult(path, dst, time.perf_counter() - start, f"{type(e).__name__}: {e}") for dst in dsts]
+                continue
+            dsl = self.trees[path]
+            for backend, memo, dst in zip(self.backends, self.memos, dsts):
+                t = time.perf_counter()
+                try:
+                    text = backend.convert(dsl, memo)
+                    same = self.outputs.get(dst) == text
+                    if not same:
+                        batch.write_output(dst, text)
+                        self.outputs[dst] = text
+                    results.append(FileResult(path, dst, time.perf_counter() - t, None, same))
+                except Exception as e:
+                    results.append(FileResult(path, dst, time.perf_counter() - t, f"{type(e).__name__}: {e}"))
+        return results
+
+    def remove(self, paths):
+        """
+        削除された DSL の出力も削除する
+        """
+        for path in paths:
+            for dst in self.dsts(path):
+                self.outputs.pop(dst, None)
+                try:
+                    os.unlink(dst)
+                except FileNotFoundError:
+                    pass
+            for d in (self.stamps, self.digests, self.trees):
+                d.pop(path, None)
+
+def _mtime(path: str):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+# 既定のポーリング間隔と debounce（秒）。保存から出力までを 100ms 以内にする
+# （検出まで最大 1 間隔 + 静かになったと判断するまで debounce 以上の最小の間隔の倍数）
+INTERVAL = 0.02
+DEBOUNCE = 0.03
+
+def watch(state: WatchState, interval: float = INTERVAL, debounce: float = DEBOUNCE, report=None, stop=None,
+          sleep=time.sleep, clock=time.monotonic):
+    """
+    state.src を監視し続ける（起動時に全ファイルを生成）
+    interval: ポーリング間隔（秒）
+    debounce: 最後の変化からこの時間だけ静かになってから再生成する（秒）
+    report: FileResult を受け取るコールバック
+    stop: 呼ぶと True を返したら終了する関数（テスト用、既定は Ctrl-C まで）
+    """
+    def emit(results):
+        if report:
+            for r in results: report(r)
+
+    emit(state.update(sorted(state.scan())))
+    pending = None  # 検出済みで未処理の変化の最新スナップショット
+    quiet_since = 0.0
+    while not (stop and stop()):
+        sleep(interval)
+        stamps = state.scan()
+        if stamps != pending:
+            # まだ変化が続いている
+            changed, removed = state.changes(stamps)
+            if changed or removed:
+                pending, quiet_since = stamps, clock()
+            else:
+                pending = None
+            continue
+        if pending is None or clock() - quiet_since < debounce: continue
+        changed, removed = state.changes(stamps)
+        pending = None
+        state.remove(removed)
+        emit(state.update(changed))
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="DSL ディレクトリを監視して変更された画面だけ再生成")
+    ap.add_argument("backend", help="compose / swiftui / compose-stable / swiftui-split / compose,swiftui / all")
+    ap.add_argument("src", help="監視する DSL ディレクトリ")
+    ap.add_argument("out_dir", help="出力ディレクトリ")
+    ap.add_argument("--interval-ms", type=float, default=INTERVAL * 1000, help=f"ポーリング間隔（既定 {INTERVAL * 1000:g}ms）")
+    ap.add_argument("--debounce-ms", type=float, default=DEBOUNCE * 1000,
+                    help=f"変化が止まってから再生成するまでの待ち時間（既定 {DEBOUNCE * 1000:g}ms）")
+    ap.add_argument("--memo", action="store_true", help="同一サブツリーの生成結果を再利用する")
+    args = ap.parse_args(argv)
+    if not os.path.isdir(args.src):
+        ap.error(f"not a directory: {args.src}")
+    try:
+        state = WatchState(args.backend, args.src, args.out_dir, memo=args.memo)
+    except ValueError as e:
+        ap.error(str(e))
+    print(f"watching {args.src} (Ctrl-C で終了)", file=sys.stderr)
+    try:
+        watch(state, args.interval_ms / 1000, args.debounce_ms / 1000, report=batch.print_result)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
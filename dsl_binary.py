@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+./dsl_binary.py として動かすための入口（本体は dsl2ui/dsl_binary.py）
+"""
+import sys
+from dsl2ui.dsl_binary import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+./quickgen.py / python3 -S -I quickgen.py として動かすための入口（本体は dsl2ui/quickgen.py）
+-I ではスクリプトのディレクトリが sys.path に入らないので、dsl2ui を import する前に追加する
+"""
+import sys
+import time
+_T0 = time.perf_counter()  # --timing の startup_ms の起点（dsl2ui の import より前）
+import os  # -S では起動時に読み込まれていない
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from dsl2ui.quickgen import main
+
+if __name__ == "__main__":
+    sys.exit(main(t0=_T0))
@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+./server.py として動かすための入口（本体は dsl2ui/server.py）
+"""
+import sys
+from dsl2ui.server import main
+
+if __name__ == "__main__":
+    sys.exit(main())
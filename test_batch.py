@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import unittest
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+from dsl2ui import batch
+from dsl2ui import toJetpackCompose
+from dsl2ui import toSwiftUi
+
+SIMPLE_DSL = {
+    "type": "FRAME",
+    "name": "TestScreen",
+    "layout": {"direction": "VERTICAL", "spacing": 16},
+    "children": [
+        {"type": "TEXT", "text": "Hello World"},
+        {"type": "SPACER"}
+    ]
+}
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        """テスト用の DSL ディレクトリを作成"""
+        self.maxDiff = None
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmp.name, "dsl")
+        self.out = os.path.join(self.tmp.name, "out")
+        os.makedirs(os.path.join(self.src, "sub"))
+        self.write("a.json", SIMPLE_DSL)
+        self.write("sub/b.json", {**SIMPLE_DSL, "name": "Other"})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel, dsl):
+        with open(os.path.join(self.src, rel), "w", encoding="utf-8") as f:
+            f.write(dsl if isinstance(dsl, str) else json.dumps(dsl))
+
+    def read(self, rel):
+        with open(os.path.join(self.out, rel), encoding="utf-8") as f:
+            return f.read()
+
+    def run_main(self, module, dsl):
+        with patch('sys.stdin', StringIO(json.dumps(dsl))):
+            with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+                with patch('sys.argv', [module.__name__]):
+                    module.main()
+                return mock_stdout.getvalue()
+
+    def test_collect_inputs_directory(self):
+        """ディレクトリ指定で再帰的に収集"""
+        inputs, root = batch.collect_inputs(self.src)
+        self.assertEqual([os.path.relpath(p, root) for p in inputs], ["a.json", os.path.join("sub", "b.json")])
+
+    def test_collect_inputs_glob(self):
+        """glob 指定"""
+        inputs, _ = batch.collect_inputs(os.path.join(self.src, "*.json"))
+        self.assertEqual([os.path.basename(p) for p in inputs], ["a.json"])
+
+    def test_output_path(self):
+        """出力パスはディレクトリ構成を保って拡張子を差し替え"""
+        self.assertEqual(batch.output_path("dsl/sub/b.json", "dsl", "out", ".kt"), os.path.join("out", "sub", "b.kt"))
+
+    def test_unknown_backend(self):
+        """未知のバックエンド"""
+        with self.assertRaises(ValueError):
+            batch.load_backend("flutter")
+
+    def test_batch_matches_single_file_output(self):
+        """バッチ出力が main() の出力と一致する"""
+        inputs, root = batch.collect_inputs(self.src)
+        for name, module in [("compose", toJetpackCompose), ("swiftui", toSwiftUi)]:
+            results = batch.run_batch(name, inputs, self.out, root)
+            self.assertTrue(all(r.error is None for r in results))
+            self.assertEqual(self.read("a" + module.FILE_EXT), self.run_main(module, SIMPLE_DSL))
+            self.assertIn("Other", self.read(os.path.join("sub", "b" + module.FILE_EXT)))
+
+    def test_failure_does_not_stop_batch(self):
+        """壊れたファイルがあっても残りは変換される"""
+        self.write("broken.json", "{not json")
+        inputs, root = batch.collect_inputs(self.src)
+        reported = []
+        results = batch.run_batch("compose", inputs, self.out, root, report=reported.append)
+        self.assertEqual(len(reported), 3)
+        errors = [r for r in results if r.error]
+        self.assertEqual(len(errors), 1)
+        self.assertIn("JSONDecodeError", errors[0].error)
+        self.assertTrue(os.path.exists(os.path.join(self.out, "a.kt")))
+
+    def test_parallel_matches_serial(self):
+        """並列変換の出力と順序が直列変換と一致する"""
+        for i in range(6):
+            self.write(f"p{i}.json", {**SIMPLE_DSL, "name": f"Screen{i}"})
+        self.write("broken.json", "{")
+        inputs, root = batch.collect_inputs(self.src)
+        serial_out = os.path.join(self.tmp.name, "serial")
+        serial = batch.run_batch("compose", inputs, serial_out, root)
+        parallel = batch.run_batch("compose", inputs, self.out, root, jobs=2, chunksize=2)
+        self.assertEqual([r.src for r in parallel], [r.src for r in serial])
+        self.assertEqual([bool(r.error) for r in parallel], [bool(r.error) for r in serial])
+        for r in serial:
+            if r.error: continue
+            rel = os.path.relpath(r.dst, serial_out)
+            with open(r.dst, "rb") as f, open(os.path.join(self.out, rel), "rb") as g:
+                self.assertEqual(f.read(), g.read())
+
+    def test_default_chunksize(self):
+        """チャンクサイズの自動計算"""
+        self.assertEqual(batch.default_chunksize(3000, 32), 23)
+        self.assertEqual(batch.default_chunksize(3, 32), 1)
+
+    def test_parse_backends(self):
+        """バックエンド指定の正規化"""
+        self.assertEqual(batch.parse_backends("all"), ["compose", "swiftui"])
+        self.assertEqual(batch.parse_backends("swiftui, compose,swiftui"), ["swiftui", "compose"])
+        with self.assertRaises(ValueError):
+            batch.parse_backends("compose,flutter")
+        # 同じ .kt に書き出すバックエンドは同時に指定できない
+        self.assertEqual(batch.parse_backends("compose-stable,swiftui"), ["compose-stable", "swiftui"])
+        with self.assertRaises(ValueError):
+            batch.parse_backends("compose,compose-stable")
+
+    def test_dual_target_parses_once(self):
+        """両バックエンド指定時は 1 ファイルにつき 1 回だけパースする"""
+        inputs, root = batch.collect_inputs(self.src)
+        for concurrent in (False, True):
+            with patch('dsl2ui.batch.decoder.loads', wraps=batch.decoder.loads) as loads:
+                results = batch.run_batch("all", inputs, self.out, root, concurrent=concurrent)
+            self.assertEqual(loads.call_count, len(inputs))
+            self.assertEqual([os.path.basename(r.dst) for r in results], ["a.kt", "a.swift", "b.kt", "b.swift"])
+            self.assertEqual(self.read("a.kt"), self.run_main(toJetpackCompose, SIMPLE_DSL))
+            self.assertEqual(self.read("a.swift"), self.run_main(toSwiftUi, SIMPLE_DSL))
+
+    def test_dual_target_parse_error_reported_per_output(self):
+        """パース失敗は出力毎に報告される"""
+        self.write("broken.json", "{")
+        inputs, root = batch.collect_inputs(os.path.join(self.src, "broken.json"))
+        results = batch.run_batch("compose,swiftui", inputs, self.out, root, jobs=2)
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all(r.error for r in results))
+
+    def test_memo_matches_plain_output(self):
+        """--memo 指定時も出力は同じ"""
+        inputs, root = batch.collect_inputs(self.src)
+        memo_out = os.path.join(self.tmp.name, "memo")
+        batch.run_batch("all", inputs, self.out, root)
+        batch.run_batch("all", inputs, memo_out, root, memo=True)
+        for rel in ["a.kt", "a.swift"]:
+            with open(os.path.join(memo_out, rel), encoding="utf-8") as f:
+                self.assertEqual(f.read(), self.read(rel))
+        self.assertGreater(batch.get_memo("compose").stats()["misses"], 0)
+
+    def test_multi_doc(self):
+        """複数画面の書き出しは 1 画面ずつ <入力名>/<画面名> に変換される"""
+        export = os.path.join(self.tmp.name, "export")
+        os.makedirs(export)
+        with open(os.path.join(export, "all.jsonl"), "w", encoding="utf-8") as f:
+            for name in ["TestScreen", "Other", "Other"]:
+                f.write(json.dumps({**SIMPLE_DSL, "name": name}) + "\n")
+        inputs, root = batch.collect_inputs(export, (".json", ".jsonl"))
+        results = batch.run_batch("all", inputs, self.out, root, multi_doc=True)
+        self.assertTrue(all(r.error is None for r in results))
+        self.assertEqual([os.path.relpath(r.dst, self.out) for r in results],
+                         [os.path.join("all", n) for n in ["TestScreen.kt", "TestScreen.swift", "Other.kt", "Other.swift",
+                                                          "Other_2.kt", "Other_2.swift"]])
+        self.assertEqual(self.read(os.path.join("all", "TestScreen.kt")), self.run_main(toJetpackCompose, SIMPLE_DSL))
+        with self.assertRaises(ValueError):
+            batch.run_batch("all", inputs, self.out, root, multi_doc=True, cache=object())
+
+    def test_multi_doc_broken_tail(self):
+        """途中で壊れていても、それまでの画面は出力され失敗が 1 件報告される"""
+        path = os.path.join(self.src, "export.json")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("[" + json.dumps(SIMPLE_DSL) + ", {")
+        results = batch.run_batch("compose", [path], self.out, self.src, multi_doc=True)
+        self.assertEqual([bool(r.error) for r in results], [False, True])
+        self.assertTrue(os.path.exists(os.path.join(self.out, "export", "TestScreen.kt")))
+
+    def test_main_exit_code(self):
+        """失敗があれば終了コード 1"""
+        with patch('sys.stderr', new_callable=StringIO) as err:
+            self.assertEqual(batch.main(["swiftui", self.src, self.out]), 0)
+        self.assertIn("2 outputs, 2 ok (0 cached), 0 failed", err.getvalue())
+        self.write("broken.json", "[")
+        with patch('sys.stderr', new_callable=StringIO) as err:
+            self.assertEqual(batch.main(["swiftui", self.src, self.out, "-q"]), 1)
+        self.assertNotIn("ok  ", err.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import unittest
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+from dsl2ui import bench
+from dsl2ui import toJetpackCompose
+from dsl2ui import toSwiftUi
+from dsl2ui import validate
+
+class TestBench(unittest.TestCase):
+
+    def setUp(self):
+        """テストの前処理"""
+        self.maxDiff = None
+
+    def test_tree_shape(self):
+        """ノード数と深さの上限を守る"""
+        tree = bench.CorpusGenerator(1).tree(nodes=500, depth=6, fanout=4)
+        self.assertEqual(bench.count_nodes(tree), (500, 6))
+        # depth と fanout で収まる数（1 + 3 + 9 + 27 + 81）が上限
+        full = bench.CorpusGenerator(1).tree(nodes=500, depth=5, fanout=3)
+        self.assertEqual(bench.count_nodes(full), (121, 5))
+        small = bench.CorpusGenerator(1).tree(nodes=500, depth=2, fanout=3)
+        self.assertEqual(bench.count_nodes(small), (4, 2))
+
+    def test_tree_is_valid(self):
+        """生成した画面は validate を通る（OVERLAY には必ず子がある）"""
+        overlays = 0
+        for seed, kw in ((0, {}), (1, {"nodes": 3000}), (2, {"nodes": 500, "depth": 6}), (3, {"nodes": 40, "depth": 4})):
+            tree = bench.CorpusGenerator(seed).tree(**kw)
+            self.assertEqual(validate.validate(tree), [])
+            stack = [tree]
+            while stack:
+                n = stack.pop()
+                stack.extend(n.get("children") or [])
+                if n["type"] == "OVERLAY":
+                    overlays += 1
+                    stack.append(n["child"])
+            self.assertEqual(bench.count_nodes(tree)[0], kw.get("nodes", 2000))
+        self.assertGreater(overlays, 0)
+
+    def test_tree_is_deterministic(self):
+        """同じシードなら同じツリー"""
+        a = bench.CorpusGenerator(7).tree(nodes=300)
+        b = bench.CorpusGenerator(7).tree(nodes=300)
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, bench.CorpusGenerator(8).tree(nodes=300))
+
+    def test_mix_and_densities(self):
+        """type の重み・repeat / visible の確率が反映される"""
+        mix = bench.parse_mix("FRAME=1,TEXT=1")
+        tree = bench.CorpusGenerator(0).tree(nodes=400, depth=6, mix=mix, repeat=1.0, visible=0.0)
+        stack, types, frames = [tree], set(), []
+        while stack:
+            n = stack.pop()
+            types.add(n["type"])
+            self.assertNotIn("visible", n)
+            if n["type"] == "FRAME":
+                frames.append(n)
+                stack.extend(n["children"])
+        self.assertEqual(types, {"FRAME", "TEXT"})
+        self.assertTrue(all("repeat" in f for f in frames if f is not tree))
+        with self.assertRaises(ValueError):
+            bench.parse_mix("FRAME=1,IMAGE=2")
+
+    def test_trees_convert(self):
+        """合成ツリーは両バックエンドで生成できる"""
+        tree = bench.CorpusGenerator(3).tree(nodes=300)
+        self.assertIn("fun BenchScreen(", toJetpackCompose.convert(tree))
+        self.assertIn("struct BenchScreen: View", toSwiftUi.convert(tree))
+
+    def test_bench_backend_metrics(self):
+        """計測結果の項目"""
+        tree = bench.CorpusGenerator(0).tree(nodes=100)
+        results = bench.run("all", tree, runs=3, warmup=0)
+        self.assertEqual(list(results), ["compose", "swiftui"])
+        r = results["compose"]
+        self.assertEqual(r["nodes"], 100)
+        self.assertEqual(r["bytes"], len(toJetpackCompose.convert(tree).encode("utf-8")))
+        self.assertGreater(r["nodes_per_sec"], 0)
+        self.assertLessEqual(r["p50_ms"], r["p99_ms"])
+        self.assertGreater(r["peak_kb"], 0)
+
+    def test_percentile(self):
+        """nearest-rank パーセンタイル"""
+        values = list(range(1, 101))
+        self.assertEqual(bench.percentile(values, 50), 50)
+        self.assertEqual(bench.percentile(values, 99), 99)
+        self.assertEqual(bench.percentile([5], 90), 5)
+        self.assertEqual(bench.percentile([], 50), 0.0)
+
+    def test_compare(self):
+        """基準値から tolerance を超えた悪化だけ報告"""
+        base = {"compose": {"nodes_per_sec": 1000, "p50_ms": 10, "peak_kb": 100}}
+        ok = {"compose": {"nodes_per_sec": 900, "p50_ms": 11, "peak_kb": 100}}
+        bad = {"compose": {"nodes_per_sec": 700, "p50_ms": 13, "peak_kb": 100}, "swiftui": {"nodes_per_sec": 1}}
+        self.assertEqual(bench.compare(ok, base), [])
+        regressions = bench.compare(bad, base)
+        self.assertEqual([m.split(":")[0] for m in regressions], ["compose.nodes_per_sec", "compose.p50_ms"])
+
+    def test_main_baseline_roundtrip(self):
+        """基準値の保存と比較"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "baseline.json")
+            args = ["--nodes", "50", "--runs", "2", "--no-memory"]
+            with patch('sys.stdout', new_callable=StringIO):
+                self.assertEqual(bench.main(args + ["--save-baseline", path]), 0)
+            with open(path, encoding="utf-8") as f:
+                baseline = json.load(f)
+            baseline["compose"]["nodes_per_sec"] *= 1000
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(baseline, f)
+            with patch('sys.stdout', new_callable=StringIO), patch('sys.stderr', new_callable=StringIO) as err:
+                self.assertEqual(bench.main(args + ["--baseline", path]), 1)
+            self.assertIn("REGRESSION compose.nodes_per_sec", err.getvalue())
+
+    def test_same_extension_backends(self):
+        """ファイルを書き出さないので拡張子が同じバックエンドも並べて計測し、列幅は最長の名前に合わせる"""
+        self.assertEqual(bench.parse_backends("compose, compose-stable,compose"), ["compose", "compose-stable"])
+        with self.assertRaises(ValueError):
+            bench.parse_backends("compose,kotlin")
+        with patch('sys.stdout', new_callable=StringIO) as out:
+            self.assertEqual(bench.main(["--backend", "compose,compose-stable", "--nodes", "50", "--runs", "1",
+                                         "--no-memory"]), 0)
+        lines = out.getvalue().splitlines()
+        self.assertEqual([line.split()[0] for line in lines], ["backend", "compose", "compose-stable"])
+        self.assertEqual(len({len(line) for line in lines}), 1)
+
+    def test_write_corpus(self):
+        """合成コーパスの書き出し"""
+        with tempfile.TemporaryDirectory() as tmp:
+            with patch('sys.stderr', new_callable=StringIO):
+                bench.main(["--write-corpus", tmp, "--count", "3", "--nodes", "20"])
+            names = sorted(os.listdir(tmp))
+            self.assertEqual(names, ["screen_00000.json", "screen_00001.json", "screen_00002.json"])
+            with open(os.path.join(tmp, names[1]), encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["name"], "Screen 1")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import unittest
+import json
+import os
+import time
+import tempfile
+from unittest.mock import patch
+from dsl2ui import batch
+from dsl2ui import cache
+from dsl2ui import toJetpackCompose
+from dsl2ui import toSwiftUi
+
+DSL = {"type": "FRAME", "name": "Cached", "children": [{"type": "TEXT", "text": "Hi"}]}
+
+class TestBuildCache(unittest.TestCase):
+
+    def setUp(self):
+        """テスト用のキャッシュディレクトリを作成"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "cache")
+        cache._fingerprints.clear()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        cache._fingerprints.clear()
+
+    def test_cache_key_components(self):
+        """キーは内容・バックエンド・バージョンで変わる"""
+        k1 = cache.cache_key("compose", toJetpackCompose, b"{}")
+        self.assertEqual(k1, cache.cache_key("compose", toJetpackCompose, b"{}"))
+        self.assertNotEqual(k1, cache.cache_key("compose", toJetpackCompose, b"{ }"))
+        self.assertNotEqual(k1, cache.cache_key("swiftui", toSwiftUi, b"{}"))
+        with patch.object(toJetpackCompose, "GENERATOR_VERSION", "999"):
+            self.assertNotEqual(k1, cache.cache_key("compose", toJetpackCompose, b"{}"))
+
+    def test_template_change_invalidates(self):
+        """wrap_file のテンプレートが変わるとキーが変わる"""
+        k1 = cache.cache_key("compose", toJetpackCompose, b"{}")
+        cache._fingerprints.clear()
+        with patch.object(toJetpackCompose, "wrap_file", lambda s, b: f"// v2\n{s}{b}"):
+            self.assertNotEqual(k1, cache.cache_key("compose", toJetpackCompose, b"{}"))
+
+    def test_get_put(self):
+        """保存と取得"""
+        c = cache.BuildCache(self.root)
+        self.assertIsNone(c.get("ab" * 32))
+        c.put("ab" * 32, "code")
+        self.assertEqual(c.get("ab" * 32), "code")
+        self.assertEqual(c.clear(), 1)
+        self.assertIsNone(c.get("ab" * 32))
+
+    def test_prune_lru(self):
+        """サイズ上限を超えたら最終利用が古いものから削除"""
+        c = cache.BuildCache(self.root, max_bytes=25)
+        now = time.time()
+        for i, key in enumerate(["aa" * 32, "bb" * 32, "cc" * 32]):
+            c.put(key, "x" * 10)
+            os.utime(c._path(key), (now - 100 + i, now - 100 + i))
+        c.get("aa" * 32)  # 最も古いものを利用して最新にする
+        self.assertEqual(c.prune(), 1)
+        self.assertIsNone(c.get("bb" * 32))
+        self.assertIsNotNone(c.get("aa" * 32))
+        self.assertIsNotNone(c.get("cc" * 32))
+
+    def test_foreign_files_survive(self):
+        """キャッシュのエントリの形でないファイルは prune / clear で数えず消さない"""
+        c = cache.BuildCache(self.root, max_bytes=0)
+        c.put("ab" * 32, "code")
+        foreign = [os.path.join(self.root, "notes.txt"), os.path.join(self.root, "ab", "notes.txt"),
+                   os.path.join(self.root, "src", "cd" * 32), os.path.join(self.root, "cd", "ab" * 32)]
+        for path in foreign:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f: f.write("mine")
+        self.assertEqual(len(c.entries()), 1)
+        self.assertEqual(c.prune(), 1)
+        c.put("ab" * 32, "code")
+        self.assertEqual(c.clear(), 1)
+        for path in foreign:
+            self.assertTrue(os.path.exists(path), path)
+        with self.assertRaises(ValueError):
+            c.put("../notes", "x")
+
+    def test_batch_reuses_cache(self):
+        """2 回目の変換は emit_node を呼ばずにキャッシュから出力する"""
+        src = os.path.join(self.tmp.name, "dsl")
+        out = os.path.join(self.tmp.name, "out")
+        os.makedirs(src)
+        with open(os.path.join(src, "a.json"), "w", encoding="utf-8") as f:
+            json.dump(DSL, f)
+        inputs, root = batch.collect_inputs(src)
+        c = cache.BuildCache(self.root)
+
+        first = batch.run_batch("all", inputs, out, root, cache=c)
+        self.assertEqual([r.cached for r in first], [False, False])
+        with open(os.path.join(out, "a.kt"), encoding="utf-8") as f:
+            expected = f.read()
+        os.remove(os.path.join(out, "a.kt"))
+
+        with patch.object(toJetpackCompose, "emit_node") as emit, patch("dsl2ui.batch.decoder.loads") as loads:
+            second = batch.run_batch("all", inputs, out, root, cache=c)
+        emit.assert_not_called()
+        loads.assert_not_called()
+        self.assertEqual([r.cached for r in second], [True, True])
+        with open(os.path.join(out, "a.kt"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), expected)
+
+if __name__ == '__main__':
+    unittest.main()
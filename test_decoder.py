@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import unittest
+import gc
+import json
+from dsl2ui import bench
+from dsl2ui import decoder
+from dsl2ui import emit_engine
+from dsl2ui import ir
+from dsl2ui import toJetpackCompose
+
+# 高速なデコーダが標準の json と違う結果を返しうる入力
+EDGE_CASES = [
+    '{"type": "INSTANCE", "props": {"big": 123456789012345678901234567890, "neg": -18446744073709551617}}',
+    '{"type": "INSTANCE", "props": {"n": NaN, "i": Infinity, "m": -Infinity}}',
+    '﻿{"type": "TEXT", "text": "bom"}',
+    '{"type": "TEXT", "text": "\\ud800 lone surrogate"}',
+    '{"type": "TEXT", "text": "dup", "text": "last wins"}',
+    '{"type": "INSTANCE", "props": {"f": 1.0000000000000000000001, "e": 1e400}}',
+]
+
+class TestDecoder(unittest.TestCase):
+
+    def setUp(self):
+        """テストの前処理（テスト毎に元のデコーダに戻す）"""
+        self.addCleanup(decoder.use, decoder.name())
+
+    def check_same_as_json(self):
+        for text in EDGE_CASES:
+            try:
+                expected = emit_engine.loads_deep(text)
+            except ValueError as e:
+                expected = type(e)
+            try:
+                actual = decoder.loads(text)
+            except ValueError as e:
+                actual = type(e)
+            self.assertEqual(repr(actual), repr(expected), msg=f"{decoder.name()}: {text[:60]}")
+
+    def test_available_and_use(self):
+        """json は常に使え、auto は最も速いものを選ぶ"""
+        names = decoder.available()
+        self.assertEqual(names[-1], "json")
+        self.assertEqual(decoder.use(), names[0])
+        self.assertEqual(decoder.use("json"), "json")
+        self.assertFalse(decoder.has_fast())
+        with self.assertRaises(ValueError):
+            decoder.use("simdjson")
+
+    def test_same_result_for_every_decoder(self):
+        """どのデコーダでも標準の json（emit_engine.loads_deep）と同じ結果（エラーも同じ種類）"""
+        for name in decoder.available():
+            decoder.use(name)
+            self.check_same_as_json()
+            with self.assertRaises(json.JSONDecodeError):
+                decoder.loads('{"type": ')
+            # 高速なデコーダのネストの上限を超える深さも読める
+            value, depth = decoder.loads('[' * 3000 + ']' * 3000), 0
+            while value:
+                value, depth = value[0], depth + 1
+            self.assertEqual(depth, 2999)
+
+    def test_same_output_for_every_decoder(self):
+        """どのデコーダで読んでも生成されるコードは同じ"""
+        text = json.dumps(bench.CorpusGenerator(3).tree(nodes=400, repeat=0.3, visible=0.3))
+        decoder.use("json")
+        expected = toJetpackCompose.convert(decoder.load_screen(text))
+        for name in decoder.available():
+            decoder.use(name)
+            self.assertEqual(toJetpackCompose.convert(decoder.load_screen(text.encode("utf-8"))), expected)
+
+    def test_load_screen(self):
+        """load_screen は ir.Screen を返し、オブジェクト以外は ValueError"""
+        screen = decoder.load_screen('{"type": "FRAME", "name": "Home"}')
+        self.assertIsInstance(screen, ir.Screen)
+        self.assertEqual(screen.name, "Home")
+        with self.assertRaises(ValueError):
+            decoder.load_screen('[{"type": "FRAME"}]')
+
+    def test_restores_gc(self):
+        """デコード中に止めた GC は元に戻す"""
+        decoder.loads('{"a": [1, 2]}')
+        self.assertTrue(gc.isenabled())
+        with self.assertRaises(ValueError):
+            decoder.loads('{"a": ')
+        self.assertTrue(gc.isenabled())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import unittest
+import glob
+import importlib
+import json
+import os
+import pathlib
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+import dsl2ui
+from dsl2ui import dsl_binary
+from dsl2ui import ir
+from dsl2ui import nodes
+from dsl2ui import toJetpackCompose
+from dsl2ui import toSwiftUi
+
+try:
+    import tomllib
+except ImportError:  # Python 3.10 以前
+    tomllib = None
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+DSL = {
+    "type": "FRAME",
+    "name": "ApiScreen",
+    "layout": {"direction": "VERTICAL", "spacing": 8},
+    "children": [
+        {"type": "TEXT", "text": "{{ title }}"},
+        {"type": "INSTANCE", "name": "ds/Button", "props": {"label": "送信"}}
+    ]
+}
+
+class TestDsl2ui(unittest.TestCase):
+
+    def setUp(self):
+        """テスト用の DSL ファイルを作成"""
+        self.maxDiff = None
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "screen.json")
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(DSL, f, ensure_ascii=False)
+
+    def test_inputs(self):
+        """dict / bytes / パス / .dslb / Node / ir.Screen のどれからでも CLI と同じ内容を返す"""
+        content = json.dumps(DSL).encode("utf-8")
+        inputs = (DSL, content, bytearray(content), memoryview(content), self.path, pathlib.Path(self.path),
+                  dsl_binary.compile_dsl(DSL), nodes.build(DSL), ir.screen(DSL))
+        with patch("sys.stdout", new=StringIO()) as out:
+            for dsl in inputs:
+                self.assertEqual(dsl2ui.generate_compose(dsl), toJetpackCompose.convert(DSL) + "\n")
+                self.assertEqual(dsl2ui.generate_swiftui(dsl), toSwiftUi.convert(DSL) + "\n")
+        self.assertEqual(out.getvalue(), "")
+
+    def test_encoding(self):
+        """encoding を指定すると bytes で返す"""
+        data = dsl2ui.generate("swiftui", DSL, encoding="utf-8")
+        self.assertIsInstance(data, bytes)
+        self.assertEqual(data.decode("utf-8"), toSwiftUi.convert(DSL) + "\n")
+
+    def test_errors(self):
+        """壊れた入力・複数画面は ValueError、未対応の型は TypeError"""
+        for dsl in (b"{", b"[1]", dsl_binary.compile_documents([DSL, DSL])):
+            with self.assertRaises(ValueError):
+                dsl2ui.generate_compose(dsl)
+        with self.assertRaises(ValueError):
+            dsl2ui.generate("flutter", DSL)
+        with self.assertRaises(TypeError):
+            dsl2ui.generate_swiftui([DSL])
+        with self.assertRaises(FileNotFoundError):
+            dsl2ui.generate_swiftui(os.path.join(self.tmp.name, "none.json"))
+
+    @unittest.skipIf(tomllib is None, "tomllib が必要")
+    def test_pyproject(self):
+        """pyproject.toml は dsl2ui パッケージだけを入れ、エントリポイントはその中の main を指す"""
+        with open(os.path.join(HERE, "pyproject.toml"), "rb") as f:
+            project = tomllib.load(f)
+        self.assertEqual(project["tool"]["setuptools"]["packages"], ["dsl2ui"])
+        self.assertNotIn("py-modules", project["tool"]["setuptools"])
+        self.assertEqual(project["project"]["version"], dsl2ui.__version__)
+        for script, target in project["project"]["scripts"].items():
+            module, func = target.split(":")
+            self.assertTrue(module.startswith("dsl2ui."), script)
+            self.assertTrue(callable(getattr(importlib.import_module(module), func)), script)
+
+    def test_script_shims(self):
+        """直下の CLI 用のスクリプトは dsl2ui の同名モジュールの main を呼ぶだけ"""
+        shims = {os.path.basename(p)[:-3] for p in glob.glob(os.path.join(HERE, "*.py"))
+                 if not os.path.basename(p).startswith("test_")}
+        self.assertEqual(shims, {"toJetpackCompose", "toSwiftUi", "toJetpackComposeStable", "toSwiftUiSplit", "quickgen",
+                                 "batch", "bench", "dsl_binary", "server", "validate", "watch"})
+        for name in shims:
+            with open(os.path.join(HERE, name + ".py"), encoding="utf-8") as f:
+                self.assertIn(f"from dsl2ui.{name} import main\n", f.read(), name)
+            self.assertTrue(callable(importlib.import_module("dsl2ui." + name).main), name)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import unittest
+import json
+import os
+import tempfile
+from unittest.mock import patch
+from dsl2ui import batch
+from dsl2ui import bench
+from dsl2ui import decoder
+from dsl2ui import dsl_binary
+from dsl2ui import dsl_stream
+from dsl2ui import ir
+from dsl2ui import nodes
+from dsl2ui import toJetpackCompose
+from dsl2ui import toSwiftUi
+
+# JSON の値の扱いが変わりやすい入力
+EDGE_DSL = {
+    "type": "FRAME",
+    "name": "Edge",
+    "layout": {"direction": "HORIZONTAL", "spacing": 1.0, "padding": [1, 2, 3, 4]},
+    "children": [
+        {"type": "INSTANCE", "name": "ds/Chip",
+         "props": {"a": 1, "b": 1.0, "c": True, "big": 123456789012345678901234567890, "e": 1e300,
+                   "s": "ラベル \"q\"", "x": None, "l": [1, 2]}},
+        {"type": "INSTANCE", "props": {}},
+        {"type": "TEXT", "text": "", "visible": "{{ flag }}"},
+        {"type": "TEXT"},
+        {"type": "SPACER", "visible": True},
+        {"type": "OVERLAY", "position": {"bottom": 0, "left": 2}, "child": {"type": "TEXT", "text": "{{ x }}"}},
+        {"type": "OVERLAY", "position": "top"},
+        {"type": "FRAME", "scroll": "horizontal", "repeat": {"for": "rows"}, "children": []},
+        {"type": "FRAME", "repeat": {}},
+        {"type": "FRAME", "scroll": "vertical", "repeat": {"for": "rows", "key": "id", "contentType": "{{ item.kind }}"},
+         "children": [{"type": "TEXT"}]},
+        {"type": "IMAGE"},
+        {}
+    ]
+}
+
+class TestDslBinary(unittest.TestCase):
+
+    def setUp(self):
+        """テストの前処理"""
+        self.maxDiff = None
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def compile_to(self, name, docs):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb") as f:
+            f.write(dsl_binary.compile_documents(docs))
+        return path
+
+    def test_same_output_as_json(self):
+        """バイナリから変換しても JSON と同じ出力"""
+        for dsl in (bench.CorpusGenerator(8).tree(nodes=800, repeat=0.3, visible=0.3), EDGE_DSL):
+            doc = dsl_binary.loads(dsl_binary.compile_dsl(dsl))
+            self.assertEqual(toJetpackCompose.convert(doc.root), toJetpackCompose.convert(dsl))
+            self.assertEqual(toSwiftUi.convert(doc.root), toSwiftUi.convert(dsl))
+            # Node として読んでも直接 IR にしても同じ
+            self.assertEqual(nodes.build(doc.root.to_dict()).to_dict(), nodes.build(dsl).to_dict())
+            self.assertEqual(ir.lower(doc.root).to_dict(), ir.lower(nodes.build(dsl)).to_dict())
+        # JSON にそのまま書けない値も読み込み時と同じ値に戻る
+        odd = {"type": "INSTANCE", "name": "\ud800", "props": {"nan": float("nan"), "inf": float("-inf")}}
+        root = dsl_binary.loads(dsl_binary.compile_dsl(odd)).root
+        self.assertEqual(root.name, "\ud800")
+        self.assertEqual(repr(root.props), repr(tuple(odd["props"].items())))
+
+    def test_lazy_children(self):
+        """子は参照したときに初めて作る"""
+        dsl = bench.CorpusGenerator(3).tree(nodes=300)
+        doc = dsl_binary.loads(dsl_binary.compile_dsl(dsl))
+        with patch.object(doc, "node", wraps=doc.node) as node:
+            root = doc.root
+            self.assertEqual(node.call_count, 1)
+            kids = root.children
+            self.assertEqual(node.call_count, 1 + len(dsl["children"]))
+        self.assertEqual([k.type for k in kids], [k["type"] for k in dsl["children"]])
+        self.assertIsInstance(root, nodes.Node)
+        self.assertIs(nodes.build(root), root)
+
+    def test_lazy_values(self):
+        """値テーブルは参照された値を含むブロックだけデコードする"""
+        dsl = bench.CorpusGenerator(3).tree(nodes=2000, repeat=0.2, visible=0.2)
+        doc = dsl_binary.loads(dsl_binary.compile_dsl(dsl))
+        self.assertGreater(doc._values._count, dsl_binary._BLOCK * 4)
+        with patch("dsl2ui.dsl_binary.decoder.loads", wraps=decoder.loads) as loads:
+            root = doc.root
+            self.assertEqual((root.type, root.name), ("FRAME", dsl["name"]))
+            self.assertEqual(loads.call_count, 1)
+            self.assertEqual(toJetpackCompose.convert(doc.root), toJetpackCompose.convert(dsl))
+        self.assertEqual(loads.call_count, -(-doc._values._count // dsl_binary._BLOCK))
+        # 壊れたブロックは参照したときに ValueError
+        data = bytearray(dsl_binary.compile_dsl(dsl))
+        data[-2:] = b"!!"
+        doc = dsl_binary.loads(bytes(data))
+        self.assertEqual(doc.root.type, "FRAME")
+        with self.assertRaises(ValueError):
+            doc.values[doc._values._count - 1]
+        with self.assertRaises(ValueError):
+            doc.values[doc._values._count]
+
+    def test_mmap_documents(self):
+        """複数画面のバイナリを mmap して 1 画面ずつ読む"""
+        screens = [{"type": "FRAME", "name": f"Screen{i}", "children": [{"type": "TEXT", "text": str(i)}]} for i in range(3)]
+        path = self.compile_to("export.dslb", screens)
+        with dsl_binary.load(path) as doc:
+            self.assertEqual([n.to_dict() for n in doc.documents()], [nodes.build(s).to_dict() for s in screens])
+        self.assertEqual([toJetpackCompose.convert(n) for n in dsl_stream.open_documents(path)],
+                         [toJetpackCompose.convert(s) for s in screens])
+
+    def test_load_screen(self):
+        """decoder.load_screen はバイナリも読む（画面が 1 つでなければ ValueError）"""
+        data = dsl_binary.compile_dsl(EDGE_DSL)
+        self.assertEqual(toSwiftUi.convert(decoder.load_screen(data)), toSwiftUi.convert(EDGE_DSL))
+        with self.assertRaises(ValueError):
+            decoder.load_screen(dsl_binary.compile_documents([EDGE_DSL, EDGE_DSL]))
+
+    def test_invalid(self):
+        """壊れた DSL やバイナリは ValueError"""
+        for dsl in ([], {"children": {"type": "TEXT"}}, {"children": ["TEXT"]}, {"type": "OVERLAY", "child": "x"}):
+            with self.assertRaises(ValueError):
+                dsl_binary.compile_dsl(dsl)
+        data = dsl_binary.compile_dsl(EDGE_DSL)
+        for broken in (b"", b"DSLA" + data[4:], data[:40]):
+            with self.assertRaises(ValueError):
+                dsl_binary.loads(broken)
+        with self.assertRaises(ValueError):
+            dsl_binary.load(self.compile_to("empty.dslb", [])).root
+
+    def test_compile_file_and_batch(self):
+        """compile_file で書き出したバイナリも batch の入力になる"""
+        src = os.path.join(self.tmp.name, "dsl")
+        os.makedirs(src)
+        with open(os.path.join(src, "edge.json"), "w", encoding="utf-8") as f:
+            json.dump(EDGE_DSL, f)
+        self.assertEqual(dsl_binary.compile_file(os.path.join(src, "edge.json"), os.path.join(src, "bin.dslb")), 1)
+        out = os.path.join(self.tmp.name, "out")
+        results = batch.run_batch("compose", batch.collect_inputs(src)[0], out, src)
+        self.assertEqual([r.error for r in results], [None, None])
+        with open(os.path.join(out, "bin.kt"), encoding="utf-8") as a, open(os.path.join(out, "edge.kt"), encoding="utf-8") as b:
+            self.assertEqual(a.read(), b.read())
+
+if __name__ == '__main__':
+    unittest.main()
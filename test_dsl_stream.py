@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import unittest
+import json
+import os
+import sys
+import tempfile
+from io import StringIO, BytesIO
+from unittest.mock import patch
+from dsl2ui import dsl_stream
+from dsl2ui import toJetpackCompose
+from dsl2ui import toSwiftUi
+
+def screen(i):
+    return {"type": "FRAME", "name": f"Screen{i}", "children": [{"type": "TEXT", "text": f"row {i}" * (i + 1)}]}
+
+class TestDslStream(unittest.TestCase):
+
+    def setUp(self):
+        """テストの前処理"""
+        self.maxDiff = None
+        self.screens = [screen(i) for i in range(20)]
+
+    def docs(self, text, chunk_size=7):
+        return list(dsl_stream.iter_documents(StringIO(text), chunk_size))
+
+    def test_single_object(self):
+        """1 画面の JSON は従来どおり 1 件"""
+        self.assertEqual(self.docs(json.dumps(self.screens[0])), [self.screens[0]])
+        self.assertEqual(self.docs(""), [])
+
+    def test_json_lines(self):
+        """JSON Lines はチャンク境界をまたいでも 1 行 1 画面"""
+        text = "\n".join(json.dumps(s) for s in self.screens) + "\n\n"
+        self.assertEqual(self.docs(text), self.screens)
+        self.assertEqual(self.docs(text, chunk_size=1), self.screens)
+
+    def test_top_level_array(self):
+        """トップレベル配列は要素を 1 つずつ取り出す"""
+        text = json.dumps(self.screens, indent=2)
+        self.assertEqual(self.docs(text), self.screens)
+        self.assertEqual(self.docs(" [ ] "), [])
+
+    def test_yields_before_reading_everything(self):
+        """最初の画面は入力全体を読む前に返る"""
+        text = json.dumps(self.screens)
+        f = StringIO(text)
+        first = next(dsl_stream.iter_documents(f, 64))
+        self.assertEqual(first, self.screens[0])
+        self.assertLess(f.tell(), len(text) // 2)
+
+    def test_malformed(self):
+        """壊れた入力は JSONDecodeError（それまでの画面は取り出せる）"""
+        for text in ['[{"a": 1} {"b": 2}]', '[{"a": 1}', '[{"a": 1}] x', '{"a": 1} {"b"']:
+            it = dsl_stream.iter_documents(StringIO(text), 4)
+            self.assertEqual(next(it), {"a": 1})
+            with self.assertRaises(json.JSONDecodeError):
+                list(it)
+
+    def test_rejects_binary_file(self):
+        """バイナリモードのファイルは TypeError"""
+        with self.assertRaises(TypeError):
+            list(dsl_stream.iter_documents(BytesIO(b"{}")))
+
+    def test_deep_document(self):
+        """再帰上限を超える深さの画面も読み込める"""
+        depth = sys.getrecursionlimit() * 2
+        deep = '{"type": "FRAME", "children": [' * depth + '{"type": "SPACER"}' + ']}' * depth
+        docs = self.docs(deep + "\n" + json.dumps(self.screens[1]), chunk_size=1 << 16)
+        self.assertEqual(docs[0]["type"], "FRAME")
+        self.assertEqual(docs[1], self.screens[1])
+
+    def test_open_documents_with_bom(self):
+        """ファイルからの読み込み（BOM 付き UTF-8）"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "export.jsonl")
+            with open(path, "w", encoding="utf-8-sig") as f:
+                f.write("\n".join(json.dumps(s, ensure_ascii=False) for s in self.screens[:3]))
+            self.assertEqual(list(dsl_stream.open_documents(path)), self.screens[:3])
+
+    def test_open_documents_pretty_and_malformed(self):
+        """整形された 1 画面はファイル全体で読み、読めなければストリーミングと同じ結果・エラー"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "screen.json")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n " + json.dumps(self.screens[2], indent=2))
+            self.assertEqual(list(dsl_stream.open_documents(path, 8)), [self.screens[2]])
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(json.dumps(self.screens[0], indent=2) + "\n" + json.dumps(self.screens[1]))
+            self.assertEqual(list(dsl_stream.open_documents(path, 8)), self.screens[:2])
+            with open(path, "w", encoding="utf-8") as f:
+                f.write('{"a": 1} {"b"')
+            it = dsl_stream.open_documents(path, 4)
+            self.assertEqual(next(it), {"a": 1})
+            with self.assertRaises(json.JSONDecodeError):
+                list(it)
+            # 整形された画面の連結は先頭から読み直す（BOM もまた読み飛ばす）
+            with open(path, "w", encoding="utf-8-sig") as f:
+                f.write("".join(json.dumps(s, indent=2) for s in self.screens[:3]))
+            self.assertEqual(list(dsl_stream.open_documents(path, 8)), self.screens[:3])
+
+    def test_open_documents_json_lines_not_whole_file(self):
+        """JSON Lines はファイル全体を読み込まず 1 行ずつ読む"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "export.jsonl")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(json.dumps(s) for s in self.screens) + "\n")
+            read = []
+            real_open = dsl_stream.io.open
+
+            def spy_open(*args, **kwargs):
+                f = real_open(*args, **kwargs)
+                real_read = f.read
+                class Spy:
+                    def read(self, size=-1):
+                        data = real_read(size)
+                        read.append((size, len(data)))
+                        return data
+                    def __getattr__(self, name):
+                        return getattr(f, name)
+                    def __enter__(self): return self
+                    def __exit__(self, *exc): return f.__exit__(*exc)
+                return Spy()
+            with patch("dsl2ui.dsl_stream.decoder.loads", wraps=dsl_stream.decoder.loads) as loads, \
+                 patch("dsl2ui.dsl_stream.io.open", spy_open):
+                self.assertEqual(list(dsl_stream.open_documents(path, 64)), self.screens)
+            self.assertEqual([len(c.args[0]) for c in loads.call_args_list], [len(json.dumps(self.screens[0]))])
+            self.assertTrue(all(0 < size < 1000 for size, _ in read), read)  # read() で残り全部を読まない
+
+    def test_main_with_multiple_screens(self):
+        """main() は複数画面を 1 画面ずつ順に書き出す"""
+        for module in (toJetpackCompose, toSwiftUi):
+            with patch('sys.stdin', StringIO(json.dumps(self.screens[:3]))):
+                with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+                    with patch('sys.argv', [module.__name__]):
+                        module.main()
+            expected = "".join(module.convert(s) + "\n" for s in self.screens[:3])
+            self.assertEqual(mock_stdout.getvalue(), expected)
+
+if __name__ == '__main__':
+    unittest.main()
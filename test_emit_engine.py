@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import unittest
+import json
+import sys
+from io import StringIO
+from unittest.mock import patch
+from dsl2ui import emit_engine
+from dsl2ui import ir
+from dsl2ui import toJetpackCompose
+from dsl2ui import toSwiftUi
+
+def deep_tree(depth):
+    """depth 段ネストした FRAME の先に TEXT を 1 つ持つツリー"""
+    node = {"type": "TEXT", "text": "leaf"}
+    for _ in range(depth):
+        node = {"type": "FRAME", "children": [node]}
+    return node
+
+class TestEmitEngine(unittest.TestCase):
+
+    def setUp(self):
+        """テストの前処理"""
+        self.maxDiff = None
+
+    def test_lines(self):
+        """lines() は改行区切りの結合と同じ出力になる"""
+        ops = emit_engine.lines("head", ["a", "b"], "tail")
+        self.assertEqual("".join(ops), "\n".join(["head", "a", "b", "tail"]))
+        self.assertEqual("".join(emit_engine.lines("h", [], "t")), "h\nt")
+
+    def test_write_chunks_buffers(self):
+        """断片はバッファサイズ単位でまとめて書き出される"""
+        written = []
+        emit_engine.write_chunks(iter(["ab", "cd", "ef", "g"]), written.append, buffer_size=4)
+        self.assertEqual(written, ["abcd", "efg"])
+        written.clear()
+        emit_engine.write_chunks(iter([]), written.append)
+        self.assertEqual(written, [])
+
+    def test_iter_chunks_expands_tasks_in_order(self):
+        """子タスクは出現位置で展開される"""
+        def expand(n, level, flow_dir, bare):
+            if isinstance(n, dict) and "kids" in n:
+                return emit_engine.lines(f"{n['name']}[", [(k, level + 1, flow_dir, False) for k in n["kids"]], "]")
+            return (f"{n['name']}@{level}",)
+        tree = {"name": "r", "kids": [{"name": "a"}, {"name": "b", "kids": [{"name": "c"}]}]}
+        self.assertEqual(emit_engine.emit(tree, 0, None, expand), "r[\na@1\nb[\nc@2\n]\n]")
+
+    def test_visible_guard_does_not_copy_node(self):
+        """visible ガードはノードをコピーせず bare フラグで処理する"""
+        node = ir.lower({"type": "TEXT", "text": "x", "visible": "{{show}}"})
+        for module in (toJetpackCompose, toSwiftUi):
+            ops = module.expand_node(node, 1)
+            self.assertIs(ops[1][0], node)
+            self.assertTrue(ops[1][3])
+
+    def test_deep_tree_both_backends(self):
+        """再帰上限を大きく超える深さでも生成できる"""
+        depth = sys.getrecursionlimit() * 3
+        tree = deep_tree(depth)
+        compose = toJetpackCompose.emit_node(tree, 0)
+        swift = toSwiftUi.emit_node(tree, 0)
+        self.assertIn(f"{'  ' * depth}Text(\"leaf\")", compose)
+        self.assertIn(f"{'  ' * depth}Text(\"leaf\")", swift)
+        self.assertEqual(swift.count("VStack() {"), depth)
+
+    def test_loads_deep(self):
+        """json.loads が RecursionError になる深さでも読み込める"""
+        depth = sys.getrecursionlimit() * 3
+        text = json.dumps(deep_tree(40)).replace('"leaf"', '"deep"')
+        self.assertEqual(emit_engine.loads_deep(text), json.loads(text))
+        deep_text = '{"type": "FRAME", "children": [' * depth + '{"type": "TEXT", "text": "leaf"}' + ']}' * depth
+        limit = sys.getrecursionlimit()
+        dsl = emit_engine.loads_deep(deep_text.encode("utf-8"))
+        self.assertEqual(sys.getrecursionlimit(), limit)
+        self.assertEqual(dsl["type"], "FRAME")
+        with self.assertRaises(ValueError):
+            emit_engine.loads_deep("[" * depth)
+
+    def test_main_with_deep_dsl(self):
+        """main() も深い DSL を変換できる"""
+        depth = sys.getrecursionlimit() * 2
+        data = '{"type": "FRAME", "name": "Deep", "children": [' * depth + '{"type": "SPACER"}' + ']}' * depth
+        for module in (toJetpackCompose, toSwiftUi):
+            with patch('sys.stdin', StringIO(data)):
+                with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+                    with patch('sys.argv', [module.__name__]):
+                        module.main()
+            self.assertIn("Spacer(", mock_stdout.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
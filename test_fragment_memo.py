@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import unittest
+import sys
+from dsl2ui import ir
+from dsl2ui import toJetpackCompose
+from dsl2ui import toSwiftUi
+from dsl2ui.fragment_memo import FragmentMemo
+
+CARD = {
+    "type": "FRAME",
+    "layout": {"direction": "HORIZONTAL", "spacing": 8, "padding": [16, 8, 16, 8]},
+    "children": [
+        {"type": "TEXT", "text": "{{item.name}}"},
+        {"type": "SPACER"},
+        {"type": "INSTANCE", "name": "Za/Badge", "props": {"count": "{{item.qty}}"}, "layout": {"width": {"mode": "FILL"}}}
+    ]
+}
+
+SCREEN = {
+    "type": "FRAME",
+    "name": "Cards",
+    "layout": {"direction": "VERTICAL", "spacing": 12},
+    "scroll": "vertical",
+    "children": [
+        CARD,
+        {"type": "FRAME", "layout": {"direction": "VERTICAL"}, "children": [CARD, {**CARD, "visible": "{{show}}"}]},
+        {"type": "OVERLAY", "position": {"top": 8, "right": 8}, "child": CARD},
+        {"type": "FRAME", "repeat": {"for": "rows", "as": "row"}, "children": [CARD]},
+        {"type": "FRAME", "scroll": "horizontal", "children": [CARD, CARD]},
+        {"type": "FRAME", "children": []},
+        {"type": "INSTANCE", "name": "Za/Button", "props": {"label": "OK", "enabled": True}},
+        {"type": "INSTANCE", "name": "Za/Button", "props": {"enabled": True, "label": "OK"}},
+    ]
+}
+
+class TestFragmentMemo(unittest.TestCase):
+
+    def setUp(self):
+        """テストの前処理"""
+        self.maxDiff = None
+
+    def test_output_identical_with_memo(self):
+        """メモ有無で出力が一致する（両バックエンド）"""
+        for module in (toJetpackCompose, toSwiftUi):
+            memo = FragmentMemo(module.__name__)
+            expected = module.convert(SCREEN)
+            self.assertEqual(module.convert(SCREEN, memo), expected)
+            self.assertGreater(memo.hits, 0)
+            # 2 回目は画面全体がヒットする
+            self.assertEqual(module.convert(SCREEN, memo), expected)
+
+    def test_flow_dir_is_part_of_key(self):
+        """flow_dir が違えば別の断片（Compose の SPACER は方向依存）"""
+        memo = FragmentMemo("compose")
+        node = {"type": "FRAME", "children": [{"type": "SPACER"}]}
+        inner = {"type": "FRAME", "layout": {"direction": "HORIZONTAL"}, "children": [node]}
+        self.assertEqual(toJetpackCompose.emit_node(inner, 1, None, memo), toJetpackCompose.emit_node(inner, 1))
+        self.assertEqual(toJetpackCompose.emit_node(node, 1, None, memo), toJetpackCompose.emit_node(node, 1))
+
+    def test_props_order_is_part_of_key(self):
+        """props の順序が違えば別の断片"""
+        memo = FragmentMemo("swiftui")
+        a = {"type": "INSTANCE", "name": "B", "props": {"x": 1, "y": 2}}
+        b = {"type": "INSTANCE", "name": "B", "props": {"y": 2, "x": 1}}
+        self.assertEqual(toSwiftUi.emit_node(a, 1, None, memo), "  B(x: 1, y: 2)")
+        self.assertEqual(toSwiftUi.emit_node(b, 1, None, memo), "  B(y: 2, x: 1)")
+
+    def test_multiline_text_not_memoized(self):
+        """改行を含む文字列は再インデントで壊れるためメモ化しない"""
+        memo = FragmentMemo("compose")
+        node = {"type": "FRAME", "children": [{"type": "TEXT", "text": "a\nb"}]}
+        self.assertIsNone(memo.key(node, None))
+        self.assertEqual(toJetpackCompose.emit_node(node, 2, None, memo), toJetpackCompose.emit_node(node, 2))
+        self.assertEqual(memo.stats()["entries"], 0)
+
+    def test_reindent(self):
+        """空行には インデントを付けない"""
+        memo = FragmentMemo()
+        self.assertEqual(memo.reindent("A {\n\n  B\n}", 2), "    A {\n\n      B\n    }")
+
+    def test_bounded_entries(self):
+        """上限を超えたら古い断片から捨てる"""
+        memo = FragmentMemo("swiftui", max_entries=2)
+        for i in range(3):
+            for _ in range(2):
+                toSwiftUi.emit_node({"type": "INSTANCE", "name": f"C{i}"}, 0, None, memo)
+        stats = memo.stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["misses"], 3)
+        memo.clear()
+        self.assertEqual(memo.stats()["hit_rate"], 0.0)
+
+    def test_records_from_second_occurrence(self):
+        """1 回目に出てきたサブツリーは記録しない（深いツリーでも記録のコストが 2 乗にならない）"""
+        memo = FragmentMemo("compose")
+        node = {"type": "INSTANCE", "name": "A"}
+        self.assertIsNone(memo.key(ir.lower(node), None))
+        self.assertIsNotNone(memo.key(ir.lower(node), None))
+        root = leaf = {"type": "FRAME", "children": []}
+        for _ in range(sys.getrecursionlimit() * 2):
+            child = {"type": "FRAME", "children": [{"type": "TEXT", "text": "x"}]}
+            leaf["children"].append(child)
+            leaf = child
+        memo = FragmentMemo("compose")
+        self.assertEqual(toJetpackCompose.convert(root, memo), toJetpackCompose.convert(root))
+        self.assertEqual(memo.stats()["entries"], 0)
+        self.assertEqual(toJetpackCompose.convert(root, memo), toJetpackCompose.convert(root))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import unittest
+import sys
+from dsl2ui import bench
+from dsl2ui import ir
+from dsl2ui import nodes
+from dsl2ui import toJetpackCompose
+from dsl2ui import toSwiftUi
+from dsl2ui.fragment_memo import FragmentMemo
+
+SAMPLE_DSL = {
+    "type": "FRAME",
+    "name": "IrScreen",
+    "layout": {"direction": "HORIZONTAL", "spacing": 8},
+    "children": [
+        {"type": "SPACER"},
+        {"type": "TEXT", "text": "{{ title }}", "visible": "{{ show }}"},
+        {"type": "INSTANCE", "name": "ds/Button", "props": {"on": True, "n": 2, "label": "{{ l }}", "s": "x", "x": [1]}},
+        {"type": "FRAME", "scroll": "horizontal", "layout": {"direction": "VERTICAL"}, "children": [{"type": "SPACER"}]},
+        {"type": "OVERLAY", "position": {"top": 4, "right": 8}, "child": {"type": "SPACER"}},
+        {"type": "OVERLAY"},
+        {"type": "IMAGE"}
+    ]
+}
+
+class TestIr(unittest.TestCase):
+
+    def setUp(self):
+        """テストの前処理"""
+        self.maxDiff = None
+
+    def test_lower_resolves_layout(self):
+        """コンテナ・SPACER の向き・配置・props が解決される"""
+        root = ir.lower(SAMPLE_DSL)
+        self.assertEqual((root.axis, root.scroll, root.lazy), (nodes.HORIZONTAL, None, False))
+        spacer, text, inst, lazy, overlay, empty, image = root.children
+        self.assertEqual(spacer.axis, nodes.HORIZONTAL)
+        self.assertEqual((text.visible, text.value, text.bound), ("show", "title", True))
+        self.assertEqual(inst.props, (("on", ir.BOOL, True), ("n", ir.NUMBER, 2), ("label", ir.BINDING, "l"),
+                                      ("s", ir.STRING, "x"), ("x", ir.UNSUPPORTED, None)))
+        # 横スクロールは Lazy で横並び、子の SPACER は layout.direction（縦）に伸びる
+        self.assertEqual((lazy.axis, lazy.scroll, lazy.lazy), (nodes.HORIZONTAL, nodes.HORIZONTAL, True))
+        self.assertEqual(lazy.children[0].axis, nodes.VERTICAL)
+        self.assertEqual((overlay.vertical, overlay.horizontal), (ir.TOP, ir.END))
+        self.assertEqual(overlay.insets, (("top", 4), ("right", 8)))
+        # OVERLAY の子は親の並び方向を引き継ぐ
+        self.assertEqual(overlay.child.axis, nodes.HORIZONTAL)
+        self.assertIsNone(empty.child.type)
+        self.assertEqual(image.type, "IMAGE")
+
+    def test_dict_and_node_lower_the_same(self):
+        """dict からでも nodes.Node からでも同じ IR"""
+        tree = bench.CorpusGenerator(4).tree(nodes=300, repeat=0.3, visible=0.3)
+        self.assertEqual(ir.lower(tree).to_dict(), ir.lower(nodes.build(tree)).to_dict())
+        self.assertEqual(ir.lower(SAMPLE_DSL).to_dict(), ir.lower(nodes.build(SAMPLE_DSL)).to_dict())
+
+    def test_alignment(self):
+        """片側だけ指定された向きに寄せる"""
+        self.assertEqual(ir.alignment(None), (ir.CENTER, ir.CENTER))
+        self.assertEqual(ir.alignment({"bottom": 0, "left": 0}), (ir.BOTTOM, ir.START))
+        self.assertEqual(ir.alignment({"left": 0, "right": 0, "top": 0}), (ir.TOP, ir.CENTER))
+
+    def test_container(self):
+        """scroll と direction からコンテナを決める"""
+        row = nodes.build_layout({"direction": "HORIZONTAL"})
+        self.assertEqual(ir.container(None, "horizontal"), (nodes.HORIZONTAL, nodes.HORIZONTAL, True))
+        self.assertEqual(ir.container(row, "vertical"), (nodes.HORIZONTAL, nodes.VERTICAL, False))
+        self.assertEqual(ir.container(None, None), (nodes.VERTICAL, None, False))
+        # 縦スクロールする縦並びの repeat だけ Lazy にする
+        self.assertEqual(ir.container(None, "vertical", True), (nodes.VERTICAL, nodes.VERTICAL, True))
+        self.assertEqual(ir.container(row, "vertical", True), (nodes.HORIZONTAL, nodes.VERTICAL, False))
+        self.assertEqual(ir.container(None, None, True), (nodes.VERTICAL, None, False))
+
+    def test_screen_shared_by_backends(self):
+        """同じ Screen を両バックエンドに渡しても dict と同じ出力"""
+        tree = bench.CorpusGenerator(6).tree(nodes=500, repeat=0.3, visible=0.3)
+        screen = ir.screen(tree)
+        self.assertEqual(screen.name, "BenchScreen")
+        self.assertEqual(toJetpackCompose.convert(screen), toJetpackCompose.convert(tree))
+        self.assertEqual(toSwiftUi.convert(screen), toSwiftUi.convert(tree))
+        self.assertEqual(ir.screen({"type": "FRAME"}).name, "GeneratedScreen")
+        self.assertIs(ir.screen(screen), screen)
+
+    def test_memo_with_ir(self):
+        """IR の要素でもサブツリーのメモ化が効く"""
+        card = {"type": "FRAME", "children": [{"type": "TEXT", "text": "card"}]}
+        tree = {"type": "FRAME", "children": [card, card, card, card]}
+        memo = FragmentMemo("compose")
+        self.assertEqual(toJetpackCompose.emit_node(tree, 1, None, memo), toJetpackCompose.emit_node(tree, 1))
+        self.assertGreaterEqual(memo.hits, 2)
+
+    def test_digest(self):
+        """digest は同じ構造なら同じ、違えば別。改行を含むと False、深いツリーでも求まる"""
+        card = {"type": "FRAME", "layout": {"spacing": 8}, "children": [
+            {"type": "TEXT", "text": "{{ a }}"}, {"type": "INSTANCE", "name": "B", "props": {"x": 1}}]}
+        a, b = ir.lower(card), ir.lower(dict(card))
+        self.assertIsNot(a, b)
+        self.assertEqual(ir.digest(a), ir.digest(b))
+        self.assertEqual(len(ir.digest(a)), 16)
+        self.assertIs(a.children[0].digest, ir.digest(a.children[0]))  # 子も埋まっている
+        other = dict(card, children=[{"type": "TEXT", "text": "{{ a }}"}, {"type": "INSTANCE", "name": "B", "props": {"x": 2}}])
+        self.assertNotEqual(ir.digest(ir.lower(other)), ir.digest(a))
+        self.assertNotEqual(ir.digest(ir.lower(dict(card, visible="{{ v }}"))), ir.digest(a))
+        multiline = ir.lower({"type": "FRAME", "children": [card, {"type": "TEXT", "text": "a\nb"}]})
+        self.assertIs(ir.digest(multiline), False)
+        self.assertEqual(ir.digest(multiline.children[0]), ir.digest(a))
+        root = leaf = {"type": "FRAME", "children": []}
+        for _ in range(sys.getrecursionlimit() * 2):
+            child = {"type": "FRAME", "children": [{"type": "TEXT", "text": "x"}]}
+            leaf["children"].append(child)
+            leaf = child
+        self.assertEqual(len(ir.digest(ir.lower(root))), 16)
+
+if __name__ == '__main__':
+    unittest.main()
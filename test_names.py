@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import unittest
+from dsl2ui import names
+from dsl2ui import toJetpackCompose
+from dsl2ui import toSwiftUi
+
+class TestNames(unittest.TestCase):
+
+    def setUp(self):
+        """キャッシュを空にしてから実行"""
+        names.clear()
+
+    def test_component_name(self):
+        """階層・区切り文字・数字始まり"""
+        self.assertEqual(names.component_name("Za/IconButton"), "ZaIconButton")
+        self.assertEqual(names.component_name("My Component/Sub Page"), "MyComponentSubPage")
+        self.assertEqual(names.component_name("component-name_x"), "ComponentNameX")
+        self.assertEqual(names.component_name("3d/view"), "_3dView")
+        self.assertEqual(names.component_name("Zä/Ok!"), "ZOk")
+        self.assertEqual(names.component_name("//"), "Unknown")
+
+    def test_pascal(self):
+        """画面名の PascalCase 化"""
+        self.assertEqual(names.pascal("inventory screen"), "InventoryScreen")
+        self.assertEqual(names.pascal("my-screen_v2"), "MyScreenV2")
+        self.assertEqual(names.pascal("!!!"), "GeneratedScreen")
+
+    def test_backends_share_the_cache(self):
+        """両バックエンドが同じ変換関数を使う"""
+        self.assertIs(toJetpackCompose.to_compose_name, names.component_name)
+        self.assertIs(toSwiftUi.to_swift_name, names.component_name)
+        self.assertIs(toJetpackCompose.to_pascal, toSwiftUi.to_pascal)
+
+    def test_stats(self):
+        """ヒット率の統計"""
+        dsl = {"type": "FRAME", "name": "S", "children": [{"type": "INSTANCE", "name": "Za/Button"}] * 10}
+        toJetpackCompose.convert(dsl)
+        toSwiftUi.convert(dsl)
+        st = names.stats()
+        self.assertEqual(st["misses"], 2)
+        self.assertEqual(st["hits"], 20)
+        self.assertEqual(st["entries"], 2)
+        self.assertAlmostEqual(st["hit_rate"], 20 / 22)
+        names.clear()
+        self.assertEqual(names.stats()["entries"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import unittest
+import gc
+import json
+import tracemalloc
+from dsl2ui import bench
+from dsl2ui import nodes
+from dsl2ui import toJetpackCompose
+from dsl2ui import toSwiftUi
+
+SAMPLE_DSL = {
+    "type": "FRAME",
+    "name": "TestScreen",
+    "layout": {"direction": "VERTICAL", "spacing": 8, "width": {"mode": "FILL"}, "padding": [16, 8, 16, 8]},
+    "scroll": "vertical",
+    "children": [
+        {"type": "TEXT", "text": "{{ title }}", "visible": "{{ showTitle }}"},
+        {"type": "INSTANCE", "name": "ui/button", "props": {"label": "OK", "enabled": True},
+         "layout": {"width": {"mode": "FIXED", "value": 120}}},
+        {"type": "FRAME", "layout": {"direction": "HORIZONTAL"}, "repeat": {"for": "rows", "as": "row"},
+         "children": [{"type": "TEXT", "text": "{{ row.name }}"}]},
+        {"type": "OVERLAY", "position": {"top": 4, "right": 4}, "child": {"type": "SPACER"}}
+    ]
+}
+
+class TestNodes(unittest.TestCase):
+
+    def setUp(self):
+        """テストの前処理"""
+        self.maxDiff = None
+
+    def test_build_fields(self):
+        """dict の各フィールドが Node に移る"""
+        root = nodes.build(SAMPLE_DSL)
+        self.assertIs(root.type, nodes.FRAME)
+        self.assertEqual(root.scroll, "vertical")
+        self.assertEqual(root.layout.padding, (16, 8, 16, 8))
+        self.assertIs(root.layout.width.mode, nodes.FILL)
+        text, inst, row, overlay = root.children
+        self.assertEqual(text.visible, "showTitle")
+        self.assertEqual(inst.props, (("label", "OK"), ("enabled", True)))
+        self.assertEqual((row.repeat.source, row.repeat.alias), ("rows", "row"))
+        self.assertEqual((row.repeat.key, row.repeat.content_type), (None, None))
+        repeat = nodes.build_repeat({"for": "rows", "key": "id", "contentType": "row"})
+        self.assertEqual(repeat.to_dict(), {"for": "rows", "as": "item", "key": "id", "contentType": "row"})
+        self.assertIs(overlay.child.type, nodes.SPACER)
+        self.assertEqual(overlay.position, {"top": 4, "right": 4})
+        # Node はそのまま返す
+        self.assertIs(nodes.build(root), root)
+
+    def test_to_dict_roundtrip(self):
+        """to_dict から作り直しても同じ出力"""
+        root = nodes.build(SAMPLE_DSL)
+        again = nodes.build(root.to_dict())
+        self.assertEqual(again.to_dict(), root.to_dict())
+        self.assertEqual(toJetpackCompose.convert(again), toJetpackCompose.convert(SAMPLE_DSL))
+
+    def test_layouts_are_shared(self):
+        """同じ内容の Layout / Size は 1 つのオブジェクトを共有する"""
+        a = nodes.build_layout({"direction": "VERTICAL", "spacing": 8, "width": {"mode": "FILL"}})
+        b = nodes.build_layout({"width": {"mode": "FILL"}, "spacing": 8, "direction": "VERTICAL"})
+        self.assertIs(a, b)
+        self.assertIs(a.width, nodes.build_size({"mode": "FILL"}))
+        self.assertIsNone(nodes.build_layout({}))
+        # hashable でない値は共有しないが変換はできる
+        odd = nodes.build_layout({"width": {"mode": "FIXED", "value": [1]}})
+        self.assertEqual(odd.width.value, [1])
+
+    def test_derive_is_per_key(self):
+        """derive は key 毎に 1 回だけ計算する"""
+        layout = nodes.Layout(spacing=4)
+        calls = []
+        f = lambda lay: calls.append(lay) or "x"
+        self.assertEqual(layout.derive("a", f), "x")
+        self.assertEqual(layout.derive("a", f), "x")
+        layout.derive("b", f)
+        self.assertEqual(len(calls), 2)
+
+    def test_deep_tree(self):
+        """深いツリーも再帰せずに変換できる"""
+        root = leaf = {"type": "FRAME", "children": []}
+        for _ in range(5000):
+            child = {"type": "FRAME", "children": []}
+            leaf["children"].append(child)
+            leaf = child
+        n, depth = nodes.build(root), 0
+        while n.children:
+            n, depth = n.children[0], depth + 1
+        self.assertEqual(depth, 5000)
+
+    def test_build_restores_gc(self):
+        """変換中に止めた GC は元に戻す"""
+        self.assertTrue(gc.isenabled())
+        nodes.build(SAMPLE_DSL)
+        self.assertTrue(gc.isenabled())
+        gc.disable()
+        try:
+            nodes.build(SAMPLE_DSL)
+            self.assertFalse(gc.isenabled())
+        finally:
+            gc.enable()
+
+    def test_same_output_as_dict(self):
+        """dict と Node のどちらを渡しても同じ出力"""
+        tree = bench.CorpusGenerator(5).tree(nodes=400, repeat=0.3, visible=0.3)
+        root = nodes.build(tree)
+        self.assertEqual(toJetpackCompose.convert(root), toJetpackCompose.convert(tree))
+        self.assertEqual(toSwiftUi.convert(root), toSwiftUi.convert(tree))
+
+    def test_smaller_than_dicts(self):
+        """保持するツリーは dict より小さい"""
+        def size(make):
+            tracemalloc.start()
+            try:
+                obj = make()
+                return tracemalloc.get_traced_memory()[0], obj
+            finally:
+                tracemalloc.stop()
+        text = json.dumps(bench.CorpusGenerator(2).tree(nodes=3000))
+        dict_size, tree = size(lambda: json.loads(text))
+        node_size, _ = size(lambda: nodes.build(tree))
+        self.assertLess(node_size * 2, dict_size)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import unittest
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+from dsl2ui import profiler
+from dsl2ui import toJetpackCompose
+from dsl2ui import toSwiftUi
+
+DSL = {
+    "type": "FRAME",
+    "name": "ProfScreen",
+    "layout": {"direction": "VERTICAL", "spacing": 8},
+    "children": [
+        {"type": "TEXT", "text": "a", "visible": "{{show}}"},
+        {"type": "INSTANCE", "name": "Za/Button", "props": {"title": "x"}, "layout": {"width": {"mode": "FILL"}}},
+        {"type": "OVERLAY", "position": {"top": 4}, "child": {"type": "FRAME", "children": [{"type": "SPACER"}]}}
+    ]
+}
+
+class TestProfiler(unittest.TestCase):
+
+    def setUp(self):
+        """テストの前処理"""
+        self.maxDiff = None
+
+    def run_main(self, module, argv, data):
+        with patch('sys.stdin', StringIO(data)):
+            with patch('sys.stdout', new_callable=StringIO) as out, patch('sys.stderr', new_callable=StringIO) as err:
+                with patch('sys.argv', [module.__name__] + argv):
+                    module.main()
+        return out.getvalue(), err.getvalue()
+
+    def test_tree_stats(self):
+        """ノード数と最大深さ"""
+        stats = profiler.tree_stats(DSL)
+        self.assertEqual(stats["nodes"], 6)
+        self.assertEqual(stats["max_depth"], 4)
+        self.assertEqual(stats["types"], {"FRAME": 2, "TEXT": 1, "INSTANCE": 1, "OVERLAY": 1, "SPACER": 1})
+
+    def test_output_unchanged_and_functions_restored(self):
+        """計測しても出力は同じで、終わったら関数は元に戻る"""
+        for module in (toJetpackCompose, toSwiftUi):
+            originals = {name: getattr(module, name) for name in module.PROFILE_FUNCS + ("emit_node", "expand_node", "wrap_file")}
+            prof = profiler.Profile()
+            out = []
+            prof.convert(module, DSL, out.append)
+            self.assertEqual("".join(out), module.convert(DSL) + "\n")
+            for name, func in originals.items():
+                self.assertIs(getattr(module, name), func)
+
+    def test_counts(self):
+        """フェーズ・ノード type・補助関数の呼び出し回数"""
+        prof = profiler.Profile()
+        prof.convert(toJetpackCompose, DSL, lambda s: None)
+        d = prof.to_dict()
+        self.assertEqual(d["phases"]["emit"]["calls"], 1)
+        self.assertEqual(d["phases"]["wrap"]["calls"], 1)
+        self.assertEqual(d["phases"]["write"]["calls"], 1)
+        self.assertEqual(d["node_types"]["visible"]["calls"], 1)
+        self.assertEqual(d["node_types"]["TEXT"]["calls"], 1)
+        self.assertEqual(d["node_types"]["FRAME"]["calls"], 2)
+        self.assertEqual(d["funcs"]["to_compose_name"]["calls"], 1)
+        self.assertEqual(d["funcs"]["alignment_name"]["calls"], 1)
+        self.assertEqual(d["screens"][0]["name"], "ProfScreen")
+
+    def test_from_argv(self):
+        """--profile / --profile-json を取り除く"""
+        self.assertEqual(profiler.from_argv(["a.json"]), (["a.json"], None))
+        rest, prof = profiler.from_argv(["--profile-json", "p.json", "a.json", "--profile"])
+        self.assertEqual(rest, ["a.json"])
+        self.assertEqual((prof.json_path, prof.summary), ("p.json", True))
+        self.assertEqual(profiler.from_argv(["--profile-json=q.json"])[1].json_path, "q.json")
+
+    def test_main_profile(self):
+        """main() の --profile は標準エラーに集計、出力は変わらない"""
+        for module in (toJetpackCompose, toSwiftUi):
+            plain, _ = self.run_main(module, [], json.dumps(DSL))
+            out, err = self.run_main(module, ["--profile"], json.dumps(DSL))
+            self.assertEqual(out, plain)
+            self.assertIn("parse", err)
+            self.assertIn("screen ProfScreen: 6 nodes, max depth 4", err)
+
+    def test_main_profile_json(self):
+        """--profile-json は JSON を書き出す"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "prof.json")
+            _, err = self.run_main(toSwiftUi, ["--profile-json", path], json.dumps([DSL, DSL]))
+            self.assertEqual(err, "")
+            with open(path, encoding="utf-8") as f:
+                d = json.load(f)
+            self.assertEqual(len(d["screens"]), 2)
+            self.assertEqual(d["phases"]["parse"]["calls"], 3)
+            self.assertEqual(d["funcs"]["to_swift_name"]["calls"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import unittest
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+from dsl2ui import quickgen
+from dsl2ui import toJetpackCompose
+from dsl2ui import toSwiftUi
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+DSL = {
+    "type": "FRAME",
+    "name": "QuickScreen",
+    "layout": {"direction": "VERTICAL", "spacing": 8},
+    "children": [
+        {"type": "TEXT", "text": "{{ title }}"},
+        {"type": "INSTANCE", "name": "ds/Button", "props": {"label": "OK"}}
+    ]
+}
+
+class TestQuickgen(unittest.TestCase):
+
+    def setUp(self):
+        """テスト用の DSL ファイルを作成"""
+        self.maxDiff = None
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.src = os.path.join(self.tmp.name, "screen.json")
+        with open(self.src, "w", encoding="utf-8") as f:
+            json.dump(DSL, f)
+
+    def test_parse_args(self):
+        """引数の解析（不正な引数は終了コード 2）"""
+        self.assertEqual(quickgen.parse_args(["swiftui", "a.json", "-o", "A.swift", "--timing"]),
+                         ("swiftui", "a.json", "A.swift", True, None))
+        for argv in (["compose"], ["flutter", "a.json"], ["compose", "a.json", "-o"], ["compose", "a.json", "--fast"]):
+            with patch("sys.stderr", new=StringIO()), self.assertRaises(SystemExit) as cm:
+                quickgen.parse_args(argv)
+            self.assertEqual(cm.exception.code, 2)
+
+    def test_same_output_as_converters(self):
+        """出力は各変換器の CLI と同じ、--timing-json で計測結果を書き出す"""
+        for backend, module in (("compose", toJetpackCompose), ("swiftui", toSwiftUi)):
+            out = os.path.join(self.tmp.name, "out" + module.FILE_EXT)
+            timing = os.path.join(self.tmp.name, "timing.json")
+            self.assertEqual(quickgen.main([backend, self.src, "-o", out, "--timing-json", timing]), 0)
+            with open(out, encoding="utf-8") as f:
+                self.assertEqual(f.read(), module.convert(DSL) + "\n")
+            with open(timing, encoding="utf-8") as f:
+                report = json.load(f)
+            # 起動の起点（t0）が渡されなければ startup_ms は出さない
+            self.assertEqual(set(report), {"import_ms", "convert_ms", "write_ms", "total_ms", "modules"})
+
+    def test_missing_file(self):
+        """読めない入力は終了コード 1"""
+        with patch("sys.stderr", new=StringIO()) as err:
+            self.assertEqual(quickgen.main(["compose", os.path.join(self.tmp.name, "none.json")]), 1)
+        self.assertIn("FileNotFoundError", err.getvalue())
+
+    def test_minimal_interpreter(self):
+        """-S -I でも別のディレクトリから動き、typing / argparse を読み込まない"""
+        timing = os.path.join(self.tmp.name, "timing.json")
+        proc = subprocess.run([sys.executable, "-S", "-I", "-X", "importtime", os.path.join(HERE, "quickgen.py"),
+                               "swiftui", self.src, "--timing", "--timing-json", timing],
+                              capture_output=True, text=True, cwd=self.tmp.name)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertEqual(proc.stdout, toSwiftUi.convert(DSL) + "\n")
+        imported = {line.rsplit("|", 1)[-1].strip() for line in proc.stderr.splitlines() if line.startswith("import time:")}
+        self.assertIn("dsl2ui.toSwiftUi", imported)
+        for heavy in ("typing", "argparse", "threading", "orjson", "msgspec"):
+            self.assertNotIn(heavy, imported)
+        self.assertIn("quickgen: startup_ms", proc.stderr)
+        # startup_ms は入口のスクリプトの実行開始から（dsl2ui.quickgen の import を含む）
+        with open(timing, encoding="utf-8") as f:
+            report = json.load(f)
+        self.assertGreater(report["startup_ms"], 0.1)
+        parts = report["startup_ms"] + report["import_ms"] + report["convert_ms"] + report["write_ms"]
+        self.assertAlmostEqual(report["total_ms"], parts, delta=0.5)
+
+if __name__ == '__main__':
+    unittest.main()
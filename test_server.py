@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import unittest
+import json
+import os
+import socket
+import tempfile
+import threading
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+from dsl2ui import server
+from dsl2ui import toJetpackCompose
+from dsl2ui import toSwiftUi
+
+SIMPLE_DSL = {
+    "type": "FRAME",
+    "name": "TestScreen",
+    "layout": {"direction": "VERTICAL", "spacing": 16},
+    "children": [
+        {"type": "TEXT", "text": "Hello World"},
+        {"type": "SPACER"}
+    ]
+}
+
+class TestServer(unittest.TestCase):
+
+    def setUp(self):
+        """ポート 0 でサーバを起動"""
+        self.maxDiff = None
+        self.service = server.GeneratorService(max_entries=8)
+        self.server = server.make_server(self.service, port=0)
+        self.address = self.server.server_address[:2]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_generate_matches_convert(self):
+        """生成結果は main() の出力と同じ"""
+        for name, module in [("compose", toJetpackCompose), ("swiftui", toSwiftUi)]:
+            self.assertEqual(server.generate(self.address, name, SIMPLE_DSL), module.convert(SIMPLE_DSL) + "\n")
+
+    def test_warm_cache(self):
+        """同じ DSL の 2 回目はキャッシュから返す"""
+        conn = http.client.HTTPConnection(*self.address)
+        body = json.dumps(SIMPLE_DSL).encode("utf-8")
+        headers = []
+        for _ in range(2):
+            conn.request("POST", "/generate/compose", body=body)
+            res = conn.getresponse()
+            res.read()
+            headers.append(res.getheader("X-Dsl2ui-Cache"))
+        conn.close()
+        self.assertEqual(headers, ["miss", "hit"])
+        self.assertEqual(self.service.stats()["hits"], 1)
+
+    def test_memo_is_opt_in(self):
+        """FragmentMemo は既定では使わず（小さな画面ではかえって遅い）、memo=True のときだけ使い回す"""
+        self.assertIsNone(self.service._acquire_memo("compose"))
+        service = server.GeneratorService(memo=True)
+        memo = service._acquire_memo("compose")
+        self.assertIsNotNone(memo)
+        service._release_memo("compose", memo)
+        self.assertIs(service._acquire_memo("compose"), memo)
+        text, hit = service.generate("compose", json.dumps(SIMPLE_DSL).encode("utf-8"))
+        self.assertEqual(text, toJetpackCompose.convert(SIMPLE_DSL) + "\n")
+
+    def test_errors(self):
+        """未知のバックエンドは 404、壊れた JSON は 400"""
+        with self.assertRaisesRegex(RuntimeError, "^404"):
+            server.generate(self.address, "flutter", SIMPLE_DSL)
+        with self.assertRaisesRegex(RuntimeError, "^400"):
+            server.generate(self.address, "compose", b"{not json")
+        with self.assertRaisesRegex(RuntimeError, "^400"):
+            server.generate(self.address, "compose", b"[]")
+        self.assertEqual(self.service.stats()["errors"], 2)
+
+    def test_bad_requests(self):
+        """不正な Content-Length は 400、生成中の KeyError は未知のバックエンド扱いにせず 500"""
+        sock = socket.create_connection(self.address)
+        try:
+            sock.sendall(b"POST /generate/compose HTTP/1.1\r\nHost: x\r\nContent-Length: abc\r\n\r\n")
+            self.assertTrue(sock.recv(1024).startswith(b"HTTP/1.1 400"))
+        finally:
+            sock.close()
+
+        def broken(dsl, memo=None):
+            raise KeyError("field")
+        backend = self.service.backends["compose"]
+        original = backend.convert
+        backend.convert = broken
+        try:
+            with self.assertRaisesRegex(RuntimeError, "^500: KeyError"):
+                server.generate(self.address, "compose", SIMPLE_DSL)
+        finally:
+            backend.convert = original
+
+    def test_concurrent_requests(self):
+        """同時リクエストでもバックエンド毎に正しい結果を返す"""
+        jobs = [("compose" if i % 2 else "swiftui", {**SIMPLE_DSL, "name": f"Screen{i}"}) for i in range(24)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            outs = list(pool.map(lambda j: server.generate(self.address, *j), jobs))
+        for (name, dsl), out in zip(jobs, outs):
+            module = toJetpackCompose if name == "compose" else toSwiftUi
+            self.assertEqual(out, module.convert(dsl) + "\n")
+        self.assertLessEqual(self.service.stats()["entries"], 8)
+
+    def test_health(self):
+        """/health は統計を返す"""
+        server.generate(self.address, "compose", SIMPLE_DSL)
+        conn = http.client.HTTPConnection(*self.address)
+        conn.request("GET", "/health")
+        stats = json.loads(conn.getresponse().read())
+        conn.close()
+        self.assertEqual(stats["requests"], 1)
+        self.assertEqual(stats["backends"], ["compose", "compose-stable", "swiftui", "swiftui-split"])
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix ソケット非対応")
+    def test_unix_socket(self):
+        """Unix ソケットでも同じ API で生成できる"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "dsl2ui.sock")
+            srv = server.make_server(self.service, unix=path)
+            t = threading.Thread(target=srv.serve_forever, daemon=True)
+            t.start()
+            try:
+                self.assertEqual(server.generate(path, "swiftui", SIMPLE_DSL), toSwiftUi.convert(SIMPLE_DSL) + "\n")
+            finally:
+                srv.shutdown()
+                srv.server_close()
+            self.assertFalse(os.path.exists(path))
+            # 前回のソケットは消して使い、ソケット以外のファイルは消さない
+            stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            stale.bind(path)
+            stale.close()
+            server.make_server(self.service, unix=path).server_close()
+            with open(path, "w") as f: f.write("keep")
+            with self.assertRaises(FileExistsError):
+                server.make_server(self.service, unix=path)
+            with open(path) as f: self.assertEqual(f.read(), "keep")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,7 +5,7 @@ import json
 import sys
 from io import StringIO
 from unittest.mock import patch
-import toJetpackCompose
+from dsl2ui import toJetpackCompose
 
 class TestToJetpackCompose(unittest.TestCase):
 
@@ -347,6 +347,73 @@ class TestToJetpackCompose(unittest.TestCase):
         self.assertIn("items(items) { item ->", result)
         self.assertNotIn("forEach", result)
 
+    def test_spacer_in_lazy_items(self):
+        """LazyColumn / LazyRow の item {} / items {} 直下の SPACER は weight を使わない（LazyItemScope に無い）"""
+        dsl = {
+            "type": "FRAME",
+            "scroll": "vertical",
+            "layout": {"direction": "VERTICAL"},
+            "repeat": {"for": "rows", "as": "row"},
+            "children": [
+                {"type": "TEXT", "text": "{{row.name}}"},
+                {"type": "SPACER"},
+                {"type": "SPACER", "visible": "{{ row.gap }}"},
+                {"type": "FRAME", "layout": {"direction": "HORIZONTAL"}, "children": [{"type": "SPACER"}]}
+            ]
+        }
+        result = toJetpackCompose.emit_node(dsl, 1)
+        self.assertIn("    items(rows) { row ->\n      Text(row.name)\n      Spacer(Modifier.height(0.dp))\n"
+                      "      if (row.gap) {\n        Spacer(Modifier.height(0.dp))\n      }\n", result)
+        # Lazy の中の Row / Column の子はこれまでどおり weight で伸ばす
+        self.assertIn("        Spacer(Modifier.width(0.dp).weight(1f))\n", result)
+        self.assertEqual(result.count("weight"), 1)
+        del dsl["repeat"]
+        dsl["layout"] = {"direction": "HORIZONTAL"}
+        dsl["scroll"] = "horizontal"
+        result = toJetpackCompose.emit_node(dsl, 1)
+        self.assertIn("    item {\n      Spacer(Modifier.width(0.dp))\n    }\n", result)
+        self.assertEqual(result.count("weight"), 1)
+
+    def test_vertical_scroll_repeat_uses_lazy_column(self):
+        """縦スクロールの repeat は LazyColumn + items(key, contentType) になるテスト"""
+        dsl = {
+            "type": "FRAME",
+            "scroll": "vertical",
+            "layout": {"direction": "VERTICAL", "spacing": 4},
+            "repeat": {"for": "rows", "as": "row", "key": "sku", "contentType": "inventoryRow"},
+            "children": [
+                {"type": "TEXT", "text": "{{row.name}}"}
+            ]
+        }
+        result = toJetpackCompose.emit_node(dsl, 1)
+        self.assertIn("LazyColumn(verticalArrangement = Arrangement.spacedBy(4.dp)) {", result)
+        self.assertIn('items(rows, key = { it.sku }, contentType = { "inventoryRow" }) { row ->', result)
+        self.assertNotIn("verticalScroll", result)
+        self.assertNotIn("forEach", result)
+        # contentType はバインディングも使える
+        dsl["repeat"] = {"for": "rows", "as": "row", "contentType": "{{ row.kind }}"}
+        self.assertIn("items(rows, contentType = { row -> row.kind }) { row ->", toJetpackCompose.emit_node(dsl, 1))
+        # 横並びの縦スクロールはこれまでどおり
+        dsl["layout"] = {"direction": "HORIZONTAL"}
+        self.assertIn("rows.forEach { row ->", toJetpackCompose.emit_node(dsl, 1))
+
+    def test_repeat_key_in_eager_container(self):
+        """スクロールしない repeat でも key があれば key() で要素を識別するテスト"""
+        dsl = {
+            "type": "FRAME",
+            "repeat": {"for": "tags", "as": "tag", "id": "self"},
+            "children": [
+                {"type": "TEXT", "text": "{{tag}}"}
+            ]
+        }
+        lines = toJetpackCompose.emit_node(dsl, 0).split("\n")
+        self.assertEqual(lines[1:6], ["  tags.forEach { tag ->", "    key(tag) {", "      Text(tag)", "    }", "  }"])
+        dsl["repeat"] = {"for": "rows", "as": "row", "key": "meta.sku"}
+        self.assertIn("key(row.meta.sku) {", toJetpackCompose.emit_node(dsl, 0))
+        dsl["scroll"] = "horizontal"
+        self.assertIn("items(rows, key = { it.meta.sku }) { row ->", toJetpackCompose.emit_node(dsl, 0))
+        self.assertIn("import androidx.compose.runtime.key\n", toJetpackCompose.convert(dsl))
+
     def test_vertical_scroll_modifier_applied(self):
         """verticalScroll Modifier が適用されるテスト"""
         dsl = {
@@ -430,5 +497,27 @@ class TestToJetpackCompose(unittest.TestCase):
         # Center
         self.assertEqual(toJetpackCompose.calculate_alignment({}), "Alignment.Center")
 
+    def test_iter_file_matches_convert(self):
+        """ストリーミング出力が convert() と一致する"""
+        dsl = {
+            "type": "FRAME",
+            "name": "StreamScreen",
+            "layout": {"direction": "VERTICAL", "spacing": 8},
+            "children": [
+                {"type": "TEXT", "text": "{{item.name}}", "visible": "{{show}}"},
+                {"type": "INSTANCE", "name": "Za/Button", "props": {"label": "OK"}}
+            ]
+        }
+        chunks = list(toJetpackCompose.iter_file(dsl))
+        self.assertGreater(len(chunks), 2)
+        self.assertEqual("".join(chunks), toJetpackCompose.convert(dsl))
+        head, tail = toJetpackCompose.wrap_parts("StreamScreen")
+        self.assertEqual(chunks[0], head)
+        self.assertEqual(chunks[-1], tail)
+
+        written = []
+        toJetpackCompose.write_file(dsl, written.append)
+        self.assertEqual("".join(written), toJetpackCompose.convert(dsl) + "\n")
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import unittest
+import re
+import sys
+from dsl2ui import bench
+import dsl2ui
+from dsl2ui import toJetpackCompose
+from dsl2ui import toJetpackComposeStable as stable
+
+HEADER = {"type": "FRAME", "layout": {"direction": "HORIZONTAL", "spacing": 8}, "children": [
+    {"type": "TEXT", "text": "Header"},
+    {"type": "SPACER"},
+    {"type": "INSTANCE", "name": "ds/Icon", "props": {"name": "gear"}, "layout": {"width": {"mode": "FIXED", "value": 24}}},
+    {"type": "FRAME", "layout": {"direction": "VERTICAL"}, "children": [{"type": "TEXT", "text": t} for t in "abcd"]}
+]}
+
+SCREEN = {
+    "type": "FRAME",
+    "name": "Inventory",
+    "layout": {"direction": "VERTICAL", "spacing": 8, "width": {"mode": "FILL"}, "padding": [16, 8, 16, 8]},
+    "scroll": "vertical",
+    "children": [
+        HEADER,
+        {"type": "TEXT", "text": "{{ title }}", "visible": "{{ showTitle }}"},
+        {"type": "FRAME", "scroll": "vertical", "layout": {"direction": "VERTICAL", "spacing": 8, "width": {"mode": "FILL"}},
+         "repeat": {"for": "rows", "as": "row", "key": "sku"},
+         "children": [{"type": "INSTANCE", "name": "ds/Row", "props": {"title": "{{ row.name }}"},
+                       "layout": {"width": {"mode": "FIXED", "value": 24}}}]}
+    ]
+}
+
+ROW = {"type": "INSTANCE", "name": "ds/Row", "props": {"title": "Same", "count": 3},
+       "layout": {"width": {"mode": "FILL"}, "padding": [8, 4, 8, 4]}}
+
+# 同じ INSTANCE が入れ子の FRAME の中と外、visible の中に出てくる画面
+DUP = {"type": "FRAME", "name": "Dup", "children": [
+    ROW, dict(ROW, props={"title": "{{ title }}"}), dict(ROW, visible="{{ shown }}"),
+    {"type": "FRAME", "children": [ROW, dict(ROW, props={"title": "{{ title }}"})] + [{"type": "TEXT", "text": t} for t in "abcdefg"]}
+]}
+
+def inline(text):
+    """
+    定数と切り出した・まとめた関数を元の位置に戻した画面本体（toJetpackCompose の body と比べる用）
+    """
+    consts = dict(re.findall(r"^private val (\w+) = (.*)$", text, re.M))
+    parts = dict(re.findall(r"^@Composable\nprivate fun (\w+)\(\) \{\n(.*?)\n\}$", text, re.M | re.S))
+    body = text.split("  Box(Modifier.fillMaxSize()) {\n", 1)[1].split("\n  }\n}\n", 1)[0]
+    def expand(m):
+        pad, name = m.group(1), m.group(2)
+        return "\n".join(pad + line[2:] if line else line for line in parts[name].split("\n"))
+    while True:
+        body, n = re.subn(r"^( *)(\w+(?:Section|Instance)\d+)\(\)$", expand, body, flags=re.M)
+        if not n: break
+    body = re.sub(r"\.then\((Modifier\d+)\)", lambda m: consts[m.group(1)][len("Modifier"):], body)
+    return re.sub(r"= ((?:Modifier|Spacing)\d+)\b", lambda m: "= " + consts[m.group(1)], body)
+
+class TestToJetpackComposeStable(unittest.TestCase):
+
+    def setUp(self):
+        """テストの前処理"""
+        self.maxDiff = None
+
+    def test_stable_parameters(self):
+        """画面の引数は @Immutable な State にまとめる"""
+        text = stable.convert(SCREEN)
+        self.assertIn("@Immutable\ndata class InventoryState(\n"
+                      "    val items: ImmutableList<Any> = persistentListOf(),\n"
+                      "    val rows: ImmutableList<Any> = persistentListOf()\n)", text)
+        self.assertIn("\nimport kotlinx.collections.immutable.ImmutableList\n", text)
+        self.assertIn("fun Inventory(\n    state: InventoryState = InventoryState()\n) {\n"
+                      "  val items = state.items\n  val rows = state.rows\n", text)
+        self.assertNotIn("items: List<Any> = emptyList()\n) {", text)
+
+    def test_reserved_field_names(self):
+        """repeat.for が state でも引数を隠さない。Kotlin のキーワードはフィールドにしない"""
+        def screen(*sources):
+            return {"type": "FRAME", "name": "S", "children": [
+                {"type": "FRAME", "repeat": {"for": s, "as": "it"}, "children": [{"type": "TEXT", "text": "x"}]}
+                for s in sources]}
+        text = stable.convert(screen("state", "screenState"))
+        self.assertIn("fun S(\n    screenState2: SState = SState()\n) {\n  val items = screenState2.items\n"
+                      "  val screenState = screenState2.screenState\n  val state = screenState2.state\n", text)
+        self.assertNotIn("= state.", text)
+        text = stable.convert(screen("in", "rows"))
+        self.assertIn("    val items: ImmutableList<Any> = persistentListOf(),\n"
+                      "    val rows: ImmutableList<Any> = persistentListOf()\n)", text)
+        self.assertNotIn("val in", text)
+        self.assertEqual(stable.state_param(["items"]), "state")
+
+    def test_hoisted_constants(self):
+        """Modifier と spacedBy は private val に 1 回だけ作る（スクロール Modifier は then で繋ぐ）"""
+        text = stable.convert(SCREEN)
+        self.assertIn("Column(modifier = Modifier.verticalScroll(rememberScrollState()).then(Modifier0), "
+                      "verticalArrangement = Spacing0) {", text)
+        self.assertIn("private val Spacing0 = Arrangement.spacedBy(8.dp)\n", text)
+        self.assertEqual(text.count("Arrangement.spacedBy("), 1)
+        self.assertEqual(text.count("Modifier.width(24.dp)"), 1)
+        self.assertIn("DsRow(title = row.name, modifier = Modifier", text)
+
+    def test_split_static_sections(self):
+        """バインディングを含まない大きな FRAME は引数なしの @Composable に切り出す"""
+        text = stable.convert(SCREEN)
+        self.assertIn("      InventorySection0()\n", text)
+        self.assertIn("@Composable\nprivate fun InventorySection0() {\n  Row(horizontalArrangement = Spacing0) {", text)
+        self.assertNotIn("InventorySection1", text)
+        # 小さい FRAME やバインディングを含む FRAME は切り出さない
+        small = {"type": "FRAME", "name": "Small", "children": [HEADER["children"][3]]}
+        self.assertNotIn("Section", stable.convert(small))
+
+    def test_dedup_instances(self):
+        """バインディングの無い同じ INSTANCE の呼び出しは private な @Composable にまとめる"""
+        text = stable.convert(DUP)
+        self.assertEqual(text.count("  DsRowInstance0()\n"), 3)
+        self.assertIn("\n@Composable\nprivate fun DsRowInstance0() {\n"
+                      "  DsRow(title = \"Same\", count = 3, modifier = Modifier0)\n}\n", text)
+        self.assertEqual(text.count("DsRow(title = title, modifier = Modifier0)"), 2)
+        self.assertEqual(text.count("DsRow(title = \"Same\""), 1)
+        # 1 回しか出てこないものはまとめない
+        once = {"type": "FRAME", "name": "Once", "children": DUP["children"][:1]}
+        self.assertNotIn("Instance", stable.convert(once))
+
+    def test_same_ui_as_compose(self):
+        """定数と切り出した関数を戻すと toJetpackCompose と同じ本体になる"""
+        trees = [SCREEN, DUP, bench.CorpusGenerator(4).tree(nodes=600, repeat=0.2, visible=0.2),
+                 bench.CorpusGenerator(5).tree(nodes=600, repeat=0, visible=0)]
+        for tree in trees:
+            text = stable.convert(tree)
+            base = toJetpackCompose.convert(tree)
+            self.assertEqual(inline(text), base.split("  Box(Modifier.fillMaxSize()) {\n", 1)[1].split("\n  }\n}\n", 1)[0])
+        self.assertIn("Section", stable.convert(trees[3]))
+
+    def test_iter_file_and_deep_tree(self):
+        """ストリーミング出力は convert と同じ、深いツリーも生成できる"""
+        self.assertEqual("".join(stable.iter_file(SCREEN)), stable.convert(SCREEN))
+        root = leaf = {"type": "FRAME", "children": []}
+        for _ in range(sys.getrecursionlimit() * 2):
+            child = {"type": "FRAME", "children": [{"type": "TEXT", "text": "x"}]}
+            leaf["children"].append(child)
+            leaf = child
+        text = stable.convert(root)
+        self.assertEqual(text.count("Section"), 2)  # 呼び出しと定義
+
+    def test_api(self):
+        """dsl2ui.generate_compose(stable=True) は compose-stable で生成する"""
+        self.assertEqual(dsl2ui.generate_compose(SCREEN, stable=True), stable.convert(SCREEN) + "\n")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,7 +5,7 @@ import json
 import sys
 from io import StringIO
 from unittest.mock import patch
-import toSwiftUi
+from dsl2ui import toSwiftUi
 
 class TestToSwiftUi(unittest.TestCase):
 
@@ -360,5 +360,74 @@ class TestToSwiftUi(unittest.TestCase):
         self.assertIn("let item = items[idx]", result)
         self.assertIn("Text(item.name)", result)
 
+    def test_scroll_repeat_uses_lazy_stack(self):
+        """スクロールする repeat は ScrollView + LazyVStack / LazyHStack、key があれば要素で識別するテスト"""
+        node = {
+            "type": "FRAME",
+            "scroll": "vertical",
+            "layout": {"direction": "VERTICAL", "spacing": 4},
+            "repeat": {"for": "rows", "as": "row", "key": "sku", "contentType": "inventoryRow"},
+            "children": [
+                {"type": "TEXT", "text": "{{row.name}}"}
+            ]
+        }
+        lines = toSwiftUi.emit_node(node, 0).split("\n")
+        self.assertEqual(lines, [
+            "ScrollView(.vertical, showsIndicators: true) {",
+            "  LazyVStack(spacing: 4) {",
+            "    ForEach(rows, id: \\.sku) { row in",
+            "      Text(row.name)",
+            "    }",
+            "  }",
+            "}",
+        ])
+        node["scroll"] = "horizontal"
+        node["repeat"] = {"for": "rows", "as": "row"}
+        result = toSwiftUi.emit_node(node, 0)
+        self.assertIn("ScrollView(.horizontal, showsIndicators: false) {\n  LazyHStack(spacing: 4) {", result)
+        self.assertIn("ForEach(rows.indices, id: \\.self) { idx in", result)
+
+    def test_repeat_stable_identity(self):
+        """repeat.id / key があれば添字ではなく要素の key path で識別するテスト"""
+        node = {
+            "type": "FRAME",
+            "layout": {"direction": "HORIZONTAL"},
+            "repeat": {"for": "rows", "as": "row", "id": "id"},
+            "children": [
+                {"type": "TEXT", "text": "{{row.name}}"}
+            ]
+        }
+        self.assertEqual(toSwiftUi.emit_node(node, 0).split("\n"), [
+            "HStack() {",
+            "  ForEach(rows, id: \\.id) { row in",
+            "    Text(row.name)",
+            "  }",
+            "}",
+        ])
+        node["repeat"] = {"for": "tags", "as": "tag", "key": "self"}
+        self.assertIn("ForEach(tags, id: \\.self) { tag in", toSwiftUi.emit_node(node, 0))
+
+    def test_iter_file_matches_convert(self):
+        """ストリーミング出力が convert() と一致する"""
+        dsl = {
+            "type": "FRAME",
+            "name": "StreamScreen",
+            "layout": {"direction": "VERTICAL", "spacing": 8},
+            "children": [
+                {"type": "TEXT", "text": "{{item.name}}", "visible": "{{show}}"},
+                {"type": "INSTANCE", "name": "Za/Button", "props": {"label": "OK"}}
+            ]
+        }
+        chunks = list(toSwiftUi.iter_file(dsl))
+        self.assertGreater(len(chunks), 2)
+        self.assertEqual("".join(chunks), toSwiftUi.convert(dsl))
+        head, tail = toSwiftUi.wrap_parts("StreamScreen")
+        self.assertEqual(chunks[0], head)
+        self.assertEqual(chunks[-1], tail)
+
+        written = []
+        toSwiftUi.write_file(dsl, written.append)
+        self.assertEqual("".join(written), toSwiftUi.convert(dsl) + "\n")
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import unittest
+import io
+import re
+import sys
+import contextlib
+from dsl2ui import bench
+import dsl2ui
+from dsl2ui import toSwiftUi
+from dsl2ui import toSwiftUiSplit as split
+
+HEADER = {"type": "FRAME", "layout": {"direction": "HORIZONTAL", "spacing": 8}, "children": [
+    {"type": "TEXT", "text": "Header"},
+    {"type": "SPACER"},
+    {"type": "INSTANCE", "name": "ds/Icon", "props": {"name": "gear"}, "layout": {"width": {"mode": "FIXED", "value": 24}}},
+    {"type": "FRAME", "layout": {"direction": "VERTICAL"}, "children": [{"type": "TEXT", "text": t} for t in "abc"]}
+]}
+
+SCREEN = {
+    "type": "FRAME",
+    "name": "Inventory",
+    "layout": {"direction": "VERTICAL", "spacing": 8, "width": {"mode": "FILL"}, "padding": [16, 8, 16, 8]},
+    "scroll": "vertical",
+    "children": [
+        HEADER,
+        {"type": "FRAME", "visible": "{{ showList }}", "layout": {"direction": "VERTICAL"}, "children": [
+            {"type": "TEXT", "text": "{{ title }}"},
+            {"type": "FRAME", "layout": {"direction": "VERTICAL"},
+             "repeat": {"for": "rows", "as": "row", "key": "sku"},
+             "children": [{"type": "INSTANCE", "name": "ds/Row", "props": {"title": "{{ row.name }}"}}]}
+        ]}
+    ]
+}
+
+def inline(text):
+    """
+    切り出した View struct・まとめた INSTANCE と修飾子を元の位置に戻した画面本体（toSwiftUi の body と比べる用）
+    """
+    calls = dict(re.findall(r"^private struct (\w+Instance\d+): View \{\n    var body: some View \{\n +(.*)\n", text, re.M))
+    chains = dict(re.findall(r"^    func (layout\d+)\(\) -> some View \{\n        self(.*)\n", text, re.M))
+    parts = dict(re.findall(r"^struct (\w+Section\d+): View \{\n(?:(?:    let [^\n]*\n)+\n)?    var body: some View \{\n(.*?)\n    \}\n\}$",
+                            text, re.M | re.S))
+    body = text.split("        ZStack(alignment: .center) {\n", 1)[1].split("\n        }\n    }\n}\n", 1)[0]
+    def expand(m):
+        pad, name = m.group(1), m.group(2)
+        return "\n".join(pad + line[8:] if line else line for line in parts[name].split("\n"))
+    while True:
+        body, n = re.subn(r"^( *)(\w+Section\d+)\(.*\)$", expand, body, flags=re.M)
+        if not n: break
+    body = re.sub(r"^( *)(\w+Instance\d+)\(\)$", lambda m: m.group(1) + calls[m.group(2)], body, flags=re.M)
+    return re.sub(r"\.(layout\d+)\(\)", lambda m: chains[m.group(1)], body)
+
+class TestToSwiftUiSplit(unittest.TestCase):
+
+    def setUp(self):
+        """テストの前処理"""
+        self.maxDiff = None
+
+    def test_split_by_nodes(self):
+        """ノード数が上限に達した FRAME は View struct に切り出し、使う名前をプロパティで渡す"""
+        text = split.convert(SCREEN, max_nodes=4, max_depth=0)
+        self.assertIn("\n        InventorySection0()\n", text)
+        self.assertIn("\nstruct InventorySection0: View {\n    var body: some View {\n        HStack(spacing: 8) {\n", text)
+        # visible のガードは呼び出し側に残る。repeat の as は中で導入されるので渡さない
+        self.assertIn("        if showList {\n          InventorySection", text)
+        self.assertRegex(text, r"struct InventorySection\d: View \{\n    let title: Any\n    let rows: \[Any\]\n\n")
+        self.assertRegex(text, r"InventorySection\d\(title: title, rows: rows\)\n")
+        self.assertNotIn("let row:", text)
+        # 上限に届かなければ切らない
+        self.assertNotIn("Section", split.convert(SCREEN, max_nodes=0, max_depth=0))
+
+    def test_names_skip_strings_and_calls(self):
+        """文字列リテラルの中の語や関数名はプロパティにしない（補間の中の名前は渡す）"""
+        def screen(text):
+            return {"type": "FRAME", "name": "S", "children": [
+                {"type": "FRAME", "children": [{"type": "TEXT", "text": text}]}]}
+        text = split.convert(screen("{{ format(price) }}"), max_nodes=2, max_depth=0)
+        self.assertIn("SSection0(price: price)", text)
+        self.assertIn("    let price: Any\n", text)
+        self.assertNotIn("format:", text)
+        text = split.convert(screen('{{ "\\(count) items" }}'), max_nodes=2, max_depth=0)
+        self.assertIn("SSection0(count: count)", text)
+        self.assertNotIn("items: items", text)
+        self.assertEqual(split.expr_names('"\\(f(x)) of \\("a" + y)" + z'), ["x", "y", "z"])
+
+    def test_split_by_depth(self):
+        """入れ子が max_depth に達したら切り出す（切った中も同じ条件で切る）"""
+        root = leaf = {"type": "FRAME", "name": "Deep", "children": []}
+        for _ in range(9):
+            child = {"type": "FRAME", "children": [{"type": "TEXT", "text": "x"}]}
+            leaf["children"].append(child)
+            leaf = child
+        text = split.convert(root, max_nodes=0, max_depth=3)
+        self.assertEqual(len(re.findall(r"^struct DeepSection\d+: View", text, re.M)), 4)
+        for body in re.findall(r"var body: some View \{\n(.*?)\n    \}\n\}", text, re.S):
+            self.assertLessEqual(body.count("VStack"), 2)
+
+    def test_same_ui_as_swiftui(self):
+        """切り出した struct を戻すと toSwiftUi と同じ本体になる"""
+        trees = [SCREEN, bench.CorpusGenerator(4).tree(nodes=600, repeat=0.2, visible=0.2),
+                 bench.CorpusGenerator(5).tree(nodes=600, repeat=0, visible=0)]
+        for tree in trees:
+            text = split.convert(tree, max_nodes=6, max_depth=3)
+            self.assertIn("Section", text)
+            base = toSwiftUi.convert(tree)
+            self.assertEqual(inline(text), base.split("        ZStack(alignment: .center) {\n", 1)[1].split("\n        }\n    }\n}\n", 1)[0])
+
+    def test_dedup(self):
+        """同じ修飾子の並びは extension のメソッド、バインディングの無い同じ INSTANCE は private な struct にまとめる"""
+        row = {"type": "INSTANCE", "name": "ds/Row", "props": {"title": "Same", "count": 3},
+               "layout": {"width": {"mode": "FILL"}, "padding": [8, 4, 8, 4]}}
+        bound = dict(row, props={"title": "{{ title }}"})
+        tree = {"type": "FRAME", "name": "Dup", "children": [
+            row, row, bound, bound,
+            {"type": "FRAME", "layout": {"width": {"mode": "FIXED", "value": 40}}, "children": []},
+            {"type": "INSTANCE", "name": "ds/Icon", "props": {"name": "gear"}, "layout": {"width": {"mode": "FIXED", "value": 40}}}]}
+        text = split.convert(tree)
+        self.assertEqual(text.count("  DsRowInstance0()\n"), 2)
+        self.assertIn("\nprivate struct DsRowInstance0: View {\n    var body: some View {\n"
+                      "        DsRow(title: \"Same\", count: 3).layout0()\n    }\n}\n", text)
+        self.assertEqual(text.count("DsRow(title: title).layout0()"), 2)
+        self.assertIn("}.layout1()", text)
+        self.assertIn("DsIcon(name: \"gear\").layout1()", text)
+        self.assertIn("\nprivate extension View {\n    func layout0() -> some View {\n"
+                      "        self.frame(maxWidth: .infinity).padding(EdgeInsets(top: 4, leading: 8, bottom: 4, trailing: 8))\n    }\n", text)
+        self.assertEqual(text.count(".frame("), 2)
+        # 1 回しか出てこないものはまとめない
+        once = {"type": "FRAME", "name": "Once", "children": [row, bound]}
+        self.assertNotIn("Instance", split.convert(once))
+        self.assertIn("DsRow(title: \"Same\", count: 3).layout0()", split.convert(once))
+
+    def test_iter_file_and_deep_tree(self):
+        """ストリーミング出力は convert と同じ、深いツリーも生成できる"""
+        self.assertEqual("".join(split.iter_file(SCREEN)), split.convert(SCREEN))
+        root = leaf = {"type": "FRAME", "children": []}
+        for _ in range(sys.getrecursionlimit() * 2):
+            child = {"type": "FRAME", "children": [{"type": "TEXT", "text": "x"}]}
+            leaf["children"].append(child)
+            leaf = child
+        text = split.convert(root)
+        self.assertGreater(text.count("Section"), 100)
+
+    def test_cli_and_api(self):
+        """CLI の --max-nodes / --max-depth と dsl2ui.generate_swiftui(split=True)"""
+        import json, tempfile, os
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "screen.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(SCREEN, f)
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                split.main([path, "--max-nodes", "4", "--max-depth", "0"])
+        self.assertEqual(out.getvalue(), split.convert(SCREEN, max_nodes=4, max_depth=0) + "\n")
+        self.assertEqual(dsl2ui.generate_swiftui(SCREEN, split=True), split.convert(SCREEN) + "\n")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import unittest
+import json
+import os
+import sys
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+from dsl2ui import batch
+from dsl2ui import cache as build_cache
+from dsl2ui import dsl_binary
+from dsl2ui import validate
+
+VALID_DSL = {
+    "type": "FRAME",
+    "name": "Valid",
+    "layout": {"direction": "VERTICAL", "spacing": 8, "width": {"mode": "FIXED", "value": 320}, "padding": [1, 2, 3, 4]},
+    "scroll": "vertical",
+    "repeat": {"for": "rows", "as": "row", "key": "meta.sku", "contentType": "row"},
+    "children": [
+        {"type": "TEXT", "text": "{{ row.title }}", "visible": "{{ row.visible }}"},
+        {"type": "SPACER"},
+        {"type": "INSTANCE", "name": "ds/Button", "props": {"label": "OK", "enabled": True, "size": 2}},
+        {"type": "OVERLAY", "position": {"top": 4, "right": 4}, "child": {"type": "TEXT", "text": "badge"}}
+    ]
+}
+
+BROKEN_DSL = {
+    "type": "FRAME",
+    "layout": {"direction": "DIAGONAL", "padding": [1, 2, 3]},
+    "children": [
+        {"type": "IMAGE"},
+        {"type": "TEXT", "text": "x", "visible": "show", "children": []},
+        {"type": "INSTANCE", "name": "ds/Chip", "props": {"a/b": [1]}, "layout": {"height": {"mode": "FIXED"}}},
+        {"type": "OVERLAY", "position": {"middle": 1}},
+        "SPACER"
+    ]
+}
+
+BROKEN_ISSUES = [
+    ("/layout/direction", "direction must be one of VERTICAL, HORIZONTAL"),
+    ("/layout/padding", "padding must be an array of 4 numbers [left, top, right, bottom]"),
+    ("/children/0/type", "unknown type 'IMAGE' (expected one of FRAME, TEXT, SPACER, INSTANCE, OVERLAY)"),
+    ("/children/1/children", "children is ignored on TEXT (only for FRAME)"),
+    ("/children/1/visible", "visible must be a binding like \"{{expr}}\""),
+    ("/children/2/layout/height", "FIXED size requires a value"),
+    ("/children/2/props/a~1b", "prop value must be a string, number or boolean"),
+    ("/children/3/position/middle", "unknown edge (expected one of left, top, right, bottom)"),
+    ("/children/3", "OVERLAY requires a child"),
+    ("/children/4", "node must be an object"),
+]
+
+class TestValidate(unittest.TestCase):
+
+    def setUp(self):
+        """テスト用のディレクトリを作成"""
+        self.maxDiff = None
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, name, dsl):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(dsl if isinstance(dsl, str) else json.dumps(dsl))
+        return path
+
+    def test_valid(self):
+        """正しい DSL は問題なし"""
+        self.assertEqual(validate.validate(VALID_DSL), [])
+
+    def test_reports_all_issues_with_paths(self):
+        """すべての問題を JSON Pointer 付きで文書の順に返す"""
+        self.assertEqual([tuple(i) for i in validate.validate(BROKEN_DSL)], BROKEN_ISSUES)
+
+    def test_repeat_key(self):
+        """repeat.key はプロパティのパス、contentType は空でない文字列"""
+        dsl = {"type": "FRAME", "repeat": {"for": "rows", "key": "row.sku!", "contentType": ""}}
+        self.assertEqual([i.path for i in validate.validate(dsl)], ["/repeat/contentType", "/repeat/key"])
+        dsl = {"type": "FRAME", "repeat": {"for": "rows", "key": "sku", "id": "self"}}
+        self.assertEqual([tuple(i) for i in validate.validate(dsl)], [("/repeat/id", "repeat.id is ignored when repeat.key is set")])
+
+    def test_fail_fast(self):
+        """fail_fast は最初の問題だけ"""
+        self.assertEqual([tuple(i) for i in validate.validate(BROKEN_DSL, fail_fast=True)], BROKEN_ISSUES[:1])
+
+    def test_deep_tree(self):
+        """再帰上限を超える深さも検証できる"""
+        root = leaf = {"type": "FRAME", "children": []}
+        for _ in range(sys.getrecursionlimit() * 2):
+            child = {"type": "FRAME", "children": []}
+            leaf["children"].append(child)
+            leaf = child
+        leaf["children"].append({"type": "VIDEO"})
+        issues = validate.validate(root)
+        self.assertEqual(len(issues), 1)
+        self.assertTrue(issues[0].path.endswith("/children/0/type"))
+
+    def test_content_and_cache(self):
+        """画面の配列はインデックス付きのパス、同じ内容の検証結果はキャッシュから再利用"""
+        content = json.dumps([VALID_DSL, BROKEN_DSL]).encode("utf-8")
+        cache = build_cache.BuildCache(os.path.join(self.tmp.name, "cache"))
+        issues, cached = validate.validate_content(content, cache=cache)
+        self.assertFalse(cached)
+        self.assertEqual(issues[0], validate.Issue("/1/layout/direction", BROKEN_ISSUES[0][1]))
+        with patch("dsl2ui.validate.validate") as v:
+            again, cached = validate.validate_content(content, cache=cache)
+        v.assert_not_called()
+        self.assertTrue(cached)
+        self.assertEqual(again, issues)
+        self.assertEqual(validate.validate_content(dsl_binary.compile_dsl(VALID_DSL)), ([], False))
+
+    def test_parallel_matches_serial(self):
+        """並列でも結果と順序は直列と同じ"""
+        paths = [self.write(f"s{i}.json", BROKEN_DSL if i % 3 else VALID_DSL) for i in range(12)]
+        paths.append(self.write("bad.json", "{"))
+        serial = validate.run_validate(paths)
+        parallel = validate.run_validate(paths, jobs=2)
+        self.assertEqual([(r.src, r.issues, r.error) for r in parallel], [(r.src, r.issues, r.error) for r in serial])
+        self.assertEqual(sum(1 for r in serial if r.issues), 8)
+        self.assertTrue(serial[-1].error.startswith("JSONDecodeError"))
+
+    def test_main(self):
+        """CLI は問題をファイル名#パスで表示し、問題があれば終了コード 1"""
+        self.write("ok.json", VALID_DSL)
+        with patch("sys.stdout", new=StringIO()) as out, patch("sys.stderr", new=StringIO()):
+            self.assertEqual(validate.main([self.tmp.name]), 0)
+            self.write("ng.json", BROKEN_DSL)
+            self.assertEqual(validate.main([self.tmp.name, "--fail-fast"]), 1)
+        self.assertEqual(out.getvalue().strip().splitlines(),
+                         [f"{os.path.join(self.tmp.name, 'ng.json')}#/layout/direction: {BROKEN_ISSUES[0][1]}"])
+
+    def test_batch_validate(self):
+        """batch の --validate は問題のある DSL を生成しない"""
+        src = os.path.join(self.tmp.name, "dsl")
+        os.makedirs(src)
+        for name, dsl in (("ok.json", VALID_DSL), ("ng.json", BROKEN_DSL)):
+            with open(os.path.join(src, name), "w", encoding="utf-8") as f:
+                json.dump(dsl, f)
+        out = os.path.join(self.tmp.name, "out")
+        results = batch.run_batch("compose", batch.collect_inputs(src)[0], out, src, validate=True)
+        errors = {os.path.basename(r.src): r.error for r in results}
+        self.assertIsNone(errors["ok.json"])
+        self.assertTrue(errors["ng.json"].startswith("SchemaError: 10 issues: #/layout/direction"))
+        self.assertFalse(os.path.exists(os.path.join(out, "ng.kt")))
+
+    def test_binary(self):
+        """.dslb も dict に戻して検証し、batch の --validate は問題のある .dslb を生成しない"""
+        broken = dict(BROKEN_DSL, children=BROKEN_DSL["children"][:4])
+        # 空の children はバイナリに残らないので、その問題だけは見つからない
+        expected = [i for i in BROKEN_ISSUES if i[0] not in ("/children/1/children", "/children/4")]
+        issues, _ = validate.validate_content(dsl_binary.compile_dsl(broken))
+        self.assertEqual(sorted(tuple(i) for i in issues), sorted(expected))
+        issues, _ = validate.validate_content(dsl_binary.compile_documents([VALID_DSL, broken]))
+        self.assertEqual(sorted(tuple(i) for i in issues), sorted((f"/1{p}", m) for p, m in expected))
+        src = os.path.join(self.tmp.name, "dsl")
+        os.makedirs(src)
+        for name, docs in (("ok.dslb", [VALID_DSL]), ("ng.dslb", [broken]), ("multi.dslb", [VALID_DSL, broken])):
+            with open(os.path.join(src, name), "wb") as f:
+                f.write(dsl_binary.compile_documents(docs))
+        out = os.path.join(self.tmp.name, "out")
+        results = batch.run_batch("all", [os.path.join(src, n) for n in ("ok.dslb", "ng.dslb")], out, src, validate=True)
+        errors = {os.path.basename(r.dst): r.error for r in results}
+        self.assertIsNone(errors["ok.kt"])
+        self.assertTrue(errors["ng.kt"].startswith("SchemaError: 8 issues: #/layout/direction"))
+        self.assertTrue(errors["ng.swift"].startswith("SchemaError"))
+        self.assertEqual(sorted(os.listdir(out)), ["ok.kt", "ok.swift"])
+        # 複数画面のファイルは画面毎に検証する
+        results = batch.run_batch("compose", [os.path.join(src, "multi.dslb")], out, src, multi_doc=True, validate=True)
+        self.assertEqual([r.error is None for r in results], [True, False])
+        self.assertTrue(results[1].error.startswith("SchemaError"))
+
+if __name__ == '__main__':
+    unittest.main()
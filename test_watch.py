@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import unittest
+import json
+import os
+import tempfile
+from unittest.mock import patch
+from dsl2ui import batch
+from dsl2ui import watch
+from dsl2ui import toJetpackCompose
+from dsl2ui import toSwiftUi
+
+SIMPLE_DSL = {
+    "type": "FRAME",
+    "name": "TestScreen",
+    "layout": {"direction": "VERTICAL", "spacing": 16},
+    "children": [
+        {"type": "TEXT", "text": "Hello World"},
+        {"type": "SPACER"}
+    ]
+}
+
+class TestWatch(unittest.TestCase):
+
+    def setUp(self):
+        """テスト用の DSL ディレクトリを作成"""
+        self.maxDiff = None
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmp.name, "dsl")
+        self.out = os.path.join(self.tmp.name, "out")
+        os.makedirs(self.src)
+        self.write("a.json", SIMPLE_DSL)
+        self.write("b.json", {**SIMPLE_DSL, "name": "Other"})
+        self.state = watch.WatchState("all", self.src, self.out)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel, dsl, mtime=None):
+        path = os.path.join(self.src, rel)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(dsl if isinstance(dsl, str) else json.dumps(dsl))
+        if mtime is not None: os.utime(path, ns=(mtime, mtime))
+
+    def read(self, rel):
+        with open(os.path.join(self.out, rel), encoding="utf-8") as f:
+            return f.read()
+
+    def test_initial_build(self):
+        """起動時は全ファイルを生成"""
+        results = self.state.update(sorted(self.state.scan()))
+        self.assertEqual([os.path.basename(r.dst) for r in results], ["a.kt", "a.swift", "b.kt", "b.swift"])
+        self.assertEqual(self.read("a.kt"), toJetpackCompose.convert(SIMPLE_DSL) + "\n")
+        self.assertEqual(self.read("a.swift"), toSwiftUi.convert(SIMPLE_DSL) + "\n")
+        self.assertEqual(self.state.changes(), ([], []))
+
+    def test_memo_is_opt_in(self):
+        """FragmentMemo は既定では使わず、memo=True のときだけバックエンド毎に持つ（出力は同じ）"""
+        self.assertEqual(self.state.memos, [None, None])
+        state = watch.WatchState("all", self.src, self.out, memo=True)
+        self.assertEqual([m is not None for m in state.memos], [True, True])
+        state.update(sorted(state.scan()))
+        self.assertEqual(self.read("a.kt"), toJetpackCompose.convert(SIMPLE_DSL) + "\n")
+
+    def test_only_changed_files_regenerated(self):
+        """変更されたファイルだけ再パース・再生成する"""
+        self.state.update(sorted(self.state.scan()))
+        self.write("b.json", {**SIMPLE_DSL, "name": "Renamed"}, mtime=1)
+        changed, removed = self.state.changes()
+        self.assertEqual((changed, removed), ([os.path.join(self.src, "b.json")], []))
+        with patch('dsl2ui.watch.decoder.loads', wraps=watch.decoder.loads) as loads:
+            results = self.state.update(changed)
+        self.assertEqual(loads.call_count, 1)
+        self.assertEqual(len(results), 2)
+        self.assertIn("Renamed", self.read("b.kt"))
+
+    def test_touch_without_content_change(self):
+        """内容が同じ保存はパースしない・同じ生成結果は書き込まない"""
+        self.state.update(sorted(self.state.scan()))
+        self.write("a.json", SIMPLE_DSL, mtime=1)
+        self.assertEqual(self.state.update(self.state.changes()[0]), [])
+        # 生成結果に影響しないキーの追加は再生成するが書き込まない
+        self.write("a.json", {**SIMPLE_DSL, "note": "x"}, mtime=2)
+        results = self.state.update(self.state.changes()[0])
+        self.assertTrue(all(r.cached for r in results))
+
+    def test_removed_file_outputs_deleted(self):
+        """削除された DSL の出力も削除"""
+        self.state.update(sorted(self.state.scan()))
+        os.unlink(os.path.join(self.src, "a.json"))
+        changed, removed = self.state.changes()
+        self.state.remove(removed)
+        self.assertFalse(os.path.exists(os.path.join(self.out, "a.kt")))
+        self.assertTrue(os.path.exists(os.path.join(self.out, "b.kt")))
+
+    def test_broken_file_reported(self):
+        """壊れた JSON は失敗として報告し、直したら再生成"""
+        self.state.update(sorted(self.state.scan()))
+        self.write("a.json", "{", mtime=1)
+        results = self.state.update(self.state.changes()[0])
+        self.assertTrue(all(r.error for r in results))
+        self.write("a.json", {**SIMPLE_DSL, "name": "Fixed"}, mtime=2)
+        results = self.state.update(self.state.changes()[0])
+        self.assertTrue(all(r.error is None for r in results))
+        self.assertIn("Fixed", self.read("a.swift"))
+
+    def test_watch_debounces_bursts(self):
+        """連続した変更は静かになってから 1 回だけ再生成する"""
+        now = [0.0]
+        edits = {3: 1, 4: 2, 5: 3}  # ポーリング 3〜5 回目で保存が続く
+        polls = [0]
+        reported = []
+
+        def sleep(sec):
+            now[0] += sec
+            polls[0] += 1
+            if polls[0] in edits:
+                self.write("a.json", {**SIMPLE_DSL, "name": f"Edit{edits[polls[0]]}"}, mtime=edits[polls[0]])
+
+        watch.watch(self.state, interval=0.05, debounce=0.1, report=reported.append,
+                    stop=lambda: polls[0] >= 20, sleep=sleep, clock=lambda: now[0])
+        self.assertEqual(len(reported), 4 + 2)
+        self.assertIn("Edit3", self.read("a.kt"))
+
+    def test_save_to_output_latency(self):
+        """既定の間隔・debounce で、保存の直後から数えても出力の書き出しまで 100ms 以内（時刻は差し替えて数える）"""
+        now = [0.0]
+        polls = [0]
+        saved, written = [], []
+
+        def sleep(sec):
+            polls[0] += 1
+            if polls[0] == 3:
+                # ポーリングの直後に保存する（検出まで 1 間隔まるごと待つ最悪の場合）
+                self.write("a.json", {**SIMPLE_DSL, "name": "Latency"}, mtime=1)
+                saved.append(now[0])
+            now[0] += sec
+
+        def report(r):
+            if polls[0] and r.dst.endswith("a.kt"): written.append(now[0])
+
+        watch.watch(self.state, report=report, stop=lambda: polls[0] >= 20, sleep=sleep, clock=lambda: now[0])
+        self.assertEqual(len(written), 1)
+        # 検出に 1 間隔、静かになったと判断するまで debounce 以上の最小の間隔の倍数
+        ticks = 1 + -(-watch.DEBOUNCE // watch.INTERVAL)
+        self.assertAlmostEqual(written[0] - saved[0], ticks * watch.INTERVAL)
+        self.assertLessEqual(written[0] - saved[0], 0.1)
+
+    def test_scan_walks_only_on_directory_change(self):
+        """ディレクトリの mtime が変わらなければ辿り直さず、ファイルの追加・削除は辿り直して見つける"""
+        self.state.scan()
+        with patch("dsl2ui.watch.os.scandir", wraps=os.scandir) as scandir:
+            for _ in range(5): self.state.scan()
+            self.assertEqual(scandir.call_count, 0)
+            os.makedirs(os.path.join(self.src, "sub"))
+            self.write("sub/c.json", SIMPLE_DSL)
+            self.write(".hidden.json", SIMPLE_DSL)
+            os.utime(self.src, ns=(1, 1))  # mtime の粒度が粗いファイルシステムでも変化させる
+            stamps = self.state.scan()
+        self.assertGreater(scandir.call_count, 0)
+        self.assertEqual(sorted(os.path.relpath(p, self.src) for p in stamps), ["a.json", "b.json", os.path.join("sub", "c.json")])
+        os.unlink(os.path.join(self.src, "b.json"))
+        os.utime(self.src, ns=(2, 2))
+        self.assertNotIn(os.path.join(self.src, "b.json"), self.state.scan())
+        # batch と同じ入力を集める
+        self.assertEqual(sorted(self.state.scan()), batch.collect_inputs(self.src)[0])
+
+if __name__ == '__main__':
+    unittest.main()
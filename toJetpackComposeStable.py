@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+./toJetpackComposeStable.py として動かすための入口（本体は dsl2ui/toJetpackComposeStable.py）
+"""
+import sys
+from dsl2ui.toJetpackComposeStable import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+./toSwiftUiSplit.py として動かすための入口（本体は dsl2ui/toSwiftUiSplit.py）
+"""
+import sys
+from dsl2ui.toSwiftUiSplit import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+./watch.py として動かすための入口（本体は dsl2ui/watch.py）
+"""
+import sys
+from dsl2ui.watch import main
+
+if __name__ == "__main__":
+    sys.exit(main())